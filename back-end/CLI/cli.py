@@ -1,9 +1,6 @@
 import click
-import json
 
-from pyworkflow import Workflow, WorkflowException
-from pyworkflow import NodeException
-from pyworkflow.nodes import ReadCsvNode, WriteCsvNode
+from pyworkflow import Workflow, WorkflowException, WorkflowExecutor, serialization, storage
 
 
 class Config(object):
@@ -22,7 +19,21 @@ def cli():
 @cli.command()
 @click.argument('filenames', type=click.Path(exists=True), nargs=-1)
 @click.option('--verbose', is_flag=True, help='Enables verbose mode.')
-def execute(filenames, verbose):
+@click.option('-j', '--workers', type=int, default=1, show_default=True,
+              help='Number of nodes to execute in parallel.')
+@click.option('--processes', is_flag=True,
+              help='Execute nodes in a process pool instead of threads.')
+@click.option('--stale-only', is_flag=True,
+              help='Only execute nodes changed since the workflow was last executed.')
+@click.option('--chunksize', type=click.IntRange(min=1),
+              help='Stream data through row-wise nodes in chunks of this many rows.')
+@click.option('--inspect', multiple=True, metavar='NODE_ID',
+              help='Store the output of this node, even if optimized away. Repeatable.')
+@click.option('--no-optimize', is_flag=True,
+              help='Execute and store every node on its own.')
+@click.option('--save-state', is_flag=True,
+              help='Save node states back to the workflow file (implied by --stale-only).')
+def execute(filenames, verbose, workers, processes, stale_only, chunksize, inspect, no_optimize, save_state):
     """Execute Workflow file(s)."""
     # Check whether to log to terminal, or redirect output
     log = click.get_text_stream('stdout').isatty()
@@ -39,52 +50,95 @@ def execute(filenames, verbose):
 
         try:
             workflow = open_workflow(workflow_file)
-            execute_workflow(workflow, log, verbose)
-        except OSError as e:
+            execute_workflow(workflow, log, verbose, workers, processes, stale_only, chunksize,
+                             inspect, not no_optimize)
+
+            # Record node states, so the next run knows what is stale
+            if stale_only or save_state:
+                save_workflow(workflow_file, workflow)
+        except (OSError, ValueError) as e:
             click.echo(f"Issues loading workflow file: {e}", err=True)
         except WorkflowException as e:
             click.echo(f"Issues during workflow execution\n{e}", err=True)
 
 
-def execute_workflow(workflow, log, verbose):
-    """Execute a workflow file, node-by-node.
+def execute_workflow(workflow, log, verbose, workers=1, processes=False, stale_only=False,
+                     chunksize=None, inspect=None, optimize=True):
+    """Execute a workflow file, running independent nodes in parallel.
 
-    Retrieves the execution order from the Workflow and iterates through nodes.
-    If any I/O nodes are present AND stdin/stdout redirection is provided in the
-    command-line, overwrite the stored options and then replace before saving.
+    Retrieves the execution order from the Workflow and hands the nodes to a
+    WorkflowExecutor, which starts each node as soon as its predecessors have
+    finished. If any I/O nodes are present AND stdin/stdout redirection is
+    provided in the command-line, overwrite the stored options and then replace
+    before saving. The redirected nodes, and everything downstream of them,
+    are then marked stale: their output came from stdin/stdout, not the
+    files in their options.
 
     Args:
         workflow - Workflow object loaded from file
         log - True, for outputting to terminal; False for stdout redirection
         verbose - True, for outputting debug information; False otherwise
+        workers - Number of nodes to execute at once
+        processes - True, to execute nodes in separate processes
+        stale_only - True, to skip nodes whose stored output is up to date
+        chunksize - Rows per chunk, to stream data through row-wise nodes
+        inspect - Nodes whose output to store, even if optimized away
+        optimize - False, to execute and store every node on its own
     """
-    execution_order = workflow.execution_order()
+    execution_order = workflow.stale_nodes() if stale_only else workflow.execution_order()
 
-    # Execute each node in the order returned by the Workflow
+    # Redirect file options to stdin/stdout before any node executes
+    original_file_options = dict()
     for node in execution_order:
-        try:
-            node_to_execute = workflow.get_node(node)
-            original_file_option = pre_execute(workflow, node_to_execute, log)
+        original_file_option = pre_execute(workflow, workflow.get_node(node), log)
+
+        if original_file_option is not None:
+            original_file_options[node] = original_file_option
 
-            if verbose:
-                print('Executing node of type ' + str(type(node_to_execute)))
+    if processes and original_file_options:
+        # stdin/stdout cannot be shared with other processes
+        click.echo('stdin/stdout redirection requires threads; ignoring --processes', err=True)
+        processes = False
 
-            # perform execution
-            executed_node = workflow.execute(node)
+    if chunksize and not storage.get_format(workflow.data_format).chunked:
+        # e.g. 'json', the default for older workflows
+        click.echo(f"Streaming requires the 'parquet' or 'feather' data format, not "
+                   f"'{workflow.data_format}'; ignoring --chunksize", err=True)
+        chunksize = None
 
-            # If file was replaced with stdin/stdout, restore original option
-            if original_file_option is not None:
-                executed_node.option_values["file"] = original_file_option
+    executor = CliExecutor(workflow, verbose, max_workers=workers, use_processes=processes,
+                           chunksize=chunksize, inspect=inspect, optimize=optimize)
+    executor.run(execution_order)
 
-            # Update Node in Workflow with changes (saved data file)
-            workflow.update_or_add_node(executed_node)
-        except NodeException as e:
-            click.echo(f"Issues during node execution\n{e}", err=True)
+    # If file was replaced with stdin/stdout, restore original option, even
+    # if the node did not execute
+    for node, original_file_option in original_file_options.items():
+        redirect_file_option(workflow, node, original_file_option)
+        workflow.graph.nodes[node].pop('cache_key', None)
+        workflow.mark_stale(node)
+
+    if verbose and executor.plan.pruned:
+        click.echo('Skipped nodes with no output: ' + ', '.join(executor.plan.pruned))
 
     if verbose:
         click.echo('Completed workflow execution!')
 
 
+class CliExecutor(WorkflowExecutor):
+    """WorkflowExecutor that reports node progress on the command-line."""
+
+    def __init__(self, workflow, verbose, **kwargs):
+        super().__init__(workflow, **kwargs)
+        self.verbose = verbose
+
+    def node_started(self, node_id):
+        if self.verbose:
+            print('Executing node of type ' + str(type(self.workflow.get_node(node_id))))
+
+    def node_failed(self, node_id, exception):
+        click.echo(f"Issues during node execution\n{exception}", err=True)
+
+
 def pre_execute(workflow, node_to_execute, log):
     """Pre-execution steps, to overwrite file options with stdin/stdout.
 
@@ -98,9 +152,10 @@ def pre_execute(workflow, node_to_execute, log):
     """
     stdin = click.get_text_stream('stdin')
 
-    if type(node_to_execute) is ReadCsvNode and not stdin.isatty():
+    # Compare keys, not classes, so the Node modules need not be imported
+    if node_to_execute.node_key == 'ReadCsvNode' and not stdin.isatty():
         new_file_location = stdin
-    elif type(node_to_execute) is WriteCsvNode and not log:
+    elif node_to_execute.node_key == 'WriteCsvNode' and not log:
         new_file_location = click.get_text_stream('stdout')
     else:
         # No file redirection needed
@@ -110,14 +165,41 @@ def pre_execute(workflow, node_to_execute, log):
     original_file_option = node_to_execute.option_values["file"]
 
     # replace with value from stdin and save
-    node_to_execute.option_values["file"] = new_file_location
-    workflow.update_or_add_node(node_to_execute)
+    redirect_file_option(workflow, node_to_execute.node_id, new_file_location)
 
     return original_file_option
 
 
+def redirect_file_option(workflow, node_id, file_option):
+    """Set a Node's file option for this execution only.
+
+    `update_or_add_node()` would see a changed option, and mark the Node and
+    everything downstream of it stale before it executes. The option is
+    instead set on both the Node and the graph, so saving the executed Node
+    back finds no change.
+    """
+    workflow.get_node(node_id).option_values["file"] = file_option
+    workflow.graph.nodes[node_id]["options"]["file"] = file_option
+
+
 def open_workflow(workflow_file):
-    with open(workflow_file) as f:
-        json_content = json.load(f)
+    with open(workflow_file, 'rb') as f:
+        json_content = serialization.loads(f.read())
 
     return Workflow.from_json(json_content['pyworkflow'])
+
+
+def save_workflow(workflow_file, workflow):
+    """Save the executed Workflow back to its file.
+
+    The file keeps its other contents (e.g., the UI's 'react' data), and is
+    written in the encoding and compression it was read in.
+    """
+    with open(workflow_file, 'rb') as f:
+        data = f.read()
+
+    json_content = serialization.loads(data)
+    json_content['pyworkflow'] = workflow.to_session_dict()
+
+    with open(workflow_file, 'wb') as f:
+        f.write(serialization.detect(data).dumps(json_content))
@@ -1,3 +1,12 @@
 from .workflow import Workflow, WorkflowException
 from .node import *
 from .node_factory import node_factory
+from .registry import NodeRegistry, node_registry
+from .executor import WorkflowExecutor
+from .planner import ExecutionPlan
+from .journal import WorkflowJournal
+from .serialization import Serializer
+from .jobs import Job, JobQueue
+from .batch import GraphBatch
+from .upload import ChunkedUpload
+from .sampling import Sample
@@ -0,0 +1,242 @@
+import networkx as nx
+
+from .node import NodeException
+from .node_factory import node_factory
+from .parameters import ParameterValidationError
+from .workflow import WorkflowException
+
+
+class GraphBatch:
+    """A list of graph changes, applied to a Workflow all at once.
+
+    Each operation is a dict, like the requests of the single-change
+    endpoints:
+
+        {"op": "add_node", "node": {Node JSON, as for POST /node/}}
+        {"op": "update_node", "node": {Node JSON, with an existing node_id}}
+        {"op": "remove_node", "node_id": id, "is_global": false}
+        {"op": "add_edge", "from": node_id, "to": node_id}
+        {"op": "remove_edge", "from": node_id, "to": node_id}
+
+    Operations apply in order, so later ones can refer to Nodes added by
+    earlier ones. Every operation is validated against the Workflow, as it
+    will be once the earlier operations are applied, before any is applied.
+    The operations are then applied to a snapshot of the Workflow, which the
+    Workflow only adopts once all succeeded. If any is invalid or fails, the
+    Workflow is left unchanged.
+
+    Attributes:
+        workflow: The Workflow to change
+        operations: list of operation dicts
+    """
+
+    OPERATIONS = ['add_node', 'update_node', 'remove_node', 'add_edge', 'remove_edge']
+
+    def __init__(self, workflow, operations):
+        self.workflow = workflow
+        self.operations = operations
+
+        # Nodes built from the operations, by operation index
+        self._nodes = dict()
+
+    def apply(self):
+        """Validate, then apply, every operation.
+
+        Returns:
+            dict of the changes made:
+            {
+                added: JSON of Nodes added,
+                updated: JSON of Nodes updated,
+                removed: node_ids removed,
+                edges_added: [from, to] pairs added,
+                edges_removed: [from, to] pairs removed, including the
+                    edges of removed Nodes,
+                stale: node_ids that are now out of date,
+            }
+
+        Raises:
+            WorkflowException: an operation is invalid; its reason names the
+                operation's index
+        """
+        self.validate()
+
+        workflow = self.workflow.snapshot()
+        graph = workflow.graph
+        was_fresh = {node_id for node_id in graph if workflow.get_node_state(node_id) == workflow.FRESH}
+
+        delta = {'added': list(), 'updated': list(), 'removed': list(),
+                 'edges_added': list(), 'edges_removed': list()}
+
+        for index, operation in enumerate(self.operations):
+            op = operation['op']
+
+            if op in ('add_node', 'update_node'):
+                node = self._nodes[index]
+                workflow.update_or_add_node(node)
+                delta['added' if op == 'add_node' else 'updated'].append(node.to_json())
+            elif op == 'remove_node':
+                node = self.get_node(operation['node_id'], operation.get('is_global', False), workflow)
+
+                if not node.is_global:
+                    delta['edges_removed'].extend(list(edge) for edge in graph.in_edges(node.node_id))
+                    delta['edges_removed'].extend(list(edge) for edge in graph.out_edges(node.node_id))
+
+                workflow.remove_node(node)
+                delta['removed'].append(node.node_id)
+            elif op == 'add_edge':
+                edge = workflow.add_edge(workflow.get_node(operation['from']), workflow.get_node(operation['to']))
+                delta['edges_added'].append(list(edge))
+            else:
+                edge = workflow.remove_edge(workflow.get_node(operation['from']), workflow.get_node(operation['to']))
+                delta['edges_removed'].append(list(edge))
+
+        delta['stale'] = [node_id for node_id in graph
+                          if node_id in was_fresh and workflow.get_node_state(node_id) != workflow.FRESH]
+
+        self.workflow.adopt(workflow)
+
+        return delta
+
+    def validate(self):
+        """Check every operation, without changing the Workflow.
+
+        The changes are played out on a copy of the graph's structure (node
+        ids and edges only), which is then checked for cycles if edges were
+        added. Every Node an operation refers to must also be loadable, i.e.
+        its Node type installed.
+
+        Raises:
+            WorkflowException: an operation is invalid
+        """
+        if not isinstance(self.operations, list):
+            raise WorkflowException('apply batch', 'Operations must be a list')
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.workflow.graph)
+        graph.add_edges_from(self.workflow.graph.edges)
+        flow_vars = set(self.workflow.flow_vars)
+        adds_edges = False
+
+        # Nodes added or updated in the batch, by (is_global, node_id)
+        built = dict()
+
+        for index, operation in enumerate(self.operations):
+            op = operation.get('op') if isinstance(operation, dict) else None
+
+            if op not in GraphBatch.OPERATIONS:
+                raise GraphBatch.invalid(index, "Unknown op '%s'. Choose from: %s" % (op, ', '.join(GraphBatch.OPERATIONS)))
+
+            if op in ('add_node', 'update_node'):
+                node = self.build_node(index, operation.get('node'))
+                ids = flow_vars if node.is_global else graph
+
+                if op == 'add_node' and node.node_id in ids:
+                    raise GraphBatch.invalid(index, 'A %s with id %s already exists in the graph.' % (
+                        'flow variable' if node.is_global else 'node', node.node_id))
+
+                if op == 'update_node':
+                    if node.node_id not in ids:
+                        raise GraphBatch.invalid(index, 'The workflow does not contain node id %s' % node.node_id)
+
+                    existing = self.existing_node(index, node.node_id, node.is_global, built)
+
+                    if type(existing) != type(node):
+                        raise GraphBatch.invalid(index, 'Node types do not match for node id %s' % node.node_id)
+
+                    try:
+                        node.validate()
+                    except ParameterValidationError as e:
+                        raise GraphBatch.invalid(index, str(e))
+
+                if node.is_global:
+                    flow_vars.add(node.node_id)
+                else:
+                    graph.add_node(node.node_id)
+
+                built[(node.is_global, node.node_id)] = node
+                self._nodes[index] = node
+            elif op == 'remove_node':
+                node_id = operation.get('node_id')
+                is_global = operation.get('is_global', False)
+                ids = flow_vars if is_global else graph
+
+                if node_id not in ids:
+                    raise GraphBatch.invalid(index, 'The workflow does not contain node id %s' % node_id)
+
+                self.existing_node(index, node_id, is_global, built)
+
+                if is_global:
+                    flow_vars.remove(node_id)
+                else:
+                    graph.remove_node(node_id)
+
+                built.pop((is_global, node_id), None)
+            else:
+                from_id, to_id = operation.get('from'), operation.get('to')
+
+                if from_id not in graph or to_id not in graph:
+                    raise GraphBatch.invalid(index, 'The workflow does not contain the node(s) requested.')
+
+                self.existing_node(index, from_id, False, built)
+                self.existing_node(index, to_id, False, built)
+
+                if op == 'add_edge':
+                    if graph.has_edge(from_id, to_id):
+                        raise GraphBatch.invalid(index, 'Edge between nodes already exists.')
+                    graph.add_edge(from_id, to_id)
+                    adds_edges = True
+                else:
+                    if not graph.has_edge(from_id, to_id):
+                        raise GraphBatch.invalid(index, 'Edge from %s to %s does not exist in graph.' % (from_id, to_id))
+                    graph.remove_edge(from_id, to_id)
+
+        # Only new edges can create a cycle
+        if adds_edges and not nx.is_directed_acyclic_graph(graph):
+            raise WorkflowException('apply batch', 'The changes would create a cycle in the graph')
+
+    def build_node(self, index, node_info):
+        if not isinstance(node_info, dict):
+            raise GraphBatch.invalid(index, 'Missing required Node information')
+
+        try:
+            node = node_factory(node_info)
+        except (NodeException, ParameterValidationError, ImportError) as e:
+            raise GraphBatch.invalid(index, str(e))
+
+        if node is None or node.node_id is None:
+            raise GraphBatch.invalid(index, 'Missing required Node information')
+
+        return node
+
+    def existing_node(self, index, node_id, is_global, built):
+        """Load a Node as it will be once the earlier operations are applied.
+
+        Args:
+            index: Index of the operation referring to the Node
+            node_id: The Node, known to be in the graph
+            is_global: Whether the Node is a global flow variable
+            built: Nodes added or updated by earlier operations
+
+        Raises:
+            WorkflowException: the Node cannot be loaded
+        """
+        node = built.get((is_global, node_id))
+
+        if node is None:
+            try:
+                node = self.get_node(node_id, is_global)
+            except ImportError as e:
+                raise GraphBatch.invalid(index, str(e))
+
+        if node is None:
+            raise GraphBatch.invalid(index, 'Node %s cannot be loaded; its Node type is not installed' % node_id)
+
+        return node
+
+    def get_node(self, node_id, is_global=False, workflow=None):
+        workflow = workflow or self.workflow
+        return workflow.get_flow_var(node_id) if is_global else workflow.get_node(node_id)
+
+    @staticmethod
+    def invalid(index, reason):
+        return WorkflowException('apply batch', 'Operation %d: %s' % (index, reason))
@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+
+from collections import OrderedDict
+
+from .storage import is_dataframe
+
+
+class NodeDataCache:
+    """Bounded LRU cache of decoded Node data.
+
+    Decoding a stored DataFrame is expensive, and the same file is read once
+    per downstream Node and again for every data preview. Entries are keyed by
+    file path, and are only reused while the file's modification time and size
+    are unchanged; `Workflow.store_node_data` also invalidates a file's entry
+    explicitly when overwriting it.
+
+    Cached data is shared between readers: Nodes must not modify their input
+    data in place.
+
+    Attributes:
+        max_bytes: Approximate memory budget for decoded data. Entries larger
+            than the budget are not cached; 0 disables caching.
+        hits: Number of reads served from the cache
+        misses: Number of reads that decoded the file
+        evictions: Number of entries evicted to stay within `max_bytes`
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_bytes(self):
+        return self._current_bytes
+
+    def get(self, file_path, loader, mapped=False):
+        """Retrieve decoded data for `file_path`, decoding it on a miss.
+
+        Args:
+            file_path: Location of the stored data
+            loader: Called with `file_path` to decode the file on a miss
+            mapped: Whether `loader` memory-maps the file; see `estimate_size()`
+
+        Returns:
+            The decoded data
+
+        Raises:
+            OSError: file does not exist. Any exception from `loader`.
+        """
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+
+        data = loader(file_path)
+        self._put(file_path, signature, data, NodeDataCache.estimate_size(data, stat.st_size, mapped))
+
+        return data
+
+    def peek(self, file_path):
+        """Retrieve decoded data for `file_path` only if it is cached.
+
+        Returns:
+            The decoded data, or None if not cached or out of date
+
+        Raises:
+            OSError: file does not exist
+        """
+        stat = os.stat(file_path)
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+
+            if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+                return None
+
+            self._entries.move_to_end(file_path)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, file_path):
+        """Remove a file's entry, e.g. before the file is overwritten."""
+        with self._lock:
+            self._remove(file_path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def resize(self, max_bytes):
+        """Change the memory budget, evicting entries if needed."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _put(self, file_path, signature, data, size):
+        with self._lock:
+            self._remove(file_path)
+
+            if size > self.max_bytes:
+                return
+
+            self._entries[file_path] = (signature, data, size)
+            self._current_bytes += size
+            self._evict()
+
+    def _remove(self, file_path):
+        entry = self._entries.pop(file_path, None)
+
+        if entry is not None:
+            self._current_bytes -= entry[2]
+
+    def _evict(self):
+        while self._current_bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._current_bytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def estimate_size(data, file_size, mapped=False):
+        """Approximate in-memory size of decoded data, in bytes.
+
+        Args:
+            data: The decoded data
+            file_size: Size of the file it was decoded from
+            mapped: Whether the data was read from a memory-mapped file. The
+                read-only columns of such a DataFrame are views of the file,
+                paged in and out by the OS, so are not counted.
+        """
+        if is_dataframe(data):
+            if not mapped:
+                return int(data.memory_usage(index=True, deep=True).sum())
+
+            size = data.index.memory_usage(deep=True)
+
+            for _, column in data.items():
+                flags = getattr(column.values, 'flags', None)
+
+                if flags is None or flags.writeable:
+                    size += column.memory_usage(index=False, deep=True)
+
+            return int(size)
+
+        # Decoded JSON is larger than its text; use the file size as a floor
+        return max(sys.getsizeof(data), file_size)
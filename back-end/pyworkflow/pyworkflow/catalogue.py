@@ -0,0 +1,138 @@
+import hashlib
+import importlib
+import os
+import sys
+import threading
+
+from .registry import node_registry
+
+
+class NodeCatalogue:
+    """Cache of the installed Node list, by Node directory.
+
+    Building the list imports every Node module, and scans modules with
+    missing packages using `ModuleFinder`. The list is only rebuilt when the
+    directory's signature changes: the relative path of every sub-directory,
+    and the relative path, modification time, and size of every Python file;
+    or when the installed packages providing Nodes change. Changed modules
+    that were already imported are reloaded first, and their classes
+    replaced in `node_registry`, so edits to Nodes show up without
+    restarting the server. A reload changes the ETag of every cached list.
+
+    The cached list is shared between callers, and must not be modified.
+
+    Attributes:
+        hits: Number of requests served from the cache
+        misses: Number of requests that rebuilt the list
+    """
+
+    PACKAGE = 'pyworkflow.nodes'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+        # Number of times Node modules were reloaded; part of every ETag
+        self._generation = 0
+
+    def get(self, root_path, builder, packages=()):
+        """Retrieve the Node list for `root_path`, building it if changed.
+
+        Args:
+            root_path: Node directory
+            builder: Called without arguments to build the list on a miss
+            packages: Installed packages providing Nodes, with their
+                versions, e.g. ['my-nodes==1.0']; part of the list's version
+
+        Returns:
+            Tuple of the Node list, and an ETag identifying its version
+
+        Raises:
+            OSError: `root_path` does not exist
+        """
+        signature = NodeCatalogue.signature(root_path)
+        packages = tuple(packages)
+
+        with self._lock:
+            entry = self._entries.get(root_path)
+
+            if entry is not None and entry[0] == signature and entry[3] == packages:
+                self.hits += 1
+                return entry[1], entry[2]
+
+            self.misses += 1
+
+        if entry is not None and NodeCatalogue.reload_changed(entry[0], signature):
+            # Lists of other directories may include the reloaded Nodes
+            with self._lock:
+                self._entries.clear()
+                self._generation += 1
+
+        data = builder()
+
+        with self._lock:
+            etag = hashlib.sha1(repr((signature, packages, self._generation)).encode()).hexdigest()
+            self._entries[root_path] = (signature, data, etag, packages)
+
+        return data, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def signature(root_path):
+        """Stat every sub-directory and Python file under `root_path`."""
+        entries = list()
+
+        for dir_path, dir_names, file_names in os.walk(root_path):
+            dir_names[:] = sorted(name for name in dir_names if name != '__pycache__')
+
+            # A directory's mtime changes with any file in it, so only its
+            # name is recorded
+            for name in dir_names:
+                entries.append((os.path.relpath(os.path.join(dir_path, name), root_path), None, None))
+
+            for name in sorted(file_names):
+                if name.endswith('.py'):
+                    path = os.path.join(dir_path, name)
+                    stat = os.stat(path)
+                    entries.append((os.path.relpath(path, root_path), stat.st_mtime_ns, stat.st_size))
+
+        if not entries and not os.path.isdir(root_path):
+            raise FileNotFoundError("No Node directory '%s'" % root_path)
+
+        return tuple(entries)
+
+    @staticmethod
+    def reload_changed(old_signature, new_signature):
+        """Reload imported Node modules whose files changed.
+
+        Returns:
+            Names of the modules reloaded, or removed from `sys.modules` if
+            they failed to reload
+        """
+        importlib.invalidate_caches()
+        reloaded = list()
+
+        for relative_path, _, _ in set(new_signature) - set(old_signature):
+            if not relative_path.endswith('.py'):
+                continue
+
+            module_name = '.'.join([NodeCatalogue.PACKAGE] + relative_path[:-3].split(os.sep))
+            module = sys.modules.get(module_name)
+
+            if module is not None:
+                try:
+                    importlib.reload(module)
+                except Exception:
+                    # Reported by `WorkflowUtils.extract_node_info()`
+                    sys.modules.pop(module_name, None)
+
+                node_registry.reloaded(module_name)
+                reloaded.append(module_name)
+
+        return reloaded
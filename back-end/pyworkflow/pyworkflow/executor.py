@@ -0,0 +1,198 @@
+import concurrent.futures
+import os
+
+import networkx as nx
+
+from .node import NodeException
+from .planner import ExecutionPlan
+from .workflow import WorkflowException
+
+
+def execute_step(workflow, step, chunksize=None):
+    """Execute one PlanStep of `workflow`.
+
+    Module-level so it can be pickled and sent to a process pool. Workers
+    execute a snapshot of the Workflow (see `WorkflowExecutor`), so each
+    executed Node's graph attributes (e.g., its cache key) are returned
+    alongside it to be copied back. Exceptions are returned, not raised, with
+    the Nodes that failed.
+
+    Returns:
+        Tuple of a list of (executed Node, dict of its graph attributes)
+        tuples; a list of failed node_ids; and the exception raised, or None
+    """
+    try:
+        if step.streamed:
+            executed_nodes = workflow.execute_stream(step.node_ids, chunksize)
+        else:
+            executed_nodes = workflow.execute_segment(step.node_ids, step.store)
+        failed, exception = list(), None
+    except (NodeException, WorkflowException) as e:
+        executed_nodes = [workflow.get_node(node_id) for node_id in step.node_ids
+                          if workflow.get_node_state(node_id) == workflow.FRESH]
+        failed = [node_id for node_id in step.node_ids
+                  if workflow.get_node_state(node_id) == workflow.FAILED]
+        exception = e
+
+    executed = [(node, dict(workflow.graph.nodes[node.node_id])) for node in executed_nodes]
+    return executed, failed, exception
+
+
+class WorkflowExecutor:
+    """Executes Workflow Nodes in parallel, in dependency order.
+
+    Before executing, an ExecutionPlan groups the Nodes into steps; see
+    `planner.ExecutionPlan`. Steps are scheduled onto a thread (or process)
+    pool as soon as all of their predecessors have finished executing.
+    Independent branches of the graph therefore run concurrently, instead of
+    one by one in topological order.
+
+    Each step executes on a snapshot of the Workflow, taken when it is
+    submitted, whether in a thread or a process: workers never change the
+    Workflow. Their results are saved back to it from the scheduling thread,
+    one step at a time.
+
+    If a Node fails, all of its descendants are skipped; independent branches
+    continue to execute.
+
+    Attributes:
+        workflow: The Workflow to execute
+        max_workers: Size of the pool. Defaults to the number of CPUs.
+        use_processes: Use a process pool instead of a thread pool. The
+            Workflow must then be picklable (e.g., no stdin/stdout options).
+        chunksize: Rows per chunk, to stream chains of chunk-capable Nodes
+            (e.g., Read CSV -> Filter -> Write CSV). None disables streaming.
+        inspect: Nodes whose output must be stored, even if optimized away
+        optimize: False, to execute and store every Node on its own
+        executed: dict of executed Node objects, indexed by node_id
+        failed: dict of exceptions raised, indexed by node_id
+        skipped: set of node_ids not executed because a predecessor failed
+        plan: The ExecutionPlan of the last run
+    """
+
+    def __init__(self, workflow, max_workers=None, use_processes=False, chunksize=None,
+                 inspect=None, optimize=True):
+        self.workflow = workflow
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.chunksize = chunksize
+        self.inspect = inspect
+        self.optimize = optimize
+
+        self.executed = dict()
+        self.failed = dict()
+        self.skipped = set()
+        self.plan = None
+
+    def run(self, node_ids=None):
+        """Execute Nodes of the Workflow.
+
+        Args:
+            node_ids: Nodes to execute. Defaults to every Node in the graph.
+                Predecessors outside of this collection are assumed to have
+                already been executed, unless their output is missing.
+
+        Returns:
+            dict of executed Node objects, indexed by node_id
+
+        Raises:
+            WorkflowException: graph is not a DAG
+        """
+        graph = self.workflow.graph
+        self.plan = ExecutionPlan(self.workflow, node_ids, inspect=self.inspect,
+                                  chunksize=self.chunksize, optimize=self.optimize)
+
+        # Number of unfinished predecessors each Node is waiting on
+        to_execute = set(self.plan.node_ids)
+        waiting_on = {
+            node_id: sum(1 for p in graph.predecessors(node_id) if p in to_execute)
+            for node_id in to_execute
+        }
+        steps = {step.head: step for step in self.plan.steps}
+
+        if self.use_processes:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+
+        with pool:
+            running = dict()
+
+            for step in self.plan.steps:
+                if waiting_on[step.head] == 0:
+                    running[self._submit(pool, step)] = step
+
+            while running:
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    step = running.pop(future)
+
+                    if not self._collect(step, future):
+                        # Nothing downstream of a failed Node can run
+                        not_executed = set(step.node_ids) - set(self.executed) - set(self.failed)
+                        self.skipped.update(not_executed | (nx.descendants(graph, step.tail) & to_execute))
+                        continue
+
+                    # Only the last Node of a step has successors outside of it
+                    for successor_id in graph.successors(step.tail):
+                        if successor_id not in to_execute:
+                            continue
+
+                        waiting_on[successor_id] -= 1
+
+                        if waiting_on[successor_id] == 0 and successor_id not in self.skipped:
+                            running[self._submit(pool, steps[successor_id])] = steps[successor_id]
+
+        return self.executed
+
+    def _submit(self, pool, step):
+        for node_id in step.node_ids:
+            self.node_started(node_id)
+
+        return pool.submit(execute_step, self.workflow.snapshot(), step, self.chunksize)
+
+    def _collect(self, step, future):
+        """Save the results of a finished step back to the Workflow.
+
+        Returns:
+            True if every Node executed successfully; False otherwise.
+        """
+        executed, failed, exception = future.result()
+
+        for executed_node, graph_attributes in executed:
+            node_info = self.workflow.graph.nodes[executed_node.node_id]
+            previous_key = node_info.get('cache_key')
+            node_info.update(graph_attributes)
+
+            # The worker only marked descendants stale in its snapshot
+            if previous_key is None or previous_key != node_info.get('cache_key'):
+                self.workflow.mark_stale(executed_node.node_id, include_node=False)
+
+            self.workflow.update_or_add_node(executed_node)
+            self.executed[executed_node.node_id] = executed_node
+            self.node_finished(executed_node)
+
+        if exception is None:
+            return True
+
+        for node_id in failed:
+            self.workflow.set_node_state(node_id, self.workflow.FAILED)
+            self.workflow.mark_stale(node_id, include_node=False)
+
+            self.failed[node_id] = exception
+            self.node_failed(node_id, exception)
+
+        return False
+
+    def node_started(self, node_id):
+        """Called when a Node is submitted for execution. Override to log."""
+        pass
+
+    def node_finished(self, node):
+        """Called when a Node has executed successfully. Override to log."""
+        pass
+
+    def node_failed(self, node_id, exception):
+        """Called when a Node raises an exception. Override to log."""
+        pass
@@ -0,0 +1,249 @@
+import io
+import os
+import zlib
+
+from . import serialization, storage
+
+
+# Extension and content type of each download format
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+COMPRESSIONS = {
+    'gzip': ('.gz', 'application/gzip'),
+    'zstd': ('.zst', 'application/zstd'),
+}
+
+# Rows converted at a time; bounds the memory a download uses
+BATCH_ROWS = 50000
+
+# Bytes read at a time from a file streamed as-is
+CHUNK_SIZE = 64 * 1024
+
+
+class DataExport:
+    """Stored Node data, converted to a download format as it is streamed.
+
+    Iterating a DataExport yields the converted, and optionally compressed,
+    bytes. Rows are read from the stored file `batch_rows` at a time, and
+    each batch is converted and compressed before the next is read, so
+    memory use depends on the batch size, not the size of the data. Data
+    stored as JSON cannot be read in parts, so is decoded whole first.
+
+    The index is written, as the first columns, unless it is a RangeIndex.
+
+    Attributes:
+        file_path: Location of the stored data
+        data_format: NodeDataFormat the data is stored in
+        export_format: 'csv', 'jsonl' (one JSON object per row), or 'parquet'
+        compression: 'gzip', 'zstd', or None
+        batch_rows: Number of rows to convert at a time
+    """
+
+    def __init__(self, file_path, data_format, export_format='csv', compression=None, batch_rows=BATCH_ROWS):
+        check_format(export_format)
+        check_compression(compression)
+
+        self.file_path = file_path
+        self.data_format = data_format
+        self.export_format = export_format
+        self.compression = compression
+        self.batch_rows = batch_rows
+
+    @property
+    def extension(self):
+        """File extension of the download, e.g. '.csv.gz'."""
+        return EXPORT_FORMATS[self.export_format][0] + compressed_extension(self.compression)
+
+    @property
+    def content_type(self):
+        if self.compression is not None:
+            return COMPRESSIONS[self.compression][1]
+
+        return EXPORT_FORMATS[self.export_format][1]
+
+    def filename(self, name):
+        """Name for the download of data stored as `name`."""
+        return os.path.splitext(os.path.basename(name))[0] + self.extension
+
+    def __iter__(self):
+        if self.export_format == 'parquet':
+            chunks = self.encode_parquet()
+        else:
+            chunks = self.encode_text()
+
+        return compress(chunks, self.compression)
+
+    def frames(self):
+        """Read the data as DataFrames of at most `batch_rows` rows."""
+        if not self.data_format.sliceable:
+            frame = storage.as_dataframe(self.data_format.read(self.file_path))
+
+            if frame is None:
+                raise ValueError('Node data is not a table')
+
+            # JSON keys are text; '0', '1', ... was a RangeIndex
+            if list(frame.index) == [str(i) for i in range(len(frame))]:
+                frame = frame.reset_index(drop=True)
+
+            for start in range(0, max(len(frame), 1), self.batch_rows):
+                yield frame.iloc[start:start + self.batch_rows]
+
+            return
+
+        index = self.data_format.read_schema_metadata(self.file_path)['index']
+        position = 0
+
+        for table in self.data_format.iter_batches(self.file_path, self.batch_rows):
+            yield storage.arrow_to_frame(table, index, range(position, position + table.num_rows))
+            position += table.num_rows
+
+    def encode_text(self):
+        first = True
+
+        for frame in self.frames():
+            keep_index = DataExport.keep_index(frame)
+
+            if self.export_format == 'csv':
+                text = frame.to_csv(header=first, index=keep_index)
+            elif len(frame):
+                text = (frame.reset_index() if keep_index else frame).to_json(orient='records', lines=True)
+                text = text if text.endswith('\n') else text + '\n'
+            else:
+                text = ''
+
+            first = False
+
+            if text:
+                yield text.encode('utf-8')
+
+    def encode_parquet(self):
+        """Write each batch as a Parquet row group, yielding the bytes written.
+
+        Data stored by pyarrow is written without converting it to pandas.
+        """
+        import pyarrow as pa
+        from pyarrow import parquet
+
+        if self.data_format.sliceable:
+            tables = self.data_format.iter_batches(self.file_path, self.batch_rows)
+        else:
+            tables = (pa.Table.from_pandas(frame, preserve_index=DataExport.keep_index(frame))
+                      for frame in self.frames())
+
+        buffer = OutputBuffer()
+        writer = None
+
+        for table in tables:
+            if writer is None:
+                writer = parquet.ParquetWriter(buffer, table.schema)
+            else:
+                table = table.cast(writer.schema)
+
+            writer.write_table(table)
+            yield buffer.drain()
+
+        writer.close()
+        yield buffer.drain()
+
+    @staticmethod
+    def keep_index(frame):
+        import pandas as pd
+
+        return not isinstance(frame.index, pd.RangeIndex)
+
+
+class OutputBuffer(io.RawIOBase):
+    """Write-only file collecting bytes until they are drained.
+
+    Lets a writer that expects a file (e.g., pyarrow's ParquetWriter) be
+    streamed: after each write, `drain()` returns what was written so far.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = list()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = list()
+        return data
+
+
+def read_file(f, chunk_size=CHUNK_SIZE):
+    """Read an open binary file in chunks, then close it."""
+    try:
+        while True:
+            chunk = f.read(chunk_size)
+
+            if not chunk:
+                return
+
+            yield chunk
+    finally:
+        f.close()
+
+
+def compress(chunks, compression=None):
+    """Compress a stream of bytes as it is read.
+
+    Args:
+        chunks: Iterable of bytes
+        compression: 'gzip', 'zstd', or None to pass `chunks` through
+
+    Raises:
+        ValueError: unknown compression, or `zstandard` is not installed
+    """
+    check_compression(compression)
+
+    if compression is None:
+        yield from chunks
+        return
+
+    if compression == 'zstd':
+        compressor = serialization.zstd_module().ZstdCompressor().compressobj()
+    else:
+        # wbits=31 writes a gzip header and trailer
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def compressed_extension(compression):
+    return COMPRESSIONS[compression][0] if compression is not None else ''
+
+
+def check_format(export_format):
+    """Raise a ValueError if `export_format` is unknown."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("Unknown format '%s'. Choose from: %s" % (export_format, ', '.join(EXPORT_FORMATS)))
+
+
+def check_compression(compression):
+    """Raise a ValueError if `compression` is unknown or unavailable."""
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError("Unknown compression '%s'. Choose from: %s" % (compression, ', '.join(COMPRESSIONS)))
+
+    if compression == 'zstd':
+        serialization.zstd_module()
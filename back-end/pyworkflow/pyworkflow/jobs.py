@@ -0,0 +1,286 @@
+import concurrent.futures
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from .executor import WorkflowExecutor
+from .workflow import WorkflowException
+
+
+class Job:
+    """A run of a Workflow on a background thread, and its progress.
+
+    Each Node in the run is 'pending', 'running', 'finished', 'failed', or
+    'skipped' (a predecessor failed, or the Node was optimized away). The
+    Job itself is 'queued', 'running', 'finished', or 'failed' if any Node
+    failed or the Workflow could not be executed.
+
+    Each change is also recorded as an event, e.g. for the UI to follow the
+    run live; see `wait_for_events()`.
+
+    The Job executes a snapshot of the Workflow, taken when the Job is
+    created, so the Workflow can keep changing during the run. The results
+    are then applied to the Workflow while holding its lock (see
+    `Workflow.apply_results()`).
+
+    Attributes:
+        job_id: Unique id of the Job
+        owner: Identifies who started the Job, e.g. a session key
+        workflow: The Workflow to execute
+        snapshot: The copy of the Workflow being executed
+        options: Keyword arguments for the WorkflowExecutor
+        node_ids: Nodes to execute, or None for every Node
+        status: Status of the Job
+        nodes: dict of each Node's status, times, output rows and error, by
+            node_id
+        error: Why the Job failed, if it did
+        created: When the Job was queued, in seconds since the epoch
+        started: When the Job started running
+        finished: When the Job finished
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    FAILED = 'failed'
+
+    # Event names, by Node status
+    NODE_EVENTS = {
+        'running': 'node-started',
+        'finished': 'node-finished',
+        'failed': 'node-failed',
+        'skipped': 'node-skipped',
+    }
+
+    def __init__(self, workflow, owner=None, node_ids=None, **options):
+        self.job_id = uuid.uuid4().hex
+        self.owner = owner
+        self.workflow = workflow
+        self.snapshot = workflow.snapshot()
+        self.options = options
+        self.node_ids = node_ids
+
+        self.status = Job.QUEUED
+        self.nodes = OrderedDict()
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+        self._events = list()
+        self._lock = threading.Lock()
+        self._event_added = threading.Condition(self._lock)
+
+    @property
+    def done(self):
+        return self.status in (Job.FINISHED, Job.FAILED)
+
+    def run(self):
+        """Execute the Workflow, recording the progress of each Node.
+
+        Exceptions are recorded on the Job, not raised.
+        """
+        with self._lock:
+            self.status = Job.RUNNING
+            self.started = time.time()
+
+        try:
+            node_ids = self.node_ids if self.node_ids is not None else self.snapshot.execution_order()
+
+            with self._lock:
+                for node_id in node_ids:
+                    self.nodes[node_id] = Job.new_node('pending')
+
+            executor = JobExecutor(self, self.snapshot, **self.options)
+            executor.run(node_ids)
+
+            with self.workflow.lock:
+                self.workflow.apply_results(self.snapshot)
+
+            if executor.failed:
+                reasons = ['%s (%s)' % (node_id, e) for node_id, e in executor.failed.items()]
+                error = 'Nodes failed to execute: ' + ', '.join(reasons)
+            else:
+                error = None
+        except WorkflowException as e:
+            error = e.reason
+        except Exception as e:
+            # Nothing else would report an exception raised on a worker thread
+            error = '%s: %s' % (type(e).__name__, e)
+
+        for node_id, node in list(self.nodes.items()):
+            if node['status'] in ('pending', 'running'):
+                self.node_changed(node_id, 'skipped')
+
+        with self._lock:
+            self.error = error
+            self.status = Job.FAILED if error else Job.FINISHED
+            self.finished = time.time()
+
+            self._add_event('job-' + self.status, {
+                'status': self.status,
+                'duration': self.finished - self.started,
+                'error': self.error,
+            })
+
+    def node_changed(self, node_id, status, error=None, rows=None):
+        """Record a change in a Node's status, as an event.
+
+        Args:
+            node_id: The Node
+            status: 'running', 'finished', 'failed', or 'skipped'
+            error: Why the Node failed
+            rows: Number of rows the Node output
+        """
+        now = time.time()
+
+        with self._lock:
+            node = self.nodes.setdefault(node_id, Job.new_node(status))
+            node['status'] = status
+
+            if status == 'running':
+                node['started'] = now
+            elif status != 'skipped':
+                node['finished'] = now
+                node['duration'] = now - node['started'] if node['started'] else None
+                node['rows'] = rows
+                node['error'] = error
+
+            self._add_event(Job.NODE_EVENTS[status], dict(node, node_id=node_id))
+
+    def wait_for_events(self, after=0, timeout=None):
+        """Retrieve events, waiting for one if there are none yet.
+
+        Each event is a dict with an 'id' (numbered from 1), an 'event' name,
+        e.g. 'node-finished', and its 'data'. The last event is
+        'job-finished' or 'job-failed'.
+
+        Args:
+            after: Only return events with a greater id
+            timeout: Seconds to wait for an event; None waits until one
+                happens or the Job is done
+
+        Returns:
+            list of events; empty if the timeout expired, or the Job is done
+            and there are no more events
+        """
+        with self._event_added:
+            self._event_added.wait_for(lambda: len(self._events) > after or self.done, timeout)
+            return self._events[after:]
+
+    def _add_event(self, event, data):
+        self._events.append({'id': len(self._events) + 1, 'event': event, 'data': data})
+        self._event_added.notify_all()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+                'duration': self.finished - self.started if self.finished and self.started else None,
+                'error': self.error,
+                'nodes': {node_id: dict(node) for node_id, node in self.nodes.items()},
+            }
+
+    @staticmethod
+    def new_node(status):
+        return {'status': status, 'started': None, 'finished': None, 'duration': None, 'rows': None, 'error': None}
+
+
+class JobExecutor(WorkflowExecutor):
+    """WorkflowExecutor reporting each Node's progress to a Job."""
+
+    def __init__(self, job, workflow, **options):
+        super().__init__(workflow, **options)
+        self.job = job
+
+    def node_started(self, node_id):
+        self.job.node_changed(node_id, 'running')
+
+    def node_finished(self, node):
+        self.job.node_changed(node.node_id, 'finished', rows=self.workflow.get_node_rows(node.node_id))
+
+    def node_failed(self, node_id, exception):
+        self.job.node_changed(node_id, 'failed', str(exception))
+
+
+class JobQueue:
+    """Runs Jobs on a pool of background threads.
+
+    Requests only queue a Job and return, so their latency does not depend
+    on how long a Workflow takes to execute, and a run carries on if the
+    client disconnects. Progress is polled with `get()`.
+
+    Only one Job per Workflow runs at a time. Finished Jobs are kept, for
+    their results to be polled, until `max_jobs` newer Jobs exist.
+
+    Attributes:
+        max_workers: Number of Jobs to run at once
+        max_jobs: Number of Jobs to keep
+    """
+
+    def __init__(self, max_workers=2, max_jobs=100):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def submit(self, job, callback=None):
+        """Queue a Job to run in the background.
+
+        Args:
+            job: The Job to run
+            callback: Called with the Job once it is done, e.g. to save the
+                executed Workflow
+
+        Returns:
+            The Job
+
+        Raises:
+            WorkflowException: a Job is already running the same Workflow
+        """
+        with self._lock:
+            for other in self._jobs.values():
+                if other.workflow is job.workflow and not other.done:
+                    raise WorkflowException('run workflow', 'Workflow is already running as job %s' % other.job_id)
+
+            self._jobs[job.job_id] = job
+
+            # Evict the oldest finished Jobs
+            for job_id in [job_id for job_id, other in self._jobs.items() if other.done]:
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                del self._jobs[job_id]
+
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                                   thread_name_prefix='pyworkflow-job')
+
+            self._pool.submit(JobQueue._run, job, callback)
+
+        return job
+
+    def get(self, job_id):
+        """Retrieve a Job, or None if it does not exist."""
+        return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    @staticmethod
+    def _run(job, callback):
+        job.run()
+
+        if callback is not None:
+            callback(job)
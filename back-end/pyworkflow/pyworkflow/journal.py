@@ -0,0 +1,164 @@
+import json
+import os
+
+
+class ChangeLog:
+    """Nodes, edges, and attributes of a Workflow changed since it was saved.
+
+    Only which items changed is recorded; `entries()` reads their current
+    state from the Workflow. A Node updated many times is therefore written
+    once, and the size of the entries depends only on what changed.
+
+    Attributes:
+        nodes: set of changed (graph name, node_id); graph name is 'graph'
+            or 'flow_vars'
+        edges: set of changed (from_id, to_id) in the graph
+        renamed: Whether the Workflow's name changed
+        snapshot: Whether the changes cannot be journaled (e.g., a write
+            failed), so the whole Workflow must be saved
+    """
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = set()
+        self.renamed = False
+        self.snapshot = False
+
+    def __bool__(self):
+        return bool(self.nodes or self.edges or self.renamed or self.snapshot)
+
+    def entries(self, workflow):
+        """Journal entries to bring a saved copy of `workflow` up to date.
+
+        Entries are ordered so that they can be applied in sequence: Node
+        additions and updates first, then edge changes, then Node removals.
+        """
+        updates, removals, edges = list(), list(), list()
+
+        if self.renamed:
+            updates.append({"op": "name", "name": workflow.name})
+
+        for graph_name, node_id in sorted(self.nodes):
+            graph = getattr(workflow, graph_name)
+
+            if graph.has_node(node_id):
+                updates.append({"op": "node", "graph": graph_name, "id": node_id, "attrs": dict(graph.nodes[node_id])})
+            else:
+                removals.append({"op": "remove_node", "graph": graph_name, "id": node_id})
+
+        for from_id, to_id in sorted(self.edges):
+            op = "edge" if workflow.graph.has_edge(from_id, to_id) else "remove_edge"
+            edges.append({"op": op, "from": from_id, "to": to_id})
+
+        # Edge removals before additions, so a Node can be re-linked
+        edges.sort(key=lambda entry: entry["op"] == "edge")
+
+        return updates + edges + removals
+
+
+class WorkflowJournal:
+    """Append-only file of changes to a saved Workflow.
+
+    Saving a Workflow in full costs time and space proportional to the
+    graph. Instead, a snapshot of the Workflow is saved once, and each later
+    save appends only the entries from its `ChangeLog`, one JSON object per
+    line. Loading the snapshot and applying the journal restores the
+    Workflow; once the journal grows, it is compacted into a new snapshot
+    and started afresh.
+
+    Entries record the state of each changed item, not the operation, so
+    applying an entry twice is harmless.
+
+    Attributes:
+        path: Location of the journal file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def create(self):
+        """Start an empty journal, replacing any existing file."""
+        with open(self.path, 'w'):
+            pass
+
+    def append(self, entries):
+        """Append entries to the journal.
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            OSError: the file could not be written
+        """
+        if not entries:
+            return 0
+
+        data = "".join(json.dumps(entry, separators=(',', ':')) + "\n" for entry in entries)
+
+        with open(self.path, 'a') as f:
+            f.write(data)
+
+        return len(data)
+
+    def read(self):
+        """Read all entries; a missing journal has none.
+
+        A last line left incomplete by an interrupted write is skipped.
+        """
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return list()
+
+        entries = list()
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+
+        return entries
+
+    def count(self):
+        return len(self.read())
+
+    def apply(self, workflow):
+        """Apply every entry to a Workflow loaded from the snapshot.
+
+        Returns:
+            Number of entries applied
+        """
+        entries = self.read()
+
+        for entry in entries:
+            WorkflowJournal.apply_entry(workflow, entry)
+
+        return len(entries)
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def apply_entry(workflow, entry):
+        op = entry.get("op")
+
+        if op == "name":
+            workflow.name = entry["name"]
+        elif op == "node":
+            graph = getattr(workflow, entry["graph"])
+            graph.add_node(entry["id"])
+            graph.nodes[entry["id"]].clear()
+            graph.nodes[entry["id"]].update(entry["attrs"])
+        elif op == "remove_node":
+            graph = getattr(workflow, entry["graph"])
+            if graph.has_node(entry["id"]):
+                graph.remove_node(entry["id"])
+        elif op == "edge":
+            workflow.graph.add_edge(entry["from"], entry["to"])
+        elif op == "remove_edge":
+            if workflow.graph.has_edge(entry["from"], entry["to"]):
+                workflow.graph.remove_edge(entry["from"], entry["to"])
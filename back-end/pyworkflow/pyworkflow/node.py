@@ -4,10 +4,17 @@ import io
 class Node:
     """Node object
 
+    Row-wise Nodes may set `chunkable`, and implement `execute_chunks()`, to
+    be executed in streaming mode; see `Workflow.execute_stream()`.
+
+    Nodes that read source data, or have side effects (e.g., writing a
+    file), override `execute_preview()`; see `Workflow.execute_preview()`.
     """
     options = Options()
     option_types = OptionTypes()
 
+    chunkable = False
+
     def __init__(self, node_info):
         self.name = node_info.get('name')
         self.node_id = node_info.get('node_id')
@@ -17,7 +24,7 @@ class Node:
         self.filename = node_info.get('filename')
         self.is_global = node_info.get('is_global') is True
 
-        self.option_values = dict()
+        self.option_values = OptionValues()
         if node_info.get("options"):
             self.option_values.update(node_info["options"])
 
@@ -28,13 +35,49 @@ class Node:
     def execute(self, predecessor_data, flow_vars):
         raise NotImplementedError()
 
+    def execute_chunks(self, predecessor_chunks, flow_vars, chunksize):
+        """Execute the Node on a stream of DataFrame chunks.
+
+        Only called for Nodes with `chunkable` set. Each chunk must be
+        processed independently of the others, so that the whole dataset is
+        never held in memory.
+
+        Args:
+            predecessor_chunks: Iterator of DataFrame chunks from the preceding
+                Node, or None if the Node has no inputs.
+            flow_vars: Options to use for execution
+            chunksize: Number of rows per chunk, for Nodes that read data
+
+        Yields:
+            Output DataFrame chunks
+        """
+        raise NotImplementedError()
+
+    def execute_preview(self, predecessor_data, flow_vars, sample):
+        """Execute the Node for a preview of the Workflow.
+
+        By default, executes the Node as usual, on its (sampled) input data.
+        Nodes that read source data override this to read only `sample`;
+        Nodes with side effects override it to skip them.
+
+        Args:
+            predecessor_data: Preview output of the preceding Nodes
+            flow_vars: Options to use for execution
+            sample: The Sample to read, for Nodes that read data
+
+        Returns:
+            Output, as for `execute()`
+        """
+        return self.execute(predecessor_data, flow_vars)
+
     def get_execution_options(self, workflow, flow_nodes):
         """Replace Node options with flow variables.
 
         If the user has specified any flow variables to replace Node options,
         perform the replacement and return a dict with all options to use for
         execution. If no flow variables are included, this method will return
-        a copy of all Node options.
+        a copy of all Node options. Node options are never modified; any
+        replaced option is a clone with the new value.
 
         For any 'file' options, the value will be replaced with a path based on
         the Workflow's root directory.
@@ -54,16 +97,16 @@ class Node:
 
             if key in flow_nodes:
                 replacement_value = flow_nodes[key].get_replacement_value()
-                option.set_value(replacement_value)
+                option = option.clone(replacement_value)
             else:
                 replacement_value = option.get_value()
 
-            if key == 'file' and type(replacement_value) == io.TextIOWrapper:
+            if key == 'file' and isinstance(replacement_value, io.TextIOWrapper):
                 # For files specified via stdin/stdout, store directly
-                option.set_value(replacement_value)
+                option = option.clone(replacement_value)
             elif key == 'file':
                 # Otherwise, point to filepath stored in Workflow directory
-                option.set_value(workflow.path(replacement_value))
+                option = option.clone(workflow.path(replacement_value))
 
             execution_options[key] = option
 
@@ -157,6 +200,7 @@ class VizNode(Node):
 
 class NodeException(Exception):
     def __init__(self, action: str, reason: str):
+        super().__init__(action, reason)
         self.action = action
         self.reason = reason
 
@@ -1,6 +1,9 @@
-from .nodes import *
+from .registry import node_registry, BUILTIN_NODES
 import importlib
 
+# Built-in node_types; any other type is looked up in `custom_nodes`
+BUILTIN_NODE_TYPES = {node_type for node_type, _ in BUILTIN_NODES}
+
 
 def node_factory(node_info):
     # Create a new Node with info
@@ -8,56 +11,14 @@ def node_factory(node_info):
     node_type = node_info.get('node_type')
     node_key = node_info.get('node_key')
 
-    if node_type == 'io':
-        new_node = io_node(node_key, node_info)
-    elif node_type == 'manipulation':
-        new_node = manipulation_node(node_key, node_info)
-    elif node_type == 'flow_control':
-        new_node = flow_node(node_key, node_info)
-    elif node_type == 'visualization':
-        new_node = visualization_node(node_key, node_info)
-    else:
-        new_node = custom_node(node_key, node_info)
-
-    return new_node
-
-
-def flow_node(node_key, node_info):
-    if node_key == 'StringNode':
-        return StringNode(node_info)
-    elif node_key == 'IntegerNode':
-        return IntegerNode(node_info)
-    else:
-        return None
-
+    node_class = node_registry.get(node_type, node_key)
 
-def io_node(node_key, node_info):
-    if node_key == 'ReadCsvNode':
-        return ReadCsvNode(node_info)
-    elif node_key == 'TableCreatorNode':
-        return TableCreatorNode(node_info)
-    elif node_key == 'WriteCsvNode':
-        return WriteCsvNode(node_info)
-    else:
-        return None
-
-
-def manipulation_node(node_key, node_info):
-    if node_key == 'JoinNode':
-        return JoinNode(node_info)
-    elif node_key == 'PivotNode':
-        return PivotNode(node_info)
-    elif node_key == 'FilterNode':
-        return FilterNode(node_info)
-    else:
+    if node_class is not None:
+        return node_class(node_info)
+    elif node_type in BUILTIN_NODE_TYPES:
         return None
-
-
-def visualization_node(node_key, node_info):
-    if node_key == 'GraphNode':
-        return GraphNode(node_info)
     else:
-        return None
+        return custom_node(node_key, node_info)
 
 
 def custom_node(node_key, node_info):
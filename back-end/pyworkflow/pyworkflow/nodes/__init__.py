@@ -1,4 +1,4 @@
-from .flow_control import *
-from .io import *
-from .manipulation import *
-from .visualization import *
+# Node classes are imported on first use; see `pyworkflow.registry`
+from pyworkflow.registry import lazy_nodes
+
+__getattr__, __all__ = lazy_nodes()
@@ -1,2 +1,3 @@
-from .string_input import StringNode
-from .integer_input import IntegerNode
+from pyworkflow.registry import lazy_nodes
+
+__getattr__, __all__ = lazy_nodes('flow_control')
@@ -1,3 +1,3 @@
-from .read_csv import ReadCsvNode
-from .write_csv import WriteCsvNode
-from .table_creator import TableCreatorNode
+from pyworkflow.registry import lazy_nodes
+
+__getattr__, __all__ = lazy_nodes('io')
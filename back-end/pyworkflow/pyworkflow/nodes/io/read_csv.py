@@ -2,6 +2,8 @@ from pyworkflow.node import IONode, NodeException
 from pyworkflow.parameters import *
 
 import pandas as pd
+import csv
+import importlib.util
 
 
 class ReadCsvNode(IONode):
@@ -9,6 +11,18 @@ class ReadCsvNode(IONode):
 
     Reads a CSV file into a pandas DataFrame.
 
+    Files are parsed with pandas' C parser by default. The 'pyarrow' engine
+    opts in to pyarrow's multithreaded reader, when it is installed (and
+    pandas supports it), unless an option requires the C parser
+    (`memory_map`, a delimiter longer than one character, or reading in
+    chunks), or the header row has blank or repeated names, which the two
+    parsers name differently. pyarrow infers some types differently, e.g.
+    dates as datetime64 rather than text, and 'NA' in a text column as None
+    rather than NaN, so it can change the output of downstream Nodes. The
+    'auto' engine, kept for workflows saved with it, is the C parser.
+    Reading only some columns (`usecols`), and giving their types (`dtype`)
+    rather than inferring them, speeds up either engine.
+
     Raises:
          NodeException: any error reading CSV file, converting
             to DataFrame.
@@ -34,15 +48,178 @@ class ReadCsvNode(IONode):
             default="infer",
             docstring="Row number containing column names (0-indexed)"
         ),
+        "engine": SelectParameter(
+            "Parser",
+            options=["c", "pyarrow", "python", "auto"],
+            default="c",
+            docstring="CSV parser; 'pyarrow' is multithreaded, but infers some column types differently"
+        ),
+        "usecols": StringParameter(
+            "Columns",
+            default="",
+            docstring="Comma-separated columns to read; blank for all"
+        ),
+        "dtype": StringParameter(
+            "Column Types",
+            default="",
+            docstring="Comma-separated column:type pairs (e.g. id:int64, name:string), instead of inferring types"
+        ),
+        "memory_map": BooleanParameter(
+            "Memory Map",
+            default=False,
+            docstring="Map the file into memory, instead of reading it (C parser only)"
+        ),
+        "categories": BooleanParameter(
+            "Infer Categories",
+            default=False,
+            docstring="Store text columns with few distinct values as categories"
+        ),
     }
 
+    chunkable = True
+
+    # Text columns with at most this many distinct values per row are
+    # converted to categories
+    CATEGORY_RATIO = 0.5
+
     def execute(self, predecessor_data, flow_vars):
         try:
             df = pd.read_csv(
                 flow_vars["file"].get_value(),
-                sep=flow_vars["sep"].get_value(),
-                header=flow_vars["header"].get_value()
+                **self.read_options(flow_vars)
             )
-            return df.to_json()
+            return self.infer_categories(df, flow_vars)
+        except NodeException as e:
+            raise e
         except Exception as e:
             raise NodeException('read csv', str(e))
+
+    def execute_preview(self, predecessor_data, flow_vars, sample):
+        try:
+            if sample.method == 'head':
+                df = pd.read_csv(
+                    flow_vars["file"].get_value(),
+                    nrows=sample.rows,
+                    **self.read_options(flow_vars, chunked=True)
+                )
+                return self.infer_categories(df, flow_vars)
+
+            return sample.take_chunks(self.execute_chunks(None, flow_vars, sample.CHUNK_ROWS))
+        except NodeException as e:
+            raise e
+        except Exception as e:
+            raise NodeException('read csv', str(e))
+
+    def execute_chunks(self, predecessor_chunks, flow_vars, chunksize):
+        # Categories are not inferred: each chunk would have its own
+        try:
+            reader = pd.read_csv(
+                flow_vars["file"].get_value(),
+                chunksize=chunksize,
+                **self.read_options(flow_vars, chunked=True)
+            )
+
+            with reader:
+                yield from reader
+        except NodeException as e:
+            raise e
+        except Exception as e:
+            raise NodeException('read csv', str(e))
+
+    def read_options(self, flow_vars, chunked=False):
+        """Keyword arguments for `pd.read_csv()`.
+
+        Args:
+            flow_vars: Options to use for execution
+            chunked: Whether the file is read in chunks, or only its first
+                rows, which the pyarrow parser cannot do
+
+        Raises:
+            NodeException: invalid `usecols` or `dtype`
+        """
+        sep = flow_vars["sep"].get_value()
+        memory_map = flow_vars["memory_map"].get_value()
+        engine = flow_vars["engine"].get_value()
+
+        if engine == "auto":
+            engine = "c"
+        elif engine == "pyarrow":
+            use_pyarrow = (not (chunked or memory_map or len(sep) != 1)
+                           and flow_vars["header"].get_value() == "infer"
+                           and pyarrow_parser_available()
+                           and header_is_unique(flow_vars["file"].get_value(), sep))
+            engine = "pyarrow" if use_pyarrow else "c"
+
+        options = {
+            "sep": sep,
+            "header": flow_vars["header"].get_value(),
+            "engine": engine,
+        }
+
+        usecols = [column.strip() for column in flow_vars["usecols"].get_value().split(",") if column.strip()]
+        if usecols:
+            options["usecols"] = usecols
+
+        dtype = dict()
+        for pair in flow_vars["dtype"].get_value().split(","):
+            if not pair.strip():
+                continue
+
+            column, _, column_type = pair.rpartition(":")
+            if not column.strip() or not column_type.strip():
+                raise NodeException('read csv', "Invalid column type '%s'; expected column:type" % pair.strip())
+
+            dtype[column.strip()] = column_type.strip()
+        if dtype:
+            options["dtype"] = dtype
+
+        if memory_map:
+            options["memory_map"] = True
+
+        return options
+
+    def infer_categories(self, df, flow_vars):
+        """Convert text columns with few distinct values to categories.
+
+        Categories store each distinct value once, so use less memory, and
+        are faster to group, join and filter on.
+        """
+        if not flow_vars["categories"].get_value() or len(df) == 0:
+            return df
+
+        for column in df.select_dtypes(include="object").columns:
+            if df[column].nunique() <= len(df) * ReadCsvNode.CATEGORY_RATIO:
+                df[column] = df[column].astype("category")
+
+        return df
+
+
+def pyarrow_parser_available():
+    """Whether `pd.read_csv()` can use pyarrow's parser (pandas 1.4+).
+
+    pyarrow is only looked for, not imported; pandas imports it if used.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        return False
+
+    major, minor = (int(part) for part in pd.__version__.split(".")[:2])
+    return (major, minor) >= (1, 4)
+
+
+def header_is_unique(file_path, sep):
+    """Whether the first line of a CSV file names each column once.
+
+    Otherwise, e.g. for a column written from an unnamed index, the C
+    parser names columns 'Unnamed: 0', 'a.1', and so on, and the pyarrow
+    parser does not.
+    """
+    if not isinstance(file_path, str):
+        return False
+
+    try:
+        with open(file_path, newline='') as f:
+            names = next(csv.reader(f, delimiter=sep), [])
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return False
+
+    return all(names) and len(set(names)) == len(names)
@@ -43,6 +43,20 @@ class TableCreatorNode(IONode):
                 sep=flow_vars["sep"].get_value(),
                 header=flow_vars["header"].get_value()
             )
-            return df.to_json()
+            return df
+        except Exception as e:
+            raise NodeException('read csv', str(e))
+
+    def execute_preview(self, predecessor_data, flow_vars, sample):
+        try:
+            reader = pd.read_csv(
+                io.StringIO(flow_vars["input"].get_value()),
+                sep=flow_vars["sep"].get_value(),
+                header=flow_vars["header"].get_value(),
+                chunksize=sample.CHUNK_ROWS
+            )
+
+            with reader:
+                return sample.take_chunks(reader)
         except Exception as e:
             raise NodeException('read csv', str(e))
@@ -35,6 +35,8 @@ class WriteCsvNode(IONode):
         ),
     }
 
+    chunkable = True
+
     def execute(self, predecessor_data, flow_vars):
         try:
             # Convert JSON data to DataFrame
@@ -46,6 +48,33 @@ class WriteCsvNode(IONode):
                 sep=flow_vars["sep"].get_value(),
                 index=flow_vars["index"].get_value()
             )
-            return df.to_json()
+            return df
+        except Exception as e:
+            raise NodeException('write csv', str(e))
+
+    def execute_preview(self, predecessor_data, flow_vars, sample):
+        # A preview must not overwrite the file with a sample
+        try:
+            return pd.DataFrame.from_dict(predecessor_data[0])
+        except Exception as e:
+            raise NodeException('write csv', str(e))
+
+    def execute_chunks(self, predecessor_chunks, flow_vars, chunksize):
+        try:
+            # Truncate the file for the first chunk, then append without header
+            first_chunk = True
+
+            for df in predecessor_chunks:
+                df.to_csv(
+                    flow_vars["file"].get_value(),
+                    sep=flow_vars["sep"].get_value(),
+                    index=flow_vars["index"].get_value(),
+                    mode='w' if first_chunk else 'a',
+                    header=first_chunk
+                )
+                first_chunk = False
+                yield df
+        except NodeException as e:
+            raise e
         except Exception as e:
             raise NodeException('write csv', str(e))
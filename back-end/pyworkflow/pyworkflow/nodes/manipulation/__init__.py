@@ -1,3 +1,3 @@
-from .filter import FilterNode
-from .join import JoinNode
-from .pivot import PivotNode
+from pyworkflow.registry import lazy_nodes
+
+__getattr__, __all__ = lazy_nodes('manipulation')
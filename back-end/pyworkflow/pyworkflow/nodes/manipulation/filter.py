@@ -28,10 +28,36 @@ class FilterNode(ManipulationNode):
         )
     }
 
+    chunkable = True
+
     def execute(self, predecessor_data, flow_vars):
         try:
             input_df = pd.DataFrame.from_dict(predecessor_data[0])
-            output_df = pd.DataFrame.filter(input_df, **self.options)
-            return output_df.to_json()
+            output_df = pd.DataFrame.filter(input_df, **self.filter_kwargs(flow_vars))
+            return output_df
         except Exception as e:
             raise NodeException('filter', str(e))
+
+    def execute_chunks(self, predecessor_chunks, flow_vars, chunksize):
+        try:
+            filter_kwargs = self.filter_kwargs(flow_vars)
+
+            for input_df in predecessor_chunks:
+                yield pd.DataFrame.filter(input_df, **filter_kwargs)
+        except NodeException as e:
+            raise e
+        except Exception as e:
+            raise NodeException('filter', str(e))
+
+    @staticmethod
+    def filter_kwargs(flow_vars):
+        """Convert options to keyword arguments for `DataFrame.filter()`.
+
+        Unset options are omitted.
+        """
+        kwargs = {
+            key: option.get_value() for key, option in flow_vars.items()
+            if option.get_value() not in (None, '')
+        }
+
+        return kwargs
@@ -22,6 +22,6 @@ class JoinNode(ManipulationNode):
                 second_df,
                 on=flow_vars["on"].get_value()
             )
-            return combined_df.to_json()
+            return combined_df
         except Exception as e:
             raise NodeException('join', str(e))
@@ -56,7 +56,18 @@ class PivotNode(ManipulationNode):
     def execute(self, predecessor_data, flow_vars):
         try:
             input_df = pd.DataFrame.from_dict(predecessor_data[0])
-            output_df = pd.DataFrame.pivot_table(input_df, **self.options)
-            return output_df.to_json()
+            output_df = pd.DataFrame.pivot_table(input_df, **self.pivot_kwargs(flow_vars))
+            return output_df
         except Exception as e:
             raise NodeException('pivot', str(e))
+
+    @staticmethod
+    def pivot_kwargs(flow_vars):
+        """Convert options to keyword arguments for `DataFrame.pivot_table()`.
+
+        Unset options are omitted, so the pandas defaults apply.
+        """
+        return {
+            key: option.get_value() for key, option in flow_vars.items()
+            if option.get_value() not in (None, '')
+        }
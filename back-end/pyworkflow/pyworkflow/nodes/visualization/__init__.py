@@ -1 +1,3 @@
-from .graph import GraphNode
+from pyworkflow.registry import lazy_nodes
+
+__getattr__, __all__ = lazy_nodes('visualization')
@@ -2,7 +2,6 @@ from pyworkflow.node import VizNode, NodeException
 from pyworkflow.parameters import *
 
 import pandas as pd
-import altair as alt
 
 
 class GraphNode(VizNode):
@@ -76,6 +75,10 @@ class GraphNode(VizNode):
 
             graph_type = flow_vars["graph_type"].get_value()
 
+            # Imported here, as altair is slow to import and only needed to
+            # execute a GraphNode
+            import altair as alt
+
             # Generate requested chart with options
             if graph_type == "area":
                 chart = alt.Chart(df).mark_area(**mark_options).encode(**encode_options)
@@ -1,4 +1,9 @@
+import copy
 import os
+import threading
+import types
+import warnings
+import weakref
 
 
 class Options:
@@ -7,22 +12,88 @@ class Options:
 
     Clones the values in the class variable `OPTIONS` and sets their values
     with the values in in the instance variable `option_values`.
+
+    The resolved Parameters are cached per instance, and only rebuilt when
+    `option_values` changes (see `OptionValues`). They are shared by every
+    caller, including executor threads, so are read-only; use
+    `Parameter.clone()` for a different value.
     """
 
+    def __init__(self):
+        self._resolved = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
     def __get__(self, obj, objtype):
         # return class variable OPTIONS if invoked from class
         if obj is None:
             return getattr(objtype, "OPTIONS", dict())
+
+        values = getattr(obj, "option_values", dict())
+        version = getattr(values, "version", None)
+
+        with self._lock:
+            cached = self._resolved.get(obj)
+
+        if cached is not None and cached[0] is values and cached[1] == version:
+            return cached[2]
+
         # otherwise clone class's options and set values from instance
-        options = dict()
-        for k, v in obj.OPTIONS.items():
-            options[k] = v.clone()
-        for k, v in getattr(obj, "option_values", dict()).items():
-            if k in options:
-                options[k].set_value(v)
+        options = types.MappingProxyType({
+            k: v.clone(values.get(k)) for k, v in obj.OPTIONS.items()
+        })
+
+        # A plain dict cannot report changes, so is never cached
+        if version is not None:
+            with self._lock:
+                self._resolved[obj] = (values, version, options)
+
         return options
 
 
+class OptionValues(dict):
+    """
+    dict of a Node's option values, which counts changes to itself
+
+    Lets the `Options` descriptor reuse resolved Parameters until a value
+    is changed.
+    """
+    version = 0
+
+    def _changed(self):
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+
 class OptionTypes:
     """
     Descriptor for accessing parameter names, types, and descriptions.
@@ -40,25 +111,50 @@ class OptionTypes:
 
 
 class Parameter:
+    """A Node option, with its label, default, and value.
+
+    Parameters are read-only, since a Node's resolved options are shared
+    (see `Options`); `clone()` makes a copy with a different value.
+    """
     type = None
 
+    __slots__ = ('_label', '_value', '_default', '_docstring')
+
     def __init__(self, label="", default=None, docstring=None):
-        self._label = label
-        self._value = None
-        self._default = default
-        self._docstring = docstring
+        _set(self, _label=label, _value=None, _default=default, _docstring=docstring)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Parameters are read-only; use clone() to change the value")
+
+    def __delattr__(self, name):
+        raise AttributeError("Parameters are read-only")
+
+    def __setstate__(self, state):
+        # For copy and pickle, which would otherwise set slots with setattr
+        _set(self, **state[1])
 
-    def clone(self):
-        return self.__class__(self.label, self.default, self.docstring)
+    def clone(self, value=None):
+        """Copy the Parameter, with a new value."""
+        param = copy.copy(self)
+        _set(param, _value=value)
+        return param
+
+    def set_value(self, value):
+        """Deprecated: Parameters are read-only. Use `clone()`.
+
+        Returns:
+            A copy of the Parameter with the new value; this Parameter is
+            unchanged
+        """
+        warnings.warn("Parameter.set_value() is deprecated, and no longer changes the Parameter; "
+                      "use the copy it returns, or clone()", DeprecationWarning, stacklevel=2)
+        return self.clone(value)
 
     def get_value(self):
         if self._value is None:
             return self.default
         return self._value
 
-    def set_value(self, value):
-        self._value = value
-
     @property
     def label(self):
         return self._label
@@ -86,6 +182,8 @@ class Parameter:
 class FileParameter(Parameter):
     type = "file"
 
+    __slots__ = ()
+
     def validate(self):
         value = self.get_value()
         if (value is None) or (not os.path.exists(value)):
@@ -95,6 +193,8 @@ class FileParameter(Parameter):
 class StringParameter(Parameter):
     type = "string"
 
+    __slots__ = ()
+
     def validate(self):
         value = self.get_value()
         if not isinstance(value, str):
@@ -104,6 +204,8 @@ class StringParameter(Parameter):
 class TextParameter(Parameter):
     type = "text"
 
+    __slots__ = ()
+
     def validate(self):
         value = self.get_value()
         if not isinstance(value, str):
@@ -113,6 +215,8 @@ class TextParameter(Parameter):
 class IntegerParameter(Parameter):
     type = "int"
 
+    __slots__ = ()
+
     def validate(self):
         value = self.get_value()
         if not isinstance(value, int):
@@ -122,6 +226,8 @@ class IntegerParameter(Parameter):
 class BooleanParameter(Parameter):
     type = "boolean"
 
+    __slots__ = ()
+
     def validate(self):
         value = self.get_value()
         if not isinstance(value, bool):
@@ -131,9 +237,15 @@ class BooleanParameter(Parameter):
 class SelectParameter(Parameter):
     type = "select"
 
+    __slots__ = ('_options',)
+
     def __init__(self, label="", options=None, default=None, docstring=None):
         super().__init__(label, default, docstring)
-        self.options = options or []
+        _set(self, _options=tuple(options or []))
+
+    @property
+    def options(self):
+        return list(self._options)
 
     def to_json(self):
         out = super().to_json()
@@ -146,6 +258,12 @@ class SelectParameter(Parameter):
             raise ParameterValidationError(self)
 
 
+def _set(param, **attributes):
+    """Set attributes of a read-only Parameter."""
+    for name, value in attributes.items():
+        object.__setattr__(param, name, value)
+
+
 class ParameterValidationError(Exception):
 
     def __init__(self, parameter):
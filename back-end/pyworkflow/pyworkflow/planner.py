@@ -0,0 +1,202 @@
+import os
+
+import networkx as nx
+
+
+class PlanStep:
+    """A unit of execution: one or more Nodes executed in a single pass.
+
+    Attributes:
+        node_ids: Linear chain of Nodes, each the only input of the next
+        streamed: Execute with `Workflow.execute_stream()`, passing data in
+            chunks, instead of `Workflow.execute_segment()`
+        store: Nodes in the chain whose output is written to disk
+    """
+
+    def __init__(self, node_ids, streamed=False, store=None):
+        self.node_ids = node_ids
+        self.streamed = streamed
+        self.store = store or [node_ids[-1]]
+
+    @property
+    def head(self):
+        return self.node_ids[0]
+
+    @property
+    def tail(self):
+        return self.node_ids[-1]
+
+    def to_json(self):
+        return {
+            "node_ids": self.node_ids,
+            "streamed": self.streamed,
+            "store": self.store,
+        }
+
+
+class ExecutionPlan:
+    """Plan the execution of a Workflow, between `execution_order()` and
+    execution.
+
+    Planning makes three passes over the graph (only the second if not
+    optimizing):
+
+    1. Prune: Nodes that cannot reach a sink (a Node with no successors,
+       such as Write CSV, a visualization, or the last Node of a workflow
+       still being built) are dropped, since nothing uses their results.
+       Every Node other than a flow variable is a sink or reaches one, so in
+       practice this drops the flow variables no remaining Node uses.
+    2. Complete: Nodes whose input comes from a Node with no stored output
+       (e.g., an intermediate of a fused step) also need that Node executed.
+    3. Fuse: linear runs of Nodes, where each Node is the only input of the
+       next, become a single step. The Nodes still execute one by one, but
+       each passes its output to the next in memory, and only the last
+       Node's output is written to disk, plus any Node listed in `inspect`.
+       With a `chunksize`, runs of chunk-capable Nodes are streamed instead
+       (see `stream_chains()`).
+
+    Attributes:
+        workflow: The Workflow to plan
+        steps: list of PlanSteps, in execution order
+        pruned: list of node_ids dropped from the plan
+        inspect: Nodes whose output must be stored, e.g. to preview their
+            data. They are also never pruned.
+    """
+
+    def __init__(self, workflow, node_ids=None, inspect=None, chunksize=None, optimize=True):
+        """Build the plan.
+
+        Args:
+            workflow: The Workflow to plan
+            node_ids: Nodes to execute. Defaults to every Node.
+            inspect: Nodes whose output must be stored
+            chunksize: Rows per chunk, to stream chunk-capable Nodes
+            optimize: False, to skip pruning and fusing, so every Node
+                executes on its own and stores its output
+
+        Raises:
+            WorkflowException: graph is not a DAG
+        """
+        self.workflow = workflow
+        self.inspect = set(inspect or [])
+        self.steps = list()
+        self.pruned = list()
+
+        order = workflow.execution_order()
+        if node_ids is not None:
+            requested = set(node_ids)
+            order = [node_id for node_id in order if node_id in requested]
+
+        if optimize:
+            kept = self.prune(order)
+            self.pruned = [node_id for node_id in order if node_id not in kept]
+        else:
+            kept = set(order)
+
+        kept = self.complete(kept)
+        order = [node_id for node_id in workflow.execution_order() if node_id in kept]
+
+        if optimize:
+            self.steps = self.fuse(order, chunksize)
+        else:
+            self.steps = [PlanStep([node_id]) for node_id in order]
+
+    @property
+    def node_ids(self):
+        """All planned node_ids, in execution order."""
+        return [node_id for step in self.steps for node_id in step.node_ids]
+
+    def prune(self, order):
+        """Select the Nodes in `order` that can reach a sink."""
+        graph = self.workflow.graph
+        sinks = {node_id for node_id in graph if self.is_sink(node_id)} | self.inspect
+
+        return {
+            node_id for node_id in order
+            if node_id in sinks or not sinks.isdisjoint(nx.descendants(graph, node_id))
+        }
+
+    def complete(self, kept):
+        """Add predecessors with no stored output, which kept Nodes need."""
+        graph = self.workflow.graph
+        to_check = list(kept)
+        kept = set(kept)
+
+        while to_check:
+            for predecessor_id in graph.predecessors(to_check.pop()):
+                if predecessor_id not in kept and not self.has_output(predecessor_id):
+                    kept.add(predecessor_id)
+                    to_check.append(predecessor_id)
+
+        return kept
+
+    def fuse(self, order, chunksize=None):
+        """Group Nodes in `order` into steps."""
+        graph = self.workflow.graph
+        planned = set(order)
+        steps = list()
+        assigned = set()
+
+        if chunksize:
+            for chain in self.workflow.stream_chains(order):
+                steps.append(PlanStep(chain, streamed=True, store=list(chain)))
+                assigned.update(chain)
+
+        for node_id in order:
+            if node_id in assigned:
+                continue
+
+            chain = [node_id]
+            while self.can_fuse(chain[-1], planned - assigned):
+                chain.append(next(iter(graph.successors(chain[-1]))))
+
+            store = [fused_id for fused_id in chain[:-1] if fused_id in self.inspect]
+            steps.append(PlanStep(chain, store=store + [chain[-1]]))
+            assigned.update(chain)
+
+        # Streamed chains were found first; restore execution order
+        position = {node_id: i for i, node_id in enumerate(order)}
+        return sorted(steps, key=lambda step: position[step.head])
+
+    def can_fuse(self, node_id, available):
+        """Whether `node_id`'s only successor can run in the same pass."""
+        graph = self.workflow.graph
+
+        if graph.out_degree(node_id) != 1 or self.is_flow_var(node_id):
+            return False
+
+        successor_id = next(iter(graph.successors(node_id)))
+
+        return (successor_id in available
+                and graph.in_degree(successor_id) == 1
+                and not self.is_flow_var(successor_id))
+
+    def is_sink(self, node_id):
+        node = self.workflow.get_node(node_id)
+
+        # Keep unknown Nodes, so that executing them reports the error
+        if node is None:
+            return True
+
+        if node.node_type == 'flow_control':
+            return False
+
+        # e.g., a Filter at the end of a chain: its output is the result
+        return getattr(node, 'num_out', 1) == 0 or self.workflow.graph.out_degree(node_id) == 0
+
+    def is_flow_var(self, node_id):
+        return self.workflow.graph.nodes[node_id].get('node_type') == 'flow_control'
+
+    def has_output(self, node_id):
+        """Whether a Node's output is stored, or it has none (flow variables)."""
+        if self.is_flow_var(node_id):
+            return True
+
+        data = self.workflow.graph.nodes[node_id].get('data')
+        return data is not None and os.path.exists(self.workflow.path(data))
+
+    def to_json(self):
+        return {
+            "steps": [step.to_json() for step in self.steps],
+            "pruned": self.pruned,
+        }
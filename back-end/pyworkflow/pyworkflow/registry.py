@@ -0,0 +1,222 @@
+import importlib
+import threading
+
+
+# Built-in Nodes, by (node_type, node_key), and the module defining each.
+# The class name is the node_key.
+BUILTIN_NODES = {
+    ('flow_control', 'StringNode'): 'pyworkflow.nodes.flow_control.string_input',
+    ('flow_control', 'IntegerNode'): 'pyworkflow.nodes.flow_control.integer_input',
+    ('io', 'ReadCsvNode'): 'pyworkflow.nodes.io.read_csv',
+    ('io', 'TableCreatorNode'): 'pyworkflow.nodes.io.table_creator',
+    ('io', 'WriteCsvNode'): 'pyworkflow.nodes.io.write_csv',
+    ('manipulation', 'FilterNode'): 'pyworkflow.nodes.manipulation.filter',
+    ('manipulation', 'JoinNode'): 'pyworkflow.nodes.manipulation.join',
+    ('manipulation', 'PivotNode'): 'pyworkflow.nodes.manipulation.pivot',
+    ('visualization', 'GraphNode'): 'pyworkflow.nodes.visualization.graph',
+}
+
+
+class NodeRegistry:
+    """Node classes by (node_type, node_key), imported on first use.
+
+    Built-in Nodes are registered by module path, so a Node's module, and
+    with it packages like pandas or altair, is only imported when a Node of
+    that class is first built.
+
+    Installed packages can provide Nodes through the `pyworkflow.nodes`
+    entry point group. Each entry point is named `<node_type>.<node_key>`
+    and refers to the Node class, e.g. in `setup.py`:
+
+        entry_points={
+            'pyworkflow.nodes': [
+                'manipulation.SortNode = my_package.sort:SortNode',
+            ],
+        }
+
+    Entry points are read the first time a Node is not found among those
+    already registered.
+
+    Custom Nodes, in the Workflow's `custom_nodes` directory, are not
+    registered; see `node_factory.custom_node()`.
+    """
+
+    ENTRY_POINT_GROUP = 'pyworkflow.nodes'
+
+    def __init__(self, nodes=None):
+        # (node_type, node_key) -> "module:Class" path, or the class itself
+        self._nodes = dict()
+        self._entry_points = None
+        self._distributions = None
+        self._lock = threading.Lock()
+
+        # Incremented when a Node module is reloaded, so Nodes built from its
+        # old classes can be rebuilt
+        self.generation = 0
+
+        for (node_type, node_key), module_path in (nodes or dict()).items():
+            self.register(node_type, node_key, module_path)
+
+    def register(self, node_type, node_key, node_class):
+        """Register a Node class.
+
+        Args:
+            node_type: The type of Node, e.g. 'manipulation'
+            node_key: The Node's key, e.g. 'FilterNode'
+            node_class: The Node class, or the path to it: either
+                "module:Class", or a module containing a class named
+                `node_key`.
+        """
+        if isinstance(node_class, str) and ':' not in node_class:
+            node_class = node_class + ':' + node_key
+
+        self._nodes[(node_type, node_key)] = node_class
+
+    def get(self, node_type, node_key):
+        """Retrieve a Node class, importing its module if needed.
+
+        Returns:
+            The Node class, or None if not registered.
+
+        Raises:
+            ImportError: the class's module could not be imported
+        """
+        key = (node_type, node_key)
+        node_class = self._nodes.get(key)
+
+        if node_class is None and self._entry_points is None:
+            self.load_entry_points()
+            node_class = self._nodes.get(key)
+
+        if not isinstance(node_class, str):
+            return node_class
+
+        module_path, class_name = node_class.split(':')
+        module = importlib.import_module(module_path)
+
+        try:
+            node_class = getattr(module, class_name)
+        except AttributeError:
+            raise ImportError("cannot import name '%s' from '%s'" % (class_name, module_path))
+
+        self._nodes[key] = node_class
+        return node_class
+
+    def reloaded(self, module_name):
+        """Use the new classes of a reloaded Node module.
+
+        Classes already imported from `module_name` are imported again on
+        their next use, from the module now in `sys.modules`.
+
+        Args:
+            module_name: The module reloaded, or removed from `sys.modules`
+        """
+        for key, node_class in list(self._nodes.items()):
+            if not isinstance(node_class, str) and node_class.__module__ == module_name:
+                self._nodes[key] = '%s:%s' % (module_name, node_class.__name__)
+
+        self.generation += 1
+
+    def node_types(self):
+        """All registered node_types."""
+        return {node_type for node_type, _ in self._nodes}
+
+    def node_keys(self, node_type=None):
+        """All registered (node_type, node_key) pairs, optionally of one type."""
+        return [key for key in self._nodes if node_type is None or key[0] == node_type]
+
+    def entry_point_nodes(self):
+        """(node_type, node_key) pairs registered through entry points."""
+        self.load_entry_points()
+        return list(self._entry_points)
+
+    def entry_point_distributions(self):
+        """Installed packages providing Nodes, as sorted 'name==version' strings.
+
+        Identifies the version of the Nodes registered through entry points,
+        e.g. so that installing or upgrading a package changes the ETag of
+        the Node catalogue.
+        """
+        self.load_entry_points()
+        return list(self._distributions)
+
+    def load_entry_points(self):
+        """Register Nodes from the `pyworkflow.nodes` entry point group.
+
+        Entry points are only read once; classes are imported on first use.
+        Entry points not named `<node_type>.<node_key>` are skipped.
+        """
+        with self._lock:
+            if self._entry_points is not None:
+                return
+
+            entry_points = list()
+            distributions = set()
+
+            for entry_point, distribution in NodeRegistry.select_entry_points(NodeRegistry.ENTRY_POINT_GROUP):
+                node_type, _, node_key = entry_point.name.rpartition('.')
+
+                if node_type and node_key:
+                    self.register(node_type, node_key, entry_point.value)
+                    entry_points.append((node_type, node_key))
+                    distributions.add(distribution)
+
+            self._entry_points = entry_points
+            self._distributions = sorted(distributions)
+
+    @staticmethod
+    def select_entry_points(group):
+        """Find the entry points in `group`, and the package providing each.
+
+        Returns:
+            list of (EntryPoint, 'name==version') tuples
+        """
+        from importlib import metadata
+
+        selected = list()
+        seen = set()
+
+        for distribution in metadata.distributions():
+            name = distribution.metadata['Name']
+
+            # A package found twice on the path is only used once, as by `import`
+            if name is None or name.lower() in seen:
+                continue
+
+            seen.add(name.lower())
+
+            for entry_point in distribution.entry_points:
+                if entry_point.group == group:
+                    selected.append((entry_point, '%s==%s' % (name, distribution.version)))
+
+        return selected
+
+
+def lazy_nodes(node_type=None):
+    """Lazily import built-in Nodes as attributes of a package.
+
+    Used by `pyworkflow.nodes` and its sub-packages, so that e.g.
+    `from pyworkflow.nodes import ReadCsvNode` still works, but only imports
+    the module defining ReadCsvNode.
+
+    Args:
+        node_type: Only include Nodes of this type; all if None.
+
+    Returns:
+        Tuple of a module-level `__getattr__` function and `__all__` list.
+    """
+    node_keys = {
+        key: (builtin_type, key) for builtin_type, key in BUILTIN_NODES
+        if node_type is None or builtin_type == node_type
+    }
+
+    def __getattr__(name):
+        if name not in node_keys:
+            raise AttributeError(name)
+
+        return node_registry.get(*node_keys[name])
+
+    return __getattr__, list(node_keys)
+
+
+node_registry = NodeRegistry(BUILTIN_NODES)
@@ -0,0 +1,103 @@
+class Sample:
+    """Rows to read from source data for a preview run of a Workflow.
+
+    A preview executes Nodes on a sample of their input, for quick feedback
+    while a Workflow is being built. Source Nodes (e.g., Read CSV) read only
+    the sample, and every Node downstream runs on it. See
+    `Workflow.execute_preview()`.
+
+    'head' reads the first `rows` rows, so costs the same whatever the size
+    of the source. 'reservoir' reads the whole source, in chunks, and keeps a
+    uniform random sample of `rows` rows, in their original order; it is
+    slower, but representative of the whole data.
+
+    Attributes:
+        rows: Number of rows to sample
+        method: 'head' or 'reservoir'
+        seed: Random seed for 'reservoir', so a preview is repeatable
+    """
+
+    METHODS = ['head', 'reservoir']
+    DEFAULT_ROWS = 1000
+
+    # Rows read at a time by 'reservoir'
+    CHUNK_ROWS = 100000
+
+    def __init__(self, rows=DEFAULT_ROWS, method='head', seed=0):
+        if method not in Sample.METHODS:
+            raise ValueError("Unknown sample method '%s'. Choose from: %s" % (method, ', '.join(Sample.METHODS)))
+
+        if not isinstance(rows, int) or rows < 1:
+            raise ValueError('Sample rows must be a positive integer')
+
+        self.rows = rows
+        self.method = method
+        self.seed = seed
+
+    def to_json(self):
+        return {'rows': self.rows, 'method': self.method, 'seed': self.seed}
+
+    def limit(self, data):
+        """Cap a Node's output at `rows` rows.
+
+        Keeps a preview small even downstream of Nodes that multiply rows
+        (e.g., a Join). Output that is not a DataFrame is returned as is.
+        """
+        from .storage import is_dataframe
+
+        if is_dataframe(data) and len(data) > self.rows:
+            return data.iloc[:self.rows]
+
+        return data
+
+    def take_chunks(self, chunks):
+        """Sample a stream of DataFrame chunks, e.g. from a chunked reader.
+
+        With 'head', stops reading once `rows` rows have been read. With
+        'reservoir', each row is given a random priority, and the `rows` rows
+        with the lowest priorities so far are kept, so at most `rows` rows
+        plus one chunk are in memory at once.
+
+        Returns:
+            DataFrame of at most `rows` rows
+        """
+        import numpy as np
+        import pandas as pd
+
+        if self.method == 'head':
+            taken, count = list(), 0
+
+            for chunk in chunks:
+                taken.append(chunk.iloc[:self.rows - count])
+                count += len(taken[-1])
+
+                if count >= self.rows:
+                    break
+
+            return pd.concat(taken) if taken else pd.DataFrame()
+
+        rng = np.random.default_rng(self.seed)
+        reservoir, priorities, position = None, None, 0
+
+        for chunk in chunks:
+            chunk_priorities = rng.random(len(chunk))
+
+            # Positions in the stream, to restore the original order
+            chunk = chunk.set_axis(pd.MultiIndex.from_arrays(
+                [np.arange(position, position + len(chunk)), chunk.index]), axis=0)
+            position += len(chunk)
+
+            if reservoir is None:
+                reservoir, priorities = chunk.iloc[:0], chunk_priorities[:0]
+
+            reservoir = pd.concat([reservoir, chunk])
+            priorities = np.concatenate([priorities, chunk_priorities])
+
+            if len(reservoir) > self.rows:
+                keep = np.argpartition(priorities, self.rows)[:self.rows]
+                reservoir, priorities = reservoir.iloc[keep], priorities[keep]
+
+        if reservoir is None:
+            return pd.DataFrame()
+
+        return reservoir.sort_index(level=0).droplevel(0)
@@ -0,0 +1,232 @@
+import gzip
+import json
+
+
+# Magic numbers at the start of compressed data
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+ENCODINGS = ['json', 'msgpack']
+COMPRESSIONS = ['gzip', 'zstd']
+
+EXTENSIONS = {
+    'json': '.json',
+    'msgpack': '.msgpack',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+class Serializer:
+    """Encodes workflow documents (session data, saved workflow files) as bytes.
+
+    Documents are encoded as JSON or msgpack, and optionally compressed with
+    gzip or zstd. JSON is encoded with `orjson` if it is installed, which is
+    several times faster than the standard library. msgpack requires
+    `msgpack`, and zstd requires `zstandard`.
+
+    Reading detects the format from the data itself, so a Serializer reads
+    data written with any encoding and compression.
+
+    Attributes:
+        encoding: 'json' or 'msgpack'
+        compression: 'gzip', 'zstd', or None
+    """
+
+    def __init__(self, encoding='json', compression=None):
+        if encoding not in ENCODINGS:
+            raise ValueError("Unknown encoding '%s'. Choose from: %s" % (encoding, ', '.join(ENCODINGS)))
+
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression '%s'. Choose from: %s" % (compression, ', '.join(COMPRESSIONS)))
+
+        self.encoding = encoding
+        self.compression = compression
+
+    @property
+    def extension(self):
+        """File extension for data written by this Serializer, e.g. '.json.gz'."""
+        return EXTENSIONS[self.encoding] + EXTENSIONS.get(self.compression, '')
+
+    @property
+    def content_type(self):
+        if self.encoding == 'json' and self.compression is None:
+            return 'application/json'
+
+        return 'application/octet-stream'
+
+    def dumps(self, obj):
+        """Encode, and compress, `obj`.
+
+        Raises:
+            ValueError: `obj` cannot be encoded, or a required package is not
+                installed
+        """
+        if self.encoding == 'msgpack':
+            data = encode_msgpack(obj)
+        else:
+            data = encode_json(obj)
+
+        if self.compression == 'zstd':
+            return zstd_module().ZstdCompressor().compress(data)
+        elif self.compression == 'gzip':
+            return gzip.compress(data, compresslevel=6)
+
+        return data
+
+    def loads(self, data):
+        return loads(data)
+
+
+def loads(data):
+    """Decode data written by any Serializer.
+
+    Args:
+        data: bytes, or str for JSON text
+
+    Raises:
+        ValueError: data is not in a known format, is malformed, or a
+            required package is not installed
+    """
+    if isinstance(data, str):
+        return decode_json(data)
+
+    data, _ = decompress(data)
+
+    if detect_encoding(data) == 'msgpack':
+        return decode_msgpack(data)
+
+    return decode_json(data)
+
+
+def detect(data):
+    """Serializer that writes data in the same format as `data`.
+
+    Lets a document be read, changed, and written back as it was found.
+
+    Raises:
+        ValueError: `data` is compressed with zstd, and `zstandard` is not
+            installed
+    """
+    if isinstance(data, str):
+        return Serializer()
+
+    data, compression = decompress(data)
+
+    return Serializer(detect_encoding(data), compression)
+
+
+def decompress(data):
+    """Decompress gzip or zstd data, detected by its magic number.
+
+    Returns:
+        Tuple of the decompressed data, and the compression used, or None
+    """
+    if data.startswith(ZSTD_MAGIC):
+        zstandard = zstd_module()
+
+        try:
+            # Streamed frames may not record their size, so decompress as a stream
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data), 'zstd'
+        except zstandard.ZstdError as e:
+            raise ValueError(str(e))
+    elif data.startswith(GZIP_MAGIC):
+        try:
+            return gzip.decompress(data), 'gzip'
+        except (OSError, EOFError) as e:
+            raise ValueError(str(e))
+
+    return data, None
+
+
+def detect_encoding(data):
+    # msgpack maps and arrays start with a byte outside of ASCII; anything
+    # else is read as JSON
+    if data[:1] and (0x80 <= data[0] <= 0x9f or 0xdc <= data[0] <= 0xdf):
+        return 'msgpack'
+
+    return 'json'
+
+
+def dumps(obj, encoding='json', compression=None):
+    return Serializer(encoding, compression).dumps(obj)
+
+
+def best_encoding():
+    """msgpack if installed; otherwise JSON."""
+    return 'msgpack' if msgpack_module(required=False) else 'json'
+
+
+def best_compression():
+    """zstd if installed; otherwise gzip."""
+    return 'zstd' if zstd_module(required=False) else 'gzip'
+
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS if encoding != 'msgpack' or msgpack_module(required=False)]
+
+
+def available_compressions():
+    return [compression for compression in COMPRESSIONS if compression != 'zstd' or zstd_module(required=False)]
+
+
+def encode_json(obj):
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError as e:
+        raise ValueError(str(e))
+
+
+def decode_json(data):
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(data)
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # e.g. NaN, which orjson does not accept; raises a ValueError if
+        # the data really is malformed
+        return json.loads(data)
+
+
+def encode_msgpack(obj):
+    try:
+        return msgpack_module().packb(obj, use_bin_type=True)
+    except TypeError as e:
+        raise ValueError(str(e))
+
+
+def decode_msgpack(data):
+    msgpack = msgpack_module()
+
+    try:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    except (msgpack.UnpackException, ValueError) as e:
+        raise ValueError("Invalid workflow data: %s" % e)
+
+
+def msgpack_module(required=True):
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        if required:
+            raise ValueError("The 'msgpack' package is required for msgpack data")
+        return None
+
+
+def zstd_module(required=True):
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        if required:
+            raise ValueError("The 'zstandard' package is required for zstd data")
+        return None
@@ -0,0 +1,575 @@
+import json
+import os
+import sys
+
+
+class NodeDataFormat:
+    """On-disk format for intermediate Node data.
+
+    Nodes may return a pandas DataFrame from `execute()`, which the Workflow
+    persists in its configured format. Any other output (e.g., a JSON string
+    from a VizNode, or a custom Node that calls `to_json()` itself) is always
+    stored as JSON.
+
+    The file extension identifies the format a file was written in, so data
+    stays readable after a Workflow switches formats.
+
+    Formats with `chunked` set can also be written one DataFrame chunk at a
+    time, for Nodes executed in streaming mode. Formats with `sliceable` set
+    can read a page of rows, or the schema, without decoding the whole file;
+    see `ArrowFormat`. Formats with `memory_mapped` set read DataFrames whose
+    read-only columns are views of the mapped file; see `FeatherFormat`.
+    """
+    name = None
+    extension = None
+    chunked = False
+    sliceable = False
+    memory_mapped = False
+
+    def write(self, data, file_path):
+        raise NotImplementedError()
+
+    def read(self, file_path):
+        raise NotImplementedError()
+
+    def round_trip(self, data):
+        """Convert `data` as writing then reading it would, without a file.
+
+        Used to pass data between Nodes in memory (see
+        `Workflow.execute_segment()`), so a Node receives the same input
+        whether or not its predecessor's output was stored.
+        """
+        raise NotImplementedError()
+
+    def open_writer(self, file_path):
+        """Open a ChunkWriter to write DataFrame chunks to `file_path`."""
+        raise NotImplementedError()
+
+
+class ChunkWriter:
+    """Writes a sequence of DataFrame chunks to a single file.
+
+    Every chunk must have the same columns. Column types are cast to those of
+    the first chunk, so e.g. an integer column read as float in a later chunk
+    (because it contains missing values) is still written.
+    """
+
+    def __init__(self, data_format, file_path):
+        self.data_format = data_format
+        self.file_path = file_path
+        self.schema = None
+        self.rows = 0
+        self._writer = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=True)
+
+        if self._writer is None:
+            self.schema = table.schema
+            self._writer = self.open(self.schema)
+        else:
+            table = table.cast(self.schema)
+
+        self._writer.write_table(table)
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._writer is None:
+            import pandas as pd
+
+            # No chunks; write an empty file so the output can still be read
+            self.data_format.write(pd.DataFrame(), self.file_path)
+        else:
+            self._writer.close()
+
+    def open(self, schema):
+        raise NotImplementedError()
+
+
+class JsonFormat(NodeDataFormat):
+    """Text JSON, as produced by `DataFrame.to_json()`.
+
+    Files are stored without an extension, for compatibility with data
+    written by earlier versions. Reading returns the decoded JSON object.
+    """
+    name = "json"
+    extension = ""
+
+    def write(self, data, file_path):
+        with open(file_path, 'w') as f:
+            f.write(JsonFormat.dumps(data))
+
+    def read(self, file_path):
+        with open(file_path) as f:
+            return json.load(f)
+
+    def round_trip(self, data):
+        return json.loads(JsonFormat.dumps(data))
+
+    @staticmethod
+    def dumps(data):
+        if is_dataframe(data):
+            return data.to_json()
+        elif isinstance(data, str):
+            return data
+
+        return json.dumps(data)
+
+
+class ArrowFormat(NodeDataFormat):
+    """A columnar format read through a pyarrow Table.
+
+    Pages of rows are read without converting the whole file to a DataFrame:
+    only the requested columns are read, and only the requested rows are
+    converted. Sorting reads the sort column in full, but still only
+    converts the rows on the page.
+    """
+    sliceable = True
+
+    def round_trip(self, data):
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(data).to_pandas(split_blocks=True)
+
+    def read_table(self, file_path, columns=None):
+        raise NotImplementedError()
+
+    def read_rows(self, file_path, columns, offset, limit):
+        """Read rows `offset` to `offset + limit` of `columns`, as a Table."""
+        return self.read_table(file_path, columns).slice(offset, limit)
+
+    def read_slice(self, file_path, offset=0, limit=None, columns=None, sort_by=None, ascending=True):
+        """Read a page of rows as a DataFrame.
+
+        Args:
+            file_path: Location of the stored data
+            offset: Number of rows to skip
+            limit: Maximum number of rows; None for all
+            columns: Columns to include; None for all. The index is always
+                included.
+            sort_by: Column to sort by before paging; None keeps the stored
+                order
+            ascending: Sort order
+
+        Returns:
+            Tuple of the DataFrame, and the total number of rows
+
+        Raises:
+            ValueError: an unknown column is requested
+        """
+        import pyarrow.compute as pc
+
+        schema = self.read_schema_metadata(file_path)
+        index_columns = [column for column in schema['index'] if isinstance(column, str)]
+        check_columns(schema['columns'], (columns or list()) + ([sort_by] if sort_by else list()))
+
+        read_columns = None if columns is None else index_columns + [c for c in columns if c not in index_columns]
+        total = schema['rows']
+        limit = total if limit is None else limit
+
+        if sort_by is None:
+            table = self.read_rows(file_path, read_columns, offset, limit)
+            positions = range(offset, offset + table.num_rows)
+        else:
+            extra = read_columns is not None and sort_by not in read_columns
+            table = self.read_table(file_path, read_columns + [sort_by] if extra else read_columns)
+
+            order = 'ascending' if ascending else 'descending'
+            positions = pc.sort_indices(table, sort_keys=[(sort_by, order)]).slice(offset, limit)
+            table = table.take(positions)
+            positions = positions.to_pylist()
+
+            if extra:
+                table = table.drop([sort_by])
+
+        return arrow_to_frame(table, schema['index'], positions), total
+
+    def iter_batches(self, file_path, batch_rows):
+        """Read the stored rows in order, as Tables of at most `batch_rows`.
+
+        Each Table keeps the pandas metadata of the file. At least one Table,
+        possibly empty, is returned.
+        """
+        raise NotImplementedError()
+
+    def read_schema(self, file_path):
+        """Read the number of rows, and the columns and their types."""
+        schema = self.read_schema_metadata(file_path)
+        return {'rows': schema['rows'], 'columns': schema['columns']}
+
+    def read_schema_metadata(self, file_path):
+        raise NotImplementedError()
+
+    @staticmethod
+    def schema_metadata(schema, rows):
+        """Describe a pyarrow Schema written from a DataFrame.
+
+        Returns:
+            dict of the number of `rows`; the `columns`, each a dict of its
+            'name' and pandas 'type'; and the `index` descriptions stored by
+            pandas: index column names, or dicts describing a RangeIndex
+        """
+        pandas_metadata = schema.pandas_metadata or dict()
+        index = pandas_metadata.get('index_columns', list())
+        types = {column.get('field_name'): column.get('numpy_type') for column in pandas_metadata.get('columns', list())}
+
+        columns = [
+            {'name': field.name, 'type': types.get(field.name) or str(field.type)}
+            for field in schema if field.name not in index
+        ]
+
+        return {'rows': rows, 'columns': columns, 'index': index}
+
+
+class ParquetFormat(ArrowFormat):
+    """Compressed, columnar Parquet file. Requires `pyarrow`.
+
+    Reading a page of rows only decodes the row groups containing it.
+    """
+    name = "parquet"
+    extension = ".parquet"
+    chunked = True
+
+    def write(self, data, file_path):
+        import pyarrow as pa
+        from pyarrow import parquet
+
+        # Unlike `DataFrame.to_parquet()`, accepts column names that are not
+        # strings (e.g., a pivot's integers or tuples); they are written as
+        # text, and restored from the pandas metadata when read
+        parquet.write_table(pa.Table.from_pandas(data), file_path)
+
+    def read(self, file_path):
+        import pandas as pd
+
+        return pd.read_parquet(file_path, engine='pyarrow')
+
+    def open_writer(self, file_path):
+        return ParquetChunkWriter(self, file_path)
+
+    def read_table(self, file_path, columns=None):
+        from pyarrow import parquet
+
+        return parquet.read_table(file_path, columns=columns, use_pandas_metadata=True)
+
+    def read_rows(self, file_path, columns, offset, limit):
+        from pyarrow import parquet
+
+        parquet_file = parquet.ParquetFile(file_path)
+        metadata = parquet_file.metadata
+
+        # Only read the row groups overlapping the page
+        row_groups, first_row, start = list(), None, 0
+        for i in range(metadata.num_row_groups):
+            end = start + metadata.row_group(i).num_rows
+
+            if end > offset and start < offset + limit:
+                row_groups.append(i)
+                first_row = start if first_row is None else first_row
+
+            start = end
+
+        if not row_groups:
+            table = parquet_file.schema_arrow.empty_table()
+            return table if columns is None else table.select(columns)
+
+        table = parquet_file.read_row_groups(row_groups, columns=columns, use_pandas_metadata=True)
+        return table.slice(offset - first_row, limit)
+
+    def iter_batches(self, file_path, batch_rows):
+        import pyarrow as pa
+        from pyarrow import parquet
+
+        parquet_file = parquet.ParquetFile(file_path)
+
+        if parquet_file.metadata.num_rows == 0:
+            yield parquet_file.schema_arrow.empty_table()
+            return
+
+        for batch in parquet_file.iter_batches(batch_size=batch_rows, use_pandas_metadata=True):
+            yield pa.Table.from_batches([batch])
+
+    def read_schema_metadata(self, file_path):
+        from pyarrow import parquet
+
+        parquet_file = parquet.ParquetFile(file_path)
+        return ArrowFormat.schema_metadata(parquet_file.schema_arrow, parquet_file.metadata.num_rows)
+
+
+class ParquetChunkWriter(ChunkWriter):
+    """Writes each chunk as a Parquet row group."""
+
+    def open(self, schema):
+        from pyarrow import parquet
+
+        return parquet.ParquetWriter(self.file_path, schema)
+
+
+class FeatherFormat(ArrowFormat):
+    """Uncompressed Arrow IPC (Feather v2) file. Requires `pyarrow`.
+
+    Files are read with memory mapping. Arrow only converts a column to a
+    read-only view of the mapped file, rather than a copy, if it is numeric
+    without missing values, and stored in one record batch: the file was
+    written from at most 64K rows. Those columns are shared, through the OS
+    page cache, by every reader of the file; the rest are copied.
+
+    A mapped file must not be truncated while it is in use, so files are
+    written to a temporary path and then moved into place; readers of the
+    old file keep their mapping.
+
+    Since the file is mapped, reading a page of rows, or the schema, costs
+    the same whatever the size of the file.
+    """
+    name = "feather"
+    extension = ".feather"
+    chunked = True
+    memory_mapped = True
+
+    def write(self, data, file_path):
+        from pyarrow import feather
+
+        temp_path = FeatherFormat.temp_path(file_path)
+
+        # Unlike `DataFrame.to_feather()`, keeps any non-default index.
+        # Compressed data could not be mapped.
+        feather.write_feather(data, temp_path, compression='uncompressed')
+        os.replace(temp_path, file_path)
+
+    def read(self, file_path):
+        from pyarrow import feather
+
+        table = feather.read_table(file_path, memory_map=True)
+
+        # Convert each column on its own, so columns can be zero-copy views
+        return table.to_pandas(split_blocks=True)
+
+    def read_table(self, file_path, columns=None):
+        from pyarrow import feather
+
+        return feather.read_table(file_path, columns=columns, memory_map=True)
+
+    def iter_batches(self, file_path, batch_rows):
+        import pyarrow as pa
+
+        reader = pa.ipc.open_file(pa.memory_map(file_path))
+
+        if reader.num_record_batches == 0:
+            yield reader.schema.empty_table()
+            return
+
+        # Record batches are as large as the chunks they were written from
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+
+            for start in range(0, max(batch.num_rows, 1), batch_rows):
+                yield pa.Table.from_batches([batch.slice(start, batch_rows)], schema=reader.schema)
+
+    def read_schema_metadata(self, file_path):
+        # Mapping the file reads no data
+        table = self.read_table(file_path)
+        return ArrowFormat.schema_metadata(table.schema, table.num_rows)
+
+    def open_writer(self, file_path):
+        return FeatherChunkWriter(self, file_path)
+
+    @staticmethod
+    def temp_path(file_path):
+        return file_path + '.tmp'
+
+
+class FeatherChunkWriter(ChunkWriter):
+    """Writes each chunk as an uncompressed Arrow IPC record batch.
+
+    Like `FeatherFormat.write()`, writes to a temporary path first.
+    """
+
+    def open(self, schema):
+        import pyarrow as pa
+
+        return pa.ipc.new_file(FeatherFormat.temp_path(self.file_path), schema)
+
+    def close(self):
+        super().close()
+
+        if self._writer is not None:
+            os.replace(FeatherFormat.temp_path(self.file_path), self.file_path)
+
+
+DATA_FORMATS = {
+    data_format.name: data_format()
+    for data_format in [JsonFormat, ParquetFormat, FeatherFormat]
+}
+
+
+def get_format(name):
+    """Retrieve a NodeDataFormat by name.
+
+    Raises:
+        ValueError: unknown format name
+    """
+    try:
+        return DATA_FORMATS[name]
+    except KeyError:
+        raise ValueError("Unknown node data format '%s'. Choose from: %s" % (name, ', '.join(DATA_FORMATS)))
+
+
+def format_for_data(name, data):
+    """Select the format to store `data` in.
+
+    Only DataFrames can be stored in a binary format; anything else is JSON.
+    """
+    if is_dataframe(data):
+        return get_format(name)
+
+    return DATA_FORMATS['json']
+
+
+def format_for_file(file_name):
+    """Select the format to read a stored file with, by file extension."""
+    for data_format in DATA_FORMATS.values():
+        if data_format.extension and file_name.endswith(data_format.extension):
+            return data_format
+
+    return DATA_FORMATS['json']
+
+
+def to_json(data):
+    """Convert stored Node data to a JSON-serializable object."""
+    if is_dataframe(data):
+        return json.loads(data.to_json())
+
+    return data
+
+
+def check_columns(columns, requested):
+    """Raise a ValueError if a requested column is not in `columns`."""
+    names = {column['name'] for column in columns}
+
+    for column in requested:
+        if column not in names:
+            raise ValueError("Unknown column '%s'" % column)
+
+
+def arrow_to_frame(table, index, positions):
+    """Convert a page of rows, read from a pyarrow Table, to a DataFrame.
+
+    pandas stores a RangeIndex as metadata, which pyarrow reconstructs from
+    0 for any slice; it is rebuilt here from each row's position instead.
+
+    Args:
+        table: The page of rows
+        index: Index descriptions from `ArrowFormat.schema_metadata()`
+        positions: Position of each row in the stored data
+    """
+    frame = table.to_pandas(split_blocks=True)
+
+    if len(index) == 1 and isinstance(index[0], dict) and index[0].get('kind') == 'range':
+        import pandas as pd
+
+        start, step = index[0]['start'], index[0]['step']
+
+        if isinstance(positions, range):
+            frame.index = pd.RangeIndex(start + positions.start * step, start + positions.stop * step, step,
+                                        name=index[0]['name'])
+        else:
+            frame.index = pd.Index([start + position * step for position in positions], name=index[0]['name'])
+
+    return frame
+
+
+def slice_data(data, offset=0, limit=None, columns=None, sort_by=None, ascending=True):
+    """Select a page of rows from decoded Node data.
+
+    Like `ArrowFormat.read_slice()`, for data already decoded (e.g., cached)
+    or stored as JSON. JSON data written from a DataFrame is converted to
+    one; any other data cannot be paged, and is returned whole.
+
+    Returns:
+        Tuple of the page, and the total number of rows (None if the data is
+        not a table)
+
+    Raises:
+        ValueError: an unknown column is requested
+    """
+    frame = as_dataframe(data)
+
+    if frame is None:
+        return data, None
+
+    check_columns(data_schema(frame)['columns'], (columns or list()) + ([sort_by] if sort_by else list()))
+
+    # Columns are requested by name as text, as listed by `data_schema()`
+    names = {str(name): name for name in frame.columns}
+
+    if sort_by is not None:
+        frame = frame.sort_values(names[sort_by], ascending=ascending, kind='stable')
+
+    if columns is not None:
+        frame = frame[[names[column] for column in columns]]
+
+    end = None if limit is None else offset + limit
+    return frame.iloc[offset:end], len(frame)
+
+
+def data_schema(data):
+    """Describe decoded Node data, like `ArrowFormat.read_schema()`.
+
+    Returns:
+        dict of the number of 'rows', and the 'columns', each a dict of its
+        'name' and pandas 'type'; or None if the data is not a table
+    """
+    frame = as_dataframe(data)
+
+    if frame is None:
+        return None
+
+    return {
+        'rows': len(frame),
+        'columns': [{'name': str(name), 'type': str(dtype)} for name, dtype in frame.dtypes.items()],
+    }
+
+
+def as_dataframe(data):
+    """Convert decoded Node data to a DataFrame, or None if not a table."""
+    if is_dataframe(data):
+        return data
+
+    # JSON written by `DataFrame.to_json()`: {column: {index: value}}
+    if isinstance(data, dict) and data and all(isinstance(values, dict) for values in data.values()):
+        import pandas as pd
+
+        return pd.DataFrame(data)
+
+    return None
+
+
+def to_page_json(data, rows, offset=0):
+    """Convert a page of Node data to a JSON-serializable object.
+
+    Unlike `to_json()`, rows are a list, so their order is kept by clients
+    that sort object keys (e.g., JavaScript, for integer keys).
+
+    Returns:
+        {rows: total number of rows, offset, columns, index, data: list of
+        rows}, or the data as for `to_json()` if it is not a table
+    """
+    if not is_dataframe(data):
+        return to_json(data)
+
+    page = json.loads(data.to_json(orient='split'))
+    page['columns'] = [str(column) for column in page['columns']]
+
+    return dict(page, rows=rows, offset=offset)
+
+
+def is_dataframe(data):
+    """Whether `data` is a pandas DataFrame.
+
+    Avoids importing pandas, which is slow: if pandas has not been imported,
+    `data` cannot be a DataFrame.
+    """
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(data, pandas.DataFrame)
@@ -0,0 +1,149 @@
+import unittest
+from unittest import mock
+from pyworkflow import Workflow, WorkflowException, Node
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class GraphBatchTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/sample1.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        self.workflow = Workflow("Batch", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        read_csv = Node(GOOD_NODES["read_csv_node"])
+        write_csv = Node(GOOD_NODES["write_csv_node"])
+
+        self.workflow.update_or_add_node(read_csv)
+        self.workflow.update_or_add_node(write_csv)
+        self.workflow.add_edge(read_csv, write_csv)
+
+    def graph_state(self):
+        return (dict(self.workflow.graph.nodes(data=True)), set(self.workflow.graph.edges),
+                set(self.workflow.flow_vars))
+
+    def test_paste_sub_workflow(self):
+        version = self.workflow.version
+
+        delta = self.workflow.apply_batch([
+            {"op": "add_node", "node": dict(GOOD_NODES["filter_node"], node_id="3")},
+            {"op": "add_node", "node": dict(GOOD_NODES["write_csv_node"], node_id="4")},
+            {"op": "add_node", "node": GOOD_NODES["global_flow_var"]},
+            {"op": "add_edge", "from": "1", "to": "3"},
+            {"op": "add_edge", "from": "3", "to": "4"},
+        ])
+
+        self.assertEqual([node["node_id"] for node in delta["added"]], ["3", "4", "1"])
+        self.assertEqual(delta["edges_added"], [["1", "3"], ["3", "4"]])
+        self.assertEqual(set(self.workflow.graph.edges), {("1", "2"), ("1", "3"), ("3", "4")})
+        self.assertIsNotNone(self.workflow.get_flow_var("1"))
+        self.assertGreater(self.workflow.version, version)
+
+    def test_update_and_remove(self):
+        self.workflow.execute_all(optimize=False)
+
+        delta = self.workflow.apply_batch([
+            {"op": "update_node", "node": dict(GOOD_NODES["write_csv_node"], options={"file": "/tmp/batch_out.csv"})},
+            {"op": "remove_edge", "from": "1", "to": "2"},
+            {"op": "remove_node", "node_id": "1"},
+        ])
+
+        self.assertEqual(delta["updated"][0]["option_values"]["file"], "/tmp/batch_out.csv")
+        self.assertEqual(delta["edges_removed"], [["1", "2"]])
+        self.assertEqual(delta["removed"], ["1"])
+        self.assertEqual(delta["stale"], ["2"])
+        self.assertEqual(list(self.workflow.graph), ["2"])
+
+    def test_remove_node_removes_edges(self):
+        delta = self.workflow.apply_batch([{"op": "remove_node", "node_id": "2"}])
+
+        self.assertEqual(delta["edges_removed"], [["1", "2"]])
+
+    def test_operations_see_earlier_operations(self):
+        self.workflow.apply_batch([
+            {"op": "remove_node", "node_id": "2"},
+            {"op": "add_node", "node": GOOD_NODES["write_csv_node"]},
+            {"op": "update_node", "node": dict(GOOD_NODES["write_csv_node"], options={"file": "/tmp/batch_out.csv"})},
+            {"op": "add_edge", "from": "1", "to": "2"},
+        ])
+
+        self.assertEqual(self.workflow.get_node("2").option_values["file"], "/tmp/batch_out.csv")
+        self.assertTrue(self.workflow.graph.has_edge("1", "2"))
+
+    def test_invalid_batch_changes_nothing(self):
+        before = self.graph_state()
+        version = self.workflow.version
+
+        invalid_batches = [
+            # Unknown op, and not a list
+            [{"op": "rename"}],
+            {"op": "add_node"},
+            # Node already exists, or does not exist
+            [{"op": "add_node", "node": dict(GOOD_NODES["filter_node"], node_id="3")},
+             {"op": "add_node", "node": GOOD_NODES["read_csv_node"]}],
+            [{"op": "update_node", "node": dict(GOOD_NODES["filter_node"], node_id="9")}],
+            [{"op": "remove_node", "node_id": "9"}],
+            # Node type changed
+            [{"op": "update_node", "node": dict(GOOD_NODES["filter_node"], node_id="1")}],
+            # Missing Node information
+            [{"op": "add_node", "node": {"node_id": "5"}}],
+            [{"op": "add_node"}],
+            # Edges
+            [{"op": "add_edge", "from": "1", "to": "2"}],
+            [{"op": "remove_edge", "from": "2", "to": "1"}],
+            [{"op": "remove_node", "node_id": "1"}, {"op": "add_edge", "from": "1", "to": "2"}],
+            [{"op": "add_edge", "from": "2", "to": "1"}],
+        ]
+
+        for operations in invalid_batches:
+            with self.assertRaises(WorkflowException):
+                self.workflow.apply_batch(operations)
+
+        self.assertEqual(self.graph_state(), before)
+        self.assertEqual(self.workflow.version, version)
+
+    def test_unloadable_nodes(self):
+        # A Node whose type is no longer installed
+        self.workflow.graph.add_node("9", node_id="9", node_type="manipulation", node_key="MissingNode")
+        before = self.graph_state()
+
+        for operations in [[{"op": "add_edge", "from": "1", "to": "9"}],
+                           [{"op": "add_edge", "from": "9", "to": "2"}],
+                           [{"op": "remove_node", "node_id": "9"}]]:
+            with self.assertRaises(WorkflowException) as context:
+                self.workflow.apply_batch(operations)
+
+            self.assertIn("Node 9 cannot be loaded", context.exception.reason)
+
+        with mock.patch('pyworkflow.node_factory.node_registry.get', side_effect=ImportError("No module named 'x'")):
+            with self.assertRaises(WorkflowException) as context:
+                self.workflow.apply_batch([{"op": "add_node", "node": dict(GOOD_NODES["filter_node"], node_id="3")}])
+
+        self.assertIn("No module named 'x'", context.exception.reason)
+        self.assertEqual(self.graph_state(), before)
+
+    def test_failed_batch_changes_nothing(self):
+        before = self.graph_state()
+        version = self.workflow.version
+
+        with mock.patch.object(Workflow, 'add_edge', side_effect=RuntimeError("failed")):
+            with self.assertRaises(RuntimeError):
+                self.workflow.apply_batch([
+                    {"op": "add_node", "node": dict(GOOD_NODES["filter_node"], node_id="3")},
+                    {"op": "add_edge", "from": "1", "to": "3"},
+                ])
+
+        self.assertEqual(self.graph_state(), before)
+        self.assertEqual(self.workflow.version, version)
+        self.assertIsNone(self.workflow.get_node("3"))
+
+    def test_invalid_operation_index(self):
+        with self.assertRaises(WorkflowException) as context:
+            self.workflow.apply_batch([
+                {"op": "add_node", "node": dict(GOOD_NODES["filter_node"], node_id="3")},
+                {"op": "remove_node", "node_id": "9"},
+            ])
+
+        self.assertTrue(context.exception.reason.startswith("Operation 1:"))
@@ -0,0 +1,81 @@
+import unittest
+import os
+from pyworkflow import Workflow, Node
+from pyworkflow.cache import NodeDataCache
+import networkx as nx
+import pandas as pd
+
+
+class NodeDataCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = NodeDataCache()
+        self.loads = 0
+
+        self.file_path = '/tmp/cache_test.json'
+        with open(self.file_path, 'w') as f:
+            f.write('{"A": {"0": 1}}')
+
+    def loader(self, file_path):
+        self.loads += 1
+        return pd.read_json(file_path)
+
+    def test_cache_hit(self):
+        first = self.cache.get(self.file_path, self.loader)
+        second = self.cache.get(self.file_path, self.loader)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_modified_file_reloads(self):
+        self.cache.get(self.file_path, self.loader)
+
+        with open(self.file_path, 'w') as f:
+            f.write('{"A": {"0": 1, "1": 2}}')
+        os.utime(self.file_path, ns=(0, 0))
+
+        data = self.cache.get(self.file_path, self.loader)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(self.loads, 2)
+
+    def test_invalidate(self):
+        self.cache.get(self.file_path, self.loader)
+        self.cache.invalidate(self.file_path)
+        self.cache.get(self.file_path, self.loader)
+
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_eviction(self):
+        other_path = '/tmp/cache_test_other.json'
+        with open(other_path, 'w') as f:
+            f.write('{"B": {"0": 1}}')
+
+        size = NodeDataCache.estimate_size(self.loader(self.file_path), 0)
+        self.cache.resize(size)
+
+        self.cache.get(self.file_path, self.loader)
+        self.cache.get(other_path, self.loader)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["current_bytes"], size)
+
+    def test_disabled(self):
+        self.cache.resize(0)
+        self.cache.get(self.file_path, self.loader)
+        self.cache.get(self.file_path, self.loader)
+
+        self.assertEqual(self.loads, 2)
+
+    def test_store_node_data_invalidates(self):
+        workflow = Workflow("Cache", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+        node = Node({"node_id": "1"})
+
+        node.data = Workflow.store_node_data(workflow, "1", pd.DataFrame({"A": [1]}))
+        self.assertEqual(len(workflow.retrieve_node_data(node)["A"]), 1)
+
+        node.data = Workflow.store_node_data(workflow, "1", pd.DataFrame({"A": [1, 2]}))
+        self.assertEqual(len(workflow.retrieve_node_data(node)["A"]), 2)
@@ -0,0 +1,116 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+from pyworkflow import Workflow, node_registry
+from pyworkflow.catalogue import NodeCatalogue
+import pyworkflow.nodes
+
+
+class NodeCatalogueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.catalogue = NodeCatalogue()
+        self.node_dir = tempfile.mkdtemp()
+        self.builder = mock.Mock(return_value={"Custom Nodes": []})
+
+        os.makedirs(os.path.join(self.node_dir, "custom_nodes"))
+        self.write_node("my_node.py", "# My Node")
+
+    def tearDown(self):
+        shutil.rmtree(self.node_dir)
+
+    def write_node(self, file_name, contents):
+        with open(os.path.join(self.node_dir, "custom_nodes", file_name), 'w') as f:
+            f.write(contents)
+
+    def test_cache_hit(self):
+        data, etag = self.catalogue.get(self.node_dir, self.builder)
+
+        self.assertEqual(self.catalogue.get(self.node_dir, self.builder), (data, etag))
+        self.assertEqual(self.builder.call_count, 1)
+        self.assertEqual((self.catalogue.hits, self.catalogue.misses), (1, 1))
+
+    def test_changed_file_rebuilds(self):
+        _, etag = self.catalogue.get(self.node_dir, self.builder)
+        self.write_node("my_node.py", "# My changed Node")
+
+        _, new_etag = self.catalogue.get(self.node_dir, self.builder)
+
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(self.builder.call_count, 2)
+
+    def test_new_file_rebuilds(self):
+        _, etag = self.catalogue.get(self.node_dir, self.builder)
+        self.write_node("other_node.py", "# Other Node")
+
+        self.assertNotEqual(self.catalogue.get(self.node_dir, self.builder)[1], etag)
+
+    def test_changed_packages_rebuild(self):
+        _, etag = self.catalogue.get(self.node_dir, self.builder, ['my-nodes==1.0'])
+        _, new_etag = self.catalogue.get(self.node_dir, self.builder, ['my-nodes==1.1'])
+
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(self.builder.call_count, 2)
+
+    def test_other_files_ignored(self):
+        _, etag = self.catalogue.get(self.node_dir, self.builder)
+        self.write_node("README.md", "Not a Node")
+
+        self.assertEqual(self.catalogue.get(self.node_dir, self.builder)[1], etag)
+        self.assertEqual(self.builder.call_count, 1)
+
+    def test_missing_dir(self):
+        with self.assertRaises(OSError):
+            self.catalogue.get("foobar", self.builder)
+
+    def test_reload_changed_module(self):
+        # A Node package in the catalogue's directory, imported as a
+        # sub-package of pyworkflow.nodes
+        os.makedirs(os.path.join(self.node_dir, "reload_test"))
+        self.write_package_node("__init__.py", "")
+        self.write_package_node("reload_node.py", "class ReloadNode:\n    version = 1\n")
+
+        self.addCleanup(sys.modules.pop, "pyworkflow.nodes.reload_test", None)
+        self.addCleanup(sys.modules.pop, "pyworkflow.nodes.reload_test.reload_node", None)
+        self.addCleanup(node_registry._nodes.pop, ("reload_test", "ReloadNode"), None)
+
+        with mock.patch.object(pyworkflow.nodes, '__path__', pyworkflow.nodes.__path__ + [self.node_dir]):
+            node_registry.register("reload_test", "ReloadNode", "pyworkflow.nodes.reload_test.reload_node")
+            self.assertEqual(node_registry.get("reload_test", "ReloadNode").version, 1)
+
+            other_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, other_dir)
+
+            _, etag = self.catalogue.get(self.node_dir, self.builder)
+            _, other_etag = self.catalogue.get(other_dir, self.builder)
+
+            self.write_package_node("reload_node.py", "class ReloadNode:\n    version = 2  # changed\n")
+            _, new_etag = self.catalogue.get(self.node_dir, self.builder)
+
+            self.assertEqual(node_registry.get("reload_test", "ReloadNode").version, 2)
+            self.assertNotEqual(new_etag, etag)
+
+            # Other cached lists may include the reloaded Node
+            self.assertNotEqual(self.catalogue.get(other_dir, self.builder)[1], other_etag)
+            self.assertEqual(self.builder.call_count, 4)
+
+    def write_package_node(self, file_name, contents):
+        with open(os.path.join(self.node_dir, "reload_test", file_name), 'w') as f:
+            f.write(contents)
+
+    def test_workflow_node_catalogue(self):
+        node_dir = os.path.dirname(pyworkflow.nodes.__file__)
+        workflow = Workflow("Catalogue", root_dir="/tmp", node_dir=node_dir)
+
+        data, etag = workflow.get_node_catalogue()
+
+        self.assertEqual(data, workflow.get_packaged_nodes())
+        self.assertEqual(workflow.get_node_catalogue()[1], etag)
+
+    def test_workflow_node_catalogue_missing_dir(self):
+        workflow = Workflow("Catalogue", root_dir="/tmp", node_dir=self.node_dir)
+
+        with mock.patch.object(Workflow, 'node_dir', "foobar"):
+            self.assertIsNone(workflow.get_node_catalogue())
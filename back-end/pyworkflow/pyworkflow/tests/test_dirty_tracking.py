@@ -0,0 +1,152 @@
+import unittest
+from pyworkflow import Workflow, NodeException, Node
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class DirtyTrackingTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/dirty_sample.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        self.workflow = Workflow("Dirty", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        # Read CSV (1) -> Write CSV (2), Read CSV (1) -> Write CSV (3)
+        self.read_csv = Node(dict(GOOD_NODES["read_csv_node"], options={"file": "/tmp/dirty_sample.csv"}))
+        self.workflow.update_or_add_node(self.read_csv)
+
+        for node_id in ["2", "3"]:
+            write_csv = Node(dict(GOOD_NODES["write_csv_node"], node_id=node_id, options={
+                "file": "/tmp/dirty_out_%s.csv" % node_id,
+            }))
+            self.workflow.update_or_add_node(write_csv)
+            self.workflow.add_edge(self.read_csv, write_csv)
+
+        self.workflow.execute_all(max_workers=1)
+
+    def assertStates(self, expected):
+        states = {node_id: self.workflow.get_node_state(node_id) for node_id in expected}
+        self.assertEqual(states, expected)
+
+    def test_new_nodes_are_stale(self):
+        workflow = Workflow("New", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+        workflow.update_or_add_node(Node(GOOD_NODES["read_csv_node"]))
+
+        self.assertEqual(workflow.get_node_state("1"), Workflow.STALE)
+        self.assertEqual(workflow.stale_nodes(), ["1"])
+
+    def test_executed_nodes_are_fresh(self):
+        self.assertStates({"1": Workflow.FRESH, "2": Workflow.FRESH, "3": Workflow.FRESH})
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+    def test_unchanged_update_stays_fresh(self):
+        self.workflow.update_or_add_node(self.workflow.get_node("1"))
+
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+    def test_changed_option_marks_descendants_stale(self):
+        read_csv = self.workflow.get_node("1")
+        read_csv.option_values["sep"] = ";"
+        self.workflow.update_or_add_node(read_csv)
+
+        self.assertStates({"1": Workflow.STALE, "2": Workflow.STALE, "3": Workflow.STALE})
+
+    def test_changed_option_leaves_siblings_fresh(self):
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["index"] = False
+        self.workflow.update_or_add_node(write_csv)
+
+        self.assertStates({"1": Workflow.FRESH, "2": Workflow.STALE, "3": Workflow.FRESH})
+
+    def test_edge_changes_mark_target_stale(self):
+        self.workflow.remove_edge(self.read_csv, self.workflow.get_node("3"))
+
+        self.assertStates({"1": Workflow.FRESH, "2": Workflow.FRESH, "3": Workflow.STALE})
+
+    def test_remove_node_marks_successors_stale(self):
+        self.workflow.remove_node(self.read_csv)
+
+        self.assertStates({"2": Workflow.STALE, "3": Workflow.STALE})
+
+    def test_global_flow_var_marks_consumers_stale(self):
+        flow_var = Node(GOOD_NODES["global_flow_var"])
+        self.workflow.update_or_add_node(flow_var)
+
+        write_csv = self.workflow.get_node("3")
+        write_csv.option_replace["sep"] = {"node_id": flow_var.node_id, "is_global": True}
+        self.workflow.update_or_add_node(write_csv)
+        self.workflow.execute("3")
+
+        self.assertEqual(self.workflow.get_flow_var_consumers(flow_var.node_id), ["3"])
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+        flow_var.option_values["default_value"] = ";"
+        self.workflow.update_or_add_node(flow_var)
+
+        self.assertStates({"1": Workflow.FRESH, "2": Workflow.FRESH, "3": Workflow.STALE})
+
+    def test_failed_node(self):
+        read_csv = self.workflow.get_node("1")
+        read_csv.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(read_csv)
+
+        with self.assertRaises(NodeException):
+            self.workflow.execute("1")
+
+        self.assertStates({"1": Workflow.FAILED, "2": Workflow.STALE, "3": Workflow.STALE})
+        self.assertEqual(self.workflow.stale_nodes(), ["1", "2", "3"])
+
+    def test_execute_all_stale_only(self):
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["index"] = False
+        self.workflow.update_or_add_node(write_csv)
+
+        executed = self.workflow.execute_all(stale_only=True)
+
+        self.assertEqual(set(executed), {"2"})
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+    def test_execute_all_stale_only_processes(self):
+        read_csv = self.workflow.get_node("1")
+        read_csv.option_values["sep"] = ","
+        self.workflow.update_or_add_node(read_csv)
+
+        executed = self.workflow.execute_all(max_workers=2, use_processes=True, stale_only=True)
+
+        self.assertEqual(set(executed), {"1", "2", "3"})
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+    def test_state_saved_to_session(self):
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["index"] = False
+        self.workflow.update_or_add_node(write_csv)
+
+        reloaded = Workflow.from_json(self.workflow.to_session_dict())
+
+        self.assertEqual(reloaded.stale_nodes(), ["2"])
+
+    def test_version(self):
+        version = self.workflow.version
+
+        # Reading does not change the Workflow
+        self.workflow.get_node("1")
+        self.workflow.retrieve_node_data(self.workflow.get_node("2"))
+        self.assertEqual(self.workflow.version, version)
+
+        self.workflow.remove_edge(self.workflow.get_node("1"), self.workflow.get_node("3"))
+        self.assertGreater(self.workflow.version, version)
+
+    def test_version_on_change(self):
+        for change in [
+            lambda: self.workflow.update_or_add_node(self.workflow.get_node("2")),
+            lambda: self.workflow.remove_node(self.workflow.get_node("3")),
+            lambda: setattr(self.workflow, "name", "Renamed"),
+        ]:
+            version = self.workflow.version
+            change()
+            self.assertGreater(self.workflow.version, version)
+
+    def test_loaded_version(self):
+        workflow = Workflow.from_json(self.workflow.to_session_dict())
+        self.assertEqual(workflow.version, 0)
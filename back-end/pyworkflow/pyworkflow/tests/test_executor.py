@@ -0,0 +1,131 @@
+import unittest
+from pyworkflow import Workflow, WorkflowException, WorkflowExecutor, Node
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class WorkflowExecutorTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/sample1.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        with open('/tmp/sample2.csv', 'w') as f:
+            f.write(DATA_FILES["sample2"])
+
+        self.workflow = Workflow("Executor", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        # Two independent Read CSV -> Write CSV branches
+        for branch, sample in enumerate(["sample1", "sample2"]):
+            read_id, write_id = str(branch * 2 + 1), str(branch * 2 + 2)
+
+            read_csv = Node(dict(GOOD_NODES["read_csv_node"], node_id=read_id, options={
+                "file": "/tmp/%s.csv" % sample,
+            }))
+            write_csv = Node(dict(GOOD_NODES["write_csv_node"], node_id=write_id, options={
+                "file": "/tmp/%s_executor_out.csv" % sample,
+            }))
+
+            self.workflow.update_or_add_node(read_csv)
+            self.workflow.update_or_add_node(write_csv)
+            self.workflow.add_edge(read_csv, write_csv)
+
+    def test_execute_all(self):
+        executed = self.workflow.execute_all(max_workers=2)
+
+        self.assertEqual(set(executed), {"1", "2", "3", "4"})
+        self.assertEqual(self.workflow.get_node("4").data, "Executor-4")
+
+    def test_execute_all_processes(self):
+        executed = self.workflow.execute_all(max_workers=2, use_processes=True)
+
+        self.assertEqual(set(executed), {"1", "2", "3", "4"})
+        self.assertEqual(self.workflow.get_node("2").data, "Executor-2")
+
+    def test_many_branches(self):
+        workflow = Workflow("Branches", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        for branch in range(16):
+            read_csv = Node(dict(GOOD_NODES["read_csv_node"], node_id="r%d" % branch, options={
+                "file": "/tmp/sample%d.csv" % (branch % 2 + 1),
+            }))
+            write_csv = Node(dict(GOOD_NODES["write_csv_node"], node_id="w%d" % branch, options={
+                "file": "/tmp/branch%d_executor_out.csv" % branch,
+            }))
+
+            workflow.update_or_add_node(read_csv)
+            workflow.update_or_add_node(write_csv)
+            workflow.add_edge(read_csv, write_csv)
+
+        def results():
+            return {node_id: (attributes.get("state"), attributes.get("cache_key"), attributes.get("data"))
+                    for node_id, attributes in workflow.graph.nodes(data=True)}
+
+        WorkflowExecutor(workflow, max_workers=8, optimize=False).run()
+        parallel = results()
+
+        for node_id in workflow.graph:
+            workflow.set_node_state(node_id, Workflow.STALE)
+
+        WorkflowExecutor(workflow, max_workers=1, optimize=False).run()
+
+        self.assertEqual({state for state, _, _ in parallel.values()}, {Workflow.FRESH})
+        self.assertNotIn(None, [cache_key for _, cache_key, _ in parallel.values()])
+        self.assertEqual(parallel, results())
+
+    def test_execute_subset(self):
+        executor = WorkflowExecutor(self.workflow, max_workers=2)
+        executed = executor.run(["1", "3"])
+
+        self.assertEqual(set(executed), {"1", "3"})
+
+    def test_failed_node_skips_descendants(self):
+        bad_read = self.workflow.get_node("1")
+        bad_read.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(bad_read)
+
+        executor = WorkflowExecutor(self.workflow, max_workers=2)
+        executor.run()
+
+        self.assertEqual(set(executor.failed), {"1"})
+        self.assertEqual(executor.skipped, {"2"})
+        self.assertEqual(set(executor.executed), {"3", "4"})
+
+    def test_execute_all_exception(self):
+        bad_read = self.workflow.get_node("3")
+        bad_read.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(bad_read)
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_all()
+
+    def test_execute_upstream(self):
+        executed = self.workflow.execute_upstream("2")
+
+        self.assertEqual(set(executed), {"1", "2"})
+        self.assertEqual(self.workflow.stale_nodes(), ["3", "4"])
+        self.assertEqual(self.workflow.get_node("1").data, "Executor-1")
+
+    def test_execute_upstream_only_stale(self):
+        self.workflow.execute_upstream("2")
+
+        self.assertEqual(self.workflow.upstream_nodes("2"), [])
+        self.assertEqual(self.workflow.execute_upstream("2"), dict())
+
+        # A changed write is executed again on its own
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["index"] = False
+        self.workflow.update_or_add_node(write_csv)
+
+        self.assertEqual(set(self.workflow.execute_upstream("2")), {"2"})
+
+    def test_execute_upstream_exception(self):
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_upstream("missing")
+
+        bad_read = self.workflow.get_node("1")
+        bad_read.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(bad_read)
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_upstream("2")
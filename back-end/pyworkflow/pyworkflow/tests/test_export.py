@@ -0,0 +1,97 @@
+import gzip
+import io
+import json
+import unittest
+
+import networkx as nx
+import pandas as pd
+
+from pyworkflow import Workflow, WorkflowException, Node, storage
+from pyworkflow.export import DataExport, compress
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class DataExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'a': range(2500), 'b': ['x', 'y'] * 1250})
+
+    def store(self, name):
+        data_format = storage.get_format(name)
+        file_path = '/tmp/export_test' + (data_format.extension or '.json')
+        data_format.write(self.data, file_path)
+        return file_path, data_format
+
+    def export(self, name, export_format, compression=None, batch_rows=1000):
+        file_path, data_format = self.store(name)
+        data = DataExport(file_path, data_format, export_format, compression, batch_rows)
+        return list(data)
+
+    def read(self, export_format, content):
+        if export_format == 'csv':
+            return pd.read_csv(io.BytesIO(content))
+        elif export_format == 'jsonl':
+            return pd.read_json(io.BytesIO(content), lines=True)
+
+        return pd.read_parquet(io.BytesIO(content))
+
+    def test_export_formats(self):
+        for name in ('feather', 'parquet', 'json'):
+            for export_format in ('csv', 'jsonl', 'parquet'):
+                with self.subTest(data_format=name, export_format=export_format):
+                    chunks = self.export(name, export_format)
+
+                    self.assertGreater(len(chunks), 1)
+                    pd.testing.assert_frame_equal(self.read(export_format, b''.join(chunks)), self.data)
+
+    def test_export_gzip(self):
+        content = gzip.decompress(b''.join(self.export('feather', 'csv', 'gzip')))
+
+        pd.testing.assert_frame_equal(self.read('csv', content), self.data)
+
+    def test_export_keeps_index(self):
+        self.data = self.data.set_index('b')
+        content = b''.join(self.export('parquet', 'csv'))
+
+        self.assertTrue(content.startswith(b'b,a\nx,0\ny,1\n'))
+
+    def test_export_names(self):
+        data = DataExport('/tmp/wf-1.parquet', storage.get_format('parquet'), 'jsonl', 'gzip')
+
+        self.assertEqual(data.filename('wf-1.parquet'), 'wf-1.jsonl.gz')
+        self.assertEqual(data.content_type, 'application/gzip')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            DataExport('/tmp/export_test.parquet', storage.get_format('parquet'), 'xml')
+
+        with self.assertRaises(ValueError):
+            DataExport('/tmp/export_test.parquet', storage.get_format('parquet'), 'csv', 'bz2')
+
+    def test_compress(self):
+        chunks = [b'abc' * 1000, b'', b'def' * 1000]
+
+        self.assertEqual(gzip.decompress(b''.join(compress(chunks, 'gzip'))), b''.join(chunks))
+        self.assertEqual(list(compress(chunks)), chunks)
+
+
+class ExportNodeDataTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/sample1.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        self.workflow = Workflow("Export", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+        self.read_csv = Node(GOOD_NODES["read_csv_node"])
+        self.workflow.update_or_add_node(self.read_csv)
+
+    def test_export_node_data(self):
+        self.workflow.execute(self.read_csv.node_id)
+        node = self.workflow.get_node(self.read_csv.node_id)
+
+        content = b''.join(self.workflow.export_node_data(node, 'jsonl'))
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+
+        self.assertEqual(len(rows), 6)
+
+    def test_export_node_data_not_executed(self):
+        with self.assertRaises(WorkflowException):
+            self.workflow.export_node_data(self.read_csv)
@@ -0,0 +1,83 @@
+import unittest
+import pickle
+from unittest import mock
+from pyworkflow import Workflow, Node, node_factory, node_registry
+from pyworkflow.nodes import ReadCsvNode
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class IdentityMapTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workflow = Workflow("Identity", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        self.workflow.update_or_add_node(Node(GOOD_NODES["read_csv_node"]))
+        self.workflow.update_or_add_node(Node(GOOD_NODES["global_flow_var"]))
+
+    def test_get_node_returns_same_object(self):
+        node = self.workflow.get_node("1")
+
+        self.assertIsInstance(node, ReadCsvNode)
+        self.assertIs(self.workflow.get_node("1"), node)
+
+    def test_get_node_constructs_once(self):
+        with mock.patch('pyworkflow.workflow.node_factory', wraps=node_factory) as factory:
+            for _ in range(3):
+                self.workflow.get_node("1")
+                self.workflow.get_flow_var("1")
+
+        self.assertEqual(factory.call_count, 2)
+
+    def test_flow_vars_are_separate(self):
+        self.assertIsNot(self.workflow.get_node("1"), self.workflow.get_flow_var("1"))
+        self.assertTrue(self.workflow.get_flow_var("1").is_global)
+
+    def test_update_keeps_live_node(self):
+        node = self.workflow.get_node("1")
+        node.option_values["sep"] = ";"
+        self.workflow.update_or_add_node(node)
+
+        self.assertIs(self.workflow.get_node("1"), node)
+        self.assertEqual(self.workflow.graph.nodes["1"]["options"]["sep"], ";")
+
+    def test_update_with_other_object_rebuilds(self):
+        node = self.workflow.get_node("1")
+        replacement = Node(dict(GOOD_NODES["read_csv_node"], options={"file": "/tmp/other.csv"}))
+        self.workflow.update_or_add_node(replacement)
+
+        retrieved = self.workflow.get_node("1")
+        self.assertIsNot(retrieved, node)
+        self.assertIsInstance(retrieved, ReadCsvNode)
+        self.assertEqual(retrieved.option_values["file"], "/tmp/other.csv")
+
+    def test_remove_node(self):
+        self.workflow.remove_node(self.workflow.get_node("1"))
+        self.workflow.remove_node(self.workflow.get_flow_var("1"))
+
+        self.assertIsNone(self.workflow.get_node("1"))
+        self.assertIsNone(self.workflow.get_flow_var("1"))
+
+    def test_reloaded_node_module_rebuilds(self):
+        node = self.workflow.get_node("1")
+        flow_var = self.workflow.get_flow_var("1")
+
+        with mock.patch.object(node_registry, 'generation', node_registry.generation + 1):
+            self.assertIsNot(self.workflow.get_node("1"), node)
+            self.assertIsNot(self.workflow.get_flow_var("1"), flow_var)
+            self.assertIs(self.workflow.get_node("1"), self.workflow.get_node("1"))
+
+    def test_pickle_drops_nodes(self):
+        self.workflow.get_node("1")
+        copy = pickle.loads(pickle.dumps(self.workflow))
+
+        self.assertEqual(copy._nodes, dict())
+        self.assertIsInstance(copy.get_node("1"), ReadCsvNode)
+
+    def test_pickle_new_lock(self):
+        with self.workflow.lock:
+            copy = pickle.loads(pickle.dumps(self.workflow))
+
+        self.assertIsNot(copy.lock, self.workflow.lock)
+        self.assertTrue(copy.lock.acquire(blocking=False))
+        copy.lock.release()
@@ -0,0 +1,61 @@
+import unittest
+import os
+import subprocess
+import sys
+
+import pyworkflow
+
+CLI_DIR = os.path.join(os.path.dirname(pyworkflow.__file__), '..', '..', 'CLI')
+
+# Packages only needed once a Node that uses them is built or executed
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'altair']
+
+# Cumulative import time of `pyworkflow`, in microseconds. About 0.2s when
+# written; importing pandas alone takes longer than the budget. Wall-clock
+# time varies too much on shared CI machines, so the budget is only checked
+# with PYWORKFLOW_TEST_IMPORT_TIME set.
+IMPORT_TIME_BUDGET = 400000
+
+
+def import_times(module):
+    """Import `module` in a new interpreter, with `python -X importtime`.
+
+    Returns:
+        dict of cumulative import time, in microseconds, by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join([CLI_DIR, os.environ.get('PYTHONPATH', '')]))
+    )
+
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_pyworkflow_import_is_light(self):
+        times = import_times("pyworkflow")
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+
+    @unittest.skipUnless(os.environ.get('PYWORKFLOW_TEST_IMPORT_TIME'), 'set PYWORKFLOW_TEST_IMPORT_TIME to check')
+    def test_pyworkflow_import_time(self):
+        # Best of three, to smooth out a busy machine
+        best = min(import_times("pyworkflow")["pyworkflow"] for _ in range(3))
+
+        self.assertLess(best, IMPORT_TIME_BUDGET)
+
+    def test_cli_import_is_light(self):
+        times = import_times("cli")
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
@@ -0,0 +1,166 @@
+import unittest
+import threading
+from pyworkflow import Workflow, WorkflowException, Job, JobQueue, Node
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class JobTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/sample1.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        self.workflow = Workflow("Jobs", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        read_csv = Node(dict(GOOD_NODES["read_csv_node"], node_id="1", options={
+            "file": "/tmp/sample1.csv",
+        }))
+        write_csv = Node(dict(GOOD_NODES["write_csv_node"], node_id="2", options={
+            "file": "/tmp/sample1_jobs_out.csv",
+        }))
+
+        self.workflow.update_or_add_node(read_csv)
+        self.workflow.update_or_add_node(write_csv)
+        self.workflow.add_edge(read_csv, write_csv)
+
+        self.queue = JobQueue(max_workers=1, max_jobs=2)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def run_job(self, job):
+        done = threading.Event()
+        self.queue.submit(job, callback=lambda _: done.set())
+        self.assertTrue(done.wait(10))
+        return job.to_dict()
+
+    def test_run(self):
+        status = self.run_job(Job(self.workflow, optimize=False))
+
+        self.assertEqual(status["status"], Job.FINISHED)
+        self.assertIsNone(status["error"])
+        self.assertEqual(list(status["nodes"]), ["1", "2"])
+        self.assertEqual({node["status"] for node in status["nodes"].values()}, {"finished"})
+        self.assertGreaterEqual(status["nodes"]["1"]["duration"], 0)
+        self.assertEqual(self.workflow.get_node_state("2"), Workflow.FRESH)
+
+    def test_failed_node(self):
+        bad_read = self.workflow.get_node("1")
+        bad_read.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(bad_read)
+
+        status = self.run_job(Job(self.workflow, optimize=False))
+
+        self.assertEqual(status["status"], Job.FAILED)
+        self.assertEqual(status["nodes"]["1"]["status"], "failed")
+        self.assertIsNotNone(status["nodes"]["1"]["error"])
+        self.assertEqual(status["nodes"]["2"]["status"], "skipped")
+
+    def test_invalid_graph(self):
+        self.workflow.graph.add_edge("2", "1")
+
+        status = self.run_job(Job(self.workflow))
+
+        self.assertEqual(status["status"], Job.FAILED)
+        self.assertIsNotNone(status["error"])
+
+    def test_subset(self):
+        status = self.run_job(Job(self.workflow, node_ids=["1"], optimize=False))
+
+        self.assertEqual(list(status["nodes"]), ["1"])
+        self.assertEqual(status["nodes"]["1"]["status"], "finished")
+
+    def test_runs_snapshot(self):
+        job = Job(self.workflow, optimize=False)
+
+        # Changed after the Job was created, as if by a concurrent request
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["file"] = "/tmp/sample1_jobs_changed.csv"
+        self.workflow.update_or_add_node(write_csv)
+
+        status = self.run_job(job)
+
+        self.assertEqual(status["nodes"]["2"]["status"], "finished")
+        self.assertEqual(job.snapshot.get_node("2").option_values["file"], "/tmp/sample1_jobs_out.csv")
+
+        # Only the unchanged Node takes the results
+        self.assertEqual(self.workflow.get_node_state("1"), Workflow.FRESH)
+        self.assertEqual(self.workflow.get_node_rows("1"), 6)
+        self.assertEqual(self.workflow.get_node_state("2"), Workflow.STALE)
+        self.assertIsNone(self.workflow.get_node_rows("2"))
+
+    def test_results_not_applied_downstream_of_change(self):
+        job = Job(self.workflow, optimize=False)
+
+        read_csv = self.workflow.get_node("1")
+        read_csv.option_values["file"] = "/tmp/sample1_changed.csv"
+        self.workflow.update_or_add_node(read_csv)
+
+        self.run_job(job)
+
+        self.assertEqual(self.workflow.stale_nodes(), ["1", "2"])
+
+    def test_events(self):
+        job = Job(self.workflow, optimize=False)
+        self.run_job(job)
+
+        events = job.wait_for_events()
+
+        self.assertEqual([event["id"] for event in events], list(range(1, len(events) + 1)))
+        self.assertEqual([(event["event"], event["data"].get("node_id")) for event in events], [
+            ("node-started", "1"), ("node-finished", "1"),
+            ("node-started", "2"), ("node-finished", "2"),
+            ("job-finished", None),
+        ])
+        self.assertEqual(events[1]["data"]["rows"], 6)
+        self.assertGreaterEqual(events[1]["data"]["duration"], 0)
+
+        # Resuming after the last event returns nothing once the Job is done
+        self.assertEqual(job.wait_for_events(after=len(events)), [])
+        self.assertEqual(job.wait_for_events(after=3), events[3:])
+
+    def test_failed_events(self):
+        bad_read = self.workflow.get_node("1")
+        bad_read.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(bad_read)
+
+        job = Job(self.workflow, optimize=False)
+        self.run_job(job)
+
+        events = [event["event"] for event in job.wait_for_events()]
+
+        self.assertEqual(events, ["node-started", "node-failed", "node-skipped", "job-failed"])
+
+    def test_wait_for_events_timeout(self):
+        job = Job(self.workflow)
+
+        self.assertEqual(job.wait_for_events(timeout=0.01), [])
+
+    def test_get(self):
+        job = Job(self.workflow, owner="session")
+        self.run_job(job)
+
+        self.assertIs(self.queue.get(job.job_id), job)
+        self.assertIsNone(self.queue.get("missing"))
+
+    def test_one_job_per_workflow(self):
+        # Hold the only worker, so the first Job stays queued
+        release = threading.Event()
+        self.queue.submit(Job(Workflow("Other", root_dir="/tmp")), callback=lambda _: release.wait(10))
+
+        self.queue.submit(Job(self.workflow))
+
+        with self.assertRaises(WorkflowException):
+            self.queue.submit(Job(self.workflow))
+
+        release.set()
+
+    def test_finished_jobs_evicted(self):
+        jobs = [Job(self.workflow, node_ids=[]) for _ in range(3)]
+
+        for job in jobs:
+            self.run_job(job)
+
+        self.assertIsNone(self.queue.get(jobs[0].job_id))
+        self.assertIs(self.queue.get(jobs[2].job_id), jobs[2])
@@ -0,0 +1,113 @@
+import unittest
+import os
+from pyworkflow import Workflow, WorkflowJournal, Node
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class WorkflowJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.workflow = Workflow("Journal", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        for node_id in ["1", "2", "3"]:
+            self.workflow.update_or_add_node(Node(dict(GOOD_NODES["filter_node"], node_id=node_id)))
+
+        self.workflow.add_edge(self.workflow.get_node("1"), self.workflow.get_node("2"))
+        self.workflow.update_or_add_node(Node(GOOD_NODES["global_flow_var"]))
+
+        # Save a snapshot, and start the journal
+        self.snapshot = self.workflow.to_session_dict()
+        self.workflow.journal_entries()
+
+        self.journal = WorkflowJournal("/tmp/test.journal")
+        self.journal.create()
+
+    def tearDown(self):
+        self.journal.delete()
+
+    def restore(self):
+        self.journal.append(self.workflow.journal_entries())
+
+        workflow = Workflow.from_json(self.snapshot)
+        self.journal.apply(workflow)
+        return workflow
+
+    def assertRestored(self):
+        restored = self.restore()
+
+        self.assertEqual(restored.name, self.workflow.name)
+
+        for graph_name in ["graph", "flow_vars"]:
+            restored_graph, graph = getattr(restored, graph_name), getattr(self.workflow, graph_name)
+
+            # Order may differ, e.g. for a re-added Node
+            self.assertDictEqual(dict(restored_graph.nodes(data=True)), dict(graph.nodes(data=True)))
+            self.assertSetEqual(set(restored_graph.edges), set(graph.edges))
+
+    def test_no_changes(self):
+        self.assertEqual(self.workflow.journal_entries(), [])
+
+    def test_update_node(self):
+        node = self.workflow.get_node("2")
+        node.option_values["items"] = "key"
+        self.workflow.update_or_add_node(node)
+        self.workflow.update_or_add_node(node)
+
+        entries = self.workflow.journal_entries()
+
+        # A Node changed twice is written once
+        self.assertEqual([(entry["op"], entry["id"]) for entry in entries], [("node", "2")])
+        self.assertEqual(entries[0]["attrs"]["options"]["items"], "key")
+
+    def test_changes_are_taken(self):
+        self.workflow.name = "Renamed"
+
+        self.assertEqual(self.workflow.journal_entries(), [{"op": "name", "name": "Renamed"}])
+        self.assertEqual(self.workflow.journal_entries(), [])
+
+    def test_restore(self):
+        self.workflow.name = "Renamed"
+        self.workflow.add_edge(self.workflow.get_node("2"), self.workflow.get_node("3"))
+        self.workflow.remove_edge(self.workflow.get_node("1"), self.workflow.get_node("2"))
+        self.workflow.update_or_add_node(Node(dict(GOOD_NODES["filter_node"], node_id="4")))
+        self.workflow.remove_node(self.workflow.get_flow_var("1"))
+
+        self.assertRestored()
+
+    def test_restore_readded_node(self):
+        self.workflow.remove_node(self.workflow.get_node("2"))
+        self.workflow.update_or_add_node(Node(dict(GOOD_NODES["filter_node"], node_id="2")))
+
+        # The re-added Node does not keep the removed Node's edges
+        self.assertRestored()
+        self.assertFalse(self.restore().graph.has_edge("1", "2"))
+
+    def test_restore_over_several_saves(self):
+        self.workflow.add_edge(self.workflow.get_node("2"), self.workflow.get_node("3"))
+        self.journal.append(self.workflow.journal_entries())
+
+        self.workflow.remove_node(self.workflow.get_node("3"))
+
+        self.assertRestored()
+
+    def test_incomplete_entry_skipped(self):
+        self.workflow.name = "Renamed"
+        self.journal.append(self.workflow.journal_entries())
+
+        with open(self.journal.path, 'a') as f:
+            f.write('{"op": "na')
+
+        self.assertEqual(self.journal.count(), 1)
+
+    def test_snapshot_required(self):
+        self.workflow.require_snapshot()
+
+        self.assertIsNone(self.workflow.journal_entries())
+        self.assertEqual(self.workflow.journal_entries(), [])
+
+    def test_missing_journal(self):
+        self.journal.delete()
+
+        self.assertEqual(self.journal.read(), [])
+        self.assertFalse(os.path.exists(self.journal.path))
@@ -0,0 +1,66 @@
+import unittest
+import os
+from unittest import mock
+from pyworkflow import Workflow, Node
+from pyworkflow.nodes import ReadCsvNode, WriteCsvNode
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES, DATA_FILES
+
+
+class MemoizationTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/memo_sample.csv', 'w') as f:
+            f.write(DATA_FILES["sample1"])
+
+        self.workflow = Workflow("Memo", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        read_csv = Node(dict(GOOD_NODES["read_csv_node"], options={"file": "/tmp/memo_sample.csv"}))
+        write_csv = Node(dict(GOOD_NODES["write_csv_node"], options={"file": "/tmp/memo_out.csv"}))
+
+        self.workflow.update_or_add_node(read_csv)
+        self.workflow.update_or_add_node(write_csv)
+        self.workflow.add_edge(read_csv, write_csv)
+
+        self.execute_all()
+
+    def execute_all(self, use_cache=True):
+        for node_id in self.workflow.execution_order():
+            executed_node = self.workflow.execute(node_id, use_cache=use_cache)
+            self.workflow.update_or_add_node(executed_node)
+
+    def count_executions(self, use_cache=True):
+        with mock.patch.object(ReadCsvNode, 'execute', autospec=True, side_effect=ReadCsvNode.execute) as read_csv, \
+                mock.patch.object(WriteCsvNode, 'execute', autospec=True, side_effect=WriteCsvNode.execute) as write_csv:
+            self.execute_all(use_cache)
+            return read_csv.call_count, write_csv.call_count
+
+    def test_unchanged_workflow_is_cached(self):
+        self.assertEqual(self.count_executions(), (0, 0))
+
+    def test_use_cache_false(self):
+        self.assertEqual(self.count_executions(use_cache=False), (1, 1))
+
+    def test_changed_option_reexecutes(self):
+        write_csv = self.workflow.get_node("2")
+        write_csv.option_values["index"] = False
+        self.workflow.update_or_add_node(write_csv)
+
+        self.assertEqual(self.count_executions(), (0, 1))
+
+    def test_changed_input_file_reexecutes_descendants(self):
+        with open('/tmp/memo_sample.csv', 'w') as f:
+            f.write(DATA_FILES["sample2"])
+
+        self.assertEqual(self.count_executions(), (1, 1))
+
+    def test_missing_output_file_reexecutes(self):
+        os.remove('/tmp/memo_out.csv')
+
+        self.assertEqual(self.count_executions(), (0, 1))
+        self.assertTrue(os.path.exists('/tmp/memo_out.csv'))
+
+    def test_missing_data_file_reexecutes(self):
+        os.remove(self.workflow.path(self.workflow.get_node("1").data))
+
+        self.assertEqual(self.count_executions(), (1, 0))
@@ -1,4 +1,6 @@
 import unittest
+from unittest import mock
+import pandas as pd
 from pyworkflow import *
 from pyworkflow.nodes import *
 from pyworkflow.tests.sample_test_data import GOOD_NODES, BAD_NODES, DATA_FILES
@@ -106,3 +108,109 @@ class NodeTestCase(unittest.TestCase):
         except NodeException as e:
             self.assertEqual(str(e), "execute: JoinNode requires 2 inputs. 0 were provided")
 
+    def test_pivot_uses_flow_vars(self):
+        workflow = Workflow("Pivot", root_dir="/tmp")
+        pivot_node = node_factory(dict(GOOD_NODES["pivot_node"], options={"index": "key", "values": "A"}))
+        flow_vars = pivot_node.get_execution_options(workflow, {"aggfunc": node_factory(
+            dict(GOOD_NODES["string_input"], options={"default_value": "sum", "var_name": "aggfunc"}))})
+
+        input_df = pd.DataFrame({"key": ["K0", "K0", "K1"], "A": [1, 2, 3]})
+        output_df = pivot_node.execute([input_df], flow_vars)
+
+        self.assertEqual(output_df["A"].to_dict(), {"K0": 3, "K1": 3})
+
+
+
+class ReadCsvNodeTestCase(unittest.TestCase):
+    def setUp(self):
+        with open('/tmp/read_csv_node.csv', 'w') as f:
+            f.write("id,color,value\n" + "".join("%d,%s,%d\n" % (i, ["red", "blue"][i % 2], i * 10) for i in range(20)))
+
+        self.workflow = Workflow("ReadCsv", root_dir="/tmp")
+
+    def read(self, **options):
+        node = node_factory(dict(GOOD_NODES["read_csv_node"], options=dict(options, file="/tmp/read_csv_node.csv")))
+        return node, node.get_execution_options(self.workflow, dict())
+
+    def test_engines_agree(self):
+        node, flow_vars = self.read(engine="c")
+        expected = node.execute([], flow_vars)
+
+        for engine in ("auto", "pyarrow", "python"):
+            node, flow_vars = self.read(engine=engine)
+            pd.testing.assert_frame_equal(node.execute([], flow_vars), expected)
+
+    def test_default_engine(self):
+        node, flow_vars = self.read()
+        self.assertEqual(node.read_options(flow_vars)["engine"], "c")
+
+        node, flow_vars = self.read(engine="auto")
+        self.assertEqual(node.read_options(flow_vars)["engine"], "c")
+
+    def test_pyarrow_engine(self):
+        node, flow_vars = self.read(engine="pyarrow")
+        self.assertEqual(node.read_options(flow_vars)["engine"], "pyarrow")
+        self.assertEqual(node.read_options(flow_vars, chunked=True)["engine"], "c")
+
+        node, flow_vars = self.read(engine="pyarrow", memory_map=True)
+        self.assertEqual(node.read_options(flow_vars)["engine"], "c")
+        self.assertTrue(node.read_options(flow_vars)["memory_map"])
+
+    def test_pyarrow_engine_not_installed(self):
+        node, flow_vars = self.read(engine="pyarrow")
+
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            self.assertEqual(node.read_options(flow_vars)["engine"], "c")
+
+    def test_auto_engine_types(self):
+        # Types the pyarrow parser infers differently
+        with open('/tmp/read_csv_node.csv', 'w') as f:
+            f.write("day,label,value\n2020-01-01,NA,1.5\n2020-01-02,n/a,\n2020-01-03,x,2\n")
+
+        node, flow_vars = self.read(engine="c")
+        expected = node.execute([], flow_vars)
+
+        node, flow_vars = self.read(engine="auto")
+        df = node.execute([], flow_vars)
+
+        self.assertEqual(df.dtypes.to_dict(), expected.dtypes.to_dict())
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_pyarrow_engine_unnamed_columns(self):
+        with open('/tmp/read_csv_node.csv', 'w') as f:
+            f.write(",a,a\n0,1,2\n")
+
+        node, flow_vars = self.read(engine="pyarrow")
+        df = node.execute([], flow_vars)
+
+        self.assertEqual(node.read_options(flow_vars)["engine"], "c")
+        self.assertEqual(list(df.columns), ["Unnamed: 0", "a", "a.1"])
+
+    def test_usecols_and_dtype(self):
+        node, flow_vars = self.read(usecols="id, color", dtype="id:int32, color:category")
+        df = node.execute([], flow_vars)
+
+        self.assertEqual(list(df.columns), ["id", "color"])
+        self.assertEqual(str(df["id"].dtype), "int32")
+        self.assertEqual(str(df["color"].dtype), "category")
+
+    def test_invalid_dtype(self):
+        node, flow_vars = self.read(dtype="id")
+
+        with self.assertRaises(NodeException):
+            node.execute([], flow_vars)
+
+    def test_infer_categories(self):
+        node, flow_vars = self.read(categories=True)
+        df = node.execute([], flow_vars)
+
+        self.assertEqual(str(df["color"].dtype), "category")
+        self.assertEqual(str(df["value"].dtype), "int64")
+
+    def test_chunks_use_options(self):
+        node, flow_vars = self.read(usecols="id", dtype="id:int32")
+        chunks = list(node.execute_chunks(None, flow_vars, 8))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [8, 8, 4])
+        self.assertEqual(list(chunks[0].columns), ["id"])
+        self.assertEqual(str(chunks[0]["id"].dtype), "int32")
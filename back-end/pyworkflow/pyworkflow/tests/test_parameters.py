@@ -1,4 +1,5 @@
 import unittest
+import pickle
 from pyworkflow import *
 import networkx as nx
 from pyworkflow.tests.sample_test_data import GOOD_PARAMETERS, BAD_PARAMETERS
@@ -53,3 +54,71 @@ class ParameterTestCase(unittest.TestCase):
         except ParameterValidationError as e:
             self.assertEqual(str(e), "Invalid value '42' (type 'int') for StringParameter")
 
+
+    def test_clone_select_param(self):
+        param = SelectParameter("Axis", options=["a", "b"], default="a", docstring="my docstring")
+        clone = param.clone("b")
+
+        self.assertEqual(clone.options, ["a", "b"])
+        self.assertEqual(clone.get_value(), "b")
+        self.assertEqual(param.get_value(), "a")
+
+
+class OptionsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.node = node_factory({
+            "name": "Read CSV",
+            "node_id": "1",
+            "node_type": "io",
+            "node_key": "ReadCsvNode",
+            "options": {"file": "/tmp/sample.csv"},
+        })
+
+    def test_options_are_reused(self):
+        self.assertIs(self.node.options, self.node.options)
+        self.assertIs(self.node.options["file"], self.node.options["file"])
+
+    def test_options_resolve_after_change(self):
+        options = self.node.options
+        self.node.option_values["sep"] = ";"
+
+        self.assertIsNot(self.node.options, options)
+        self.assertEqual(self.node.options["sep"].get_value(), ";")
+        self.assertEqual(options["sep"].get_value(), ",")
+
+    def test_options_are_read_only(self):
+        with self.assertRaises(TypeError):
+            self.node.options["sep"] = StringParameter("Delimiter")
+
+        with self.assertRaises(AttributeError):
+            self.node.options["sep"]._value = ";"
+
+        self.assertEqual(self.node.options["sep"].get_value(), ",")
+
+    def test_parameter_copies(self):
+        param = SelectParameter("Axis", options=["a", "b"], default="a")
+        param.options.append("c")
+
+        self.assertEqual(param.options, ["a", "b"])
+        self.assertEqual(pickle.loads(pickle.dumps(param.clone("b"))).to_json(), param.clone("b").to_json())
+
+    def test_set_value_deprecated(self):
+        param = StringParameter("Name", default="a")
+
+        with self.assertWarns(DeprecationWarning):
+            changed = param.set_value("b")
+
+        self.assertEqual(changed.get_value(), "b")
+        self.assertEqual(param.get_value(), "a")
+
+    def test_execution_options_do_not_modify_options(self):
+        workflow = Workflow("Options", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+        execution_options = self.node.get_execution_options(workflow, dict())
+
+        self.assertEqual(execution_options["file"].get_value(), "/tmp/sample.csv")
+        self.assertIsNot(execution_options["file"], self.node.options["file"])
+        self.assertEqual(self.node.options["file"].get_value(), "/tmp/sample.csv")
+
+    def test_option_values_compare_as_dict(self):
+        self.assertEqual(self.node.option_values, {"file": "/tmp/sample.csv"})
+        self.assertEqual(pickle.loads(pickle.dumps(self.node.option_values)), {"file": "/tmp/sample.csv"})
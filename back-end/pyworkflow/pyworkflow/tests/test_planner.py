@@ -0,0 +1,154 @@
+import unittest
+from unittest import mock
+from pyworkflow import Workflow, WorkflowException, ExecutionPlan, Node
+from pyworkflow.nodes import FilterNode
+import networkx as nx
+import pandas as pd
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class ExecutionPlanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "key": ["K0", "K1", "K2"],
+            "A": [1, 2, 3],
+            "B": [4, 5, 6],
+        })
+        self.df.to_csv("/tmp/plan_sample.csv", index=False)
+
+        self.workflow = Workflow("Plan", root_dir="/tmp", graph=nx.DiGraph(),
+                                 flow_vars=nx.Graph(), data_format='parquet')
+
+        # Read CSV (1) -> Filter (3) -> Filter (4) -> Write CSV (2)
+        #                             \-> Filter (5)
+        self.add_node("read_csv_node", "1", file="/tmp/plan_sample.csv")
+        self.add_node("filter_node", "3", regex="^(key|A)$")
+        self.add_node("filter_node", "4", regex="^A$")
+        self.add_node("write_csv_node", "2", file="/tmp/plan_out.csv", index=False)
+        self.add_node("filter_node", "5", regex="^key$")
+
+        for from_id, to_id in [("1", "3"), ("3", "4"), ("4", "2"), ("3", "5")]:
+            self.workflow.add_edge(self.workflow.get_node(from_id), self.workflow.get_node(to_id))
+
+    def add_node(self, sample_node, node_id, **options):
+        node = Node(dict(GOOD_NODES[sample_node], node_id=node_id, options=options))
+        self.workflow.update_or_add_node(node)
+
+    def test_prune(self):
+        # A flow variable no Node uses
+        self.add_node("string_input", "7")
+        plan = ExecutionPlan(self.workflow)
+
+        self.assertEqual(plan.pruned, ["7"])
+        self.assertNotIn("7", plan.node_ids)
+
+    def test_last_node_is_sink(self):
+        # Filter (5) has no successors, so its output is a result
+        plan = ExecutionPlan(self.workflow)
+
+        self.assertEqual(plan.pruned, [])
+        self.assertIn("5", plan.node_ids)
+
+    def test_fuse(self):
+        plan = ExecutionPlan(self.workflow)
+
+        self.assertEqual([step.node_ids for step in plan.steps], [["1", "3"], ["4", "2"], ["5"]])
+        self.assertEqual([step.store for step in plan.steps], [["3"], ["2"], ["5"]])
+
+    def test_inspect(self):
+        plan = ExecutionPlan(self.workflow, inspect=["4", "5"])
+
+        self.assertEqual(plan.pruned, [])
+        self.assertEqual([step.store for step in plan.steps], [["3"], ["4", "2"], ["5"]])
+
+    def test_no_optimize(self):
+        plan = ExecutionPlan(self.workflow, optimize=False)
+
+        self.assertEqual(plan.pruned, [])
+        self.assertEqual([step.node_ids for step in plan.steps],
+                         [[node_id] for node_id in self.workflow.execution_order()])
+
+    def test_streamed_chain(self):
+        plan = ExecutionPlan(self.workflow, chunksize=2)
+
+        self.assertEqual([(step.node_ids, step.streamed) for step in plan.steps],
+                         [(["1", "3"], True), (["4", "2"], False), (["5"], False)])
+
+    def test_missing_input_is_added(self):
+        self.workflow.execute_all()
+
+        plan = ExecutionPlan(self.workflow, ["2"])
+
+        # Filter (4) was fused with Write CSV (2), so its output was not stored
+        self.assertEqual(plan.node_ids, ["4", "2"])
+
+    def test_execute_all(self):
+        with mock.patch.object(FilterNode, 'execute', autospec=True, side_effect=FilterNode.execute) as filter_node:
+            executed = self.workflow.execute_all()
+
+        self.assertEqual(filter_node.call_count, 3)
+        self.assertEqual(set(executed), {"1", "2", "3", "4", "5"})
+        pd.testing.assert_frame_equal(pd.read_csv("/tmp/plan_out.csv"), self.df[["A"]])
+
+        # Only the last Node of each step stores output
+        self.assertIsNone(self.workflow.get_node("1").data)
+        self.assertIsNone(self.workflow.get_node("4").data)
+        self.assertEqual(self.workflow.get_node("3").data, "Plan-3.parquet")
+        self.assertEqual(self.workflow.get_node("5").data, "Plan-5.parquet")
+        self.assertEqual(self.workflow.stale_nodes(), [])
+
+    def test_fused_keeps_stored_output(self):
+        self.workflow.execute_all(optimize=False)
+
+        # Filter (4) is fused with Write CSV (2), and its output is unchanged
+        self.add_node("write_csv_node", "2", file="/tmp/plan_out.csv", index=True)
+        executed = self.workflow.execute_all()
+
+        self.assertIn("4", executed)
+        self.assertEqual(self.workflow.get_node("4").data, "Plan-4.parquet")
+
+        # Its stored output no longer matches once its input changes
+        self.add_node("filter_node", "3", regex="^A$")
+        self.workflow.execute_all(stale_only=True)
+        self.assertIsNone(self.workflow.get_node("4").data)
+
+    def test_fused_matches_unfused(self):
+        # JSON stores floats to 10 significant digits
+        pd.DataFrame({"key": ["K0", "K1"], "A": [0.123456789012345, 2.5]}).to_csv("/tmp/plan_fuse.csv", index=False)
+
+        for data_format in ["json", "parquet", "feather"]:
+            outputs = list()
+
+            for optimize in (True, False):
+                self.workflow = Workflow("Fuse", root_dir="/tmp", graph=nx.DiGraph(),
+                                         flow_vars=nx.Graph(), data_format=data_format)
+                self.add_node("read_csv_node", "1", file="/tmp/plan_fuse.csv")
+                self.add_node("filter_node", "3", regex="^(key|A)$")
+                self.add_node("write_csv_node", "2", file="/tmp/plan_fuse_out.csv")
+
+                for from_id, to_id in [("1", "3"), ("3", "2")]:
+                    self.workflow.add_edge(self.workflow.get_node(from_id), self.workflow.get_node(to_id))
+
+                self.workflow.execute_all(optimize=optimize)
+
+                with open("/tmp/plan_fuse_out.csv") as f:
+                    outputs.append(f.read())
+
+            self.assertEqual(outputs[0], outputs[1], data_format)
+
+    def test_execute_all_processes(self):
+        executed = self.workflow.execute_all(max_workers=2, use_processes=True, inspect=["1"])
+
+        self.assertEqual(set(executed), {"1", "2", "3", "4", "5"})
+        self.assertEqual(self.workflow.get_node("1").data, "Plan-1.parquet")
+
+    def test_failed_step(self):
+        self.add_node("filter_node", "4", axis="not an axis")
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_all()
+
+        self.assertEqual(self.workflow.get_node_state("3"), Workflow.FRESH)
+        self.assertEqual(self.workflow.get_node_state("4"), Workflow.FAILED)
+        self.assertEqual(self.workflow.get_node_state("2"), Workflow.STALE)
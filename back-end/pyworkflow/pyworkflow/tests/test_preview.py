@@ -0,0 +1,100 @@
+import os
+import unittest
+
+import networkx as nx
+import pandas as pd
+
+from pyworkflow import Workflow, WorkflowException, Node, Sample
+
+
+class PreviewTestCase(unittest.TestCase):
+    def setUp(self):
+        pd.DataFrame({'key': range(5000), 'A': ['a', 'b'] * 2500}).to_csv('/tmp/preview_in.csv', index=False)
+
+        if os.path.exists('/tmp/preview_out.csv'):
+            os.remove('/tmp/preview_out.csv')
+
+        self.workflow = Workflow("Preview", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph(),
+                                 data_format='parquet')
+
+        self.read_csv = Node({"name": "Read CSV", "node_id": "1", "node_type": "io", "node_key": "ReadCsvNode",
+                              "options": {"file": "/tmp/preview_in.csv"}})
+        self.write_csv = Node({"name": "Write CSV", "node_id": "2", "node_type": "io", "node_key": "WriteCsvNode",
+                               "options": {"file": "/tmp/preview_out.csv"}})
+
+        self.workflow.update_or_add_node(self.read_csv)
+        self.workflow.update_or_add_node(self.write_csv)
+        self.workflow.add_edge(self.read_csv, self.write_csv)
+
+    def preview_data(self, node_id):
+        return self.workflow.retrieve_node_data(self.workflow.get_node(node_id), preview=True)
+
+    def test_preview_runs_ancestors_on_head(self):
+        executed = self.workflow.execute_preview("2", Sample(rows=100))
+
+        self.assertEqual(executed, ["1", "2"])
+        self.assertEqual(list(self.preview_data("2")["key"]), list(range(100)))
+        self.assertEqual(self.workflow.get_preview("2")["rows"], 100)
+        self.assertEqual(self.workflow.get_preview("2")["data"], "Preview-2-preview.parquet")
+
+    def test_preview_is_stored_apart(self):
+        self.workflow.execute_preview("2", Sample(rows=100))
+
+        # No side effects, and the full run is not marked up to date
+        self.assertFalse(os.path.exists('/tmp/preview_out.csv'))
+        self.assertIsNone(self.workflow.get_node("2").data)
+        self.assertEqual(self.workflow.get_node_state("2"), Workflow.STALE)
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.retrieve_node_data(self.workflow.get_node("2"))
+
+    def test_preview_reservoir(self):
+        self.workflow.execute_preview("1", Sample(rows=200, method='reservoir', seed=1))
+        data = self.preview_data("1")
+
+        self.assertEqual(len(data), 200)
+        self.assertTrue(data["key"].is_monotonic_increasing)
+        self.assertGreater(data["key"].max(), 200)
+        self.assertEqual(list(data.index), list(data["key"]))
+
+    def test_preview_cache(self):
+        self.workflow.execute_preview("2", Sample(rows=100))
+
+        self.assertEqual(self.workflow.execute_preview("2", Sample(rows=100)), [])
+        self.assertEqual(self.workflow.execute_preview("2", Sample(rows=50)), ["1", "2"])
+
+        self.read_csv.option_values["sep"] = ";"
+        self.workflow.update_or_add_node(self.read_csv)
+        self.read_csv.option_values["sep"] = ","
+        self.workflow.update_or_add_node(self.read_csv)
+
+        self.workflow.get_node("2").option_values["index"] = False
+        self.workflow.update_or_add_node(self.workflow.get_node("2"))
+        self.assertEqual(self.workflow.execute_preview("2", Sample(rows=50)), ["2"])
+
+    def test_execute_preview_mode(self):
+        node = self.workflow.execute("1", preview=Sample(rows=10))
+
+        self.assertIsNone(node.data)
+        self.assertEqual(self.workflow.get_preview("1")["rows"], 10)
+
+        page, rows = self.workflow.retrieve_node_data_page(node, limit=5, preview=True)
+        self.assertEqual(rows, 10)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(self.workflow.retrieve_node_schema(node, preview=True)["rows"], 10)
+
+    def test_preview_failure(self):
+        self.read_csv.option_values["file"] = "/tmp/does-not-exist.csv"
+        self.workflow.update_or_add_node(self.read_csv)
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_preview("2")
+
+        self.assertIsNone(self.workflow.get_preview("1"))
+
+    def test_sample_validation(self):
+        with self.assertRaises(ValueError):
+            Sample(rows=0)
+
+        with self.assertRaises(ValueError):
+            Sample(method='tail')
@@ -0,0 +1,84 @@
+import unittest
+import subprocess
+import sys
+from importlib import metadata
+from unittest import mock
+from pyworkflow import NodeRegistry, node_registry, node_factory
+from pyworkflow.nodes import FilterNode, ReadCsvNode
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class NodeRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = NodeRegistry({
+            ('manipulation', 'FilterNode'): 'pyworkflow.nodes.manipulation.filter',
+        })
+
+    def entry_points(self, *entry_points, distribution='my-nodes==1.0'):
+        return mock.patch.object(NodeRegistry, 'select_entry_points', return_value=[
+            (metadata.EntryPoint(name=name, value=value, group=NodeRegistry.ENTRY_POINT_GROUP), distribution)
+            for name, value in entry_points
+        ])
+
+    def test_get(self):
+        self.assertIs(self.registry.get('manipulation', 'FilterNode'), FilterNode)
+
+    def test_get_unregistered(self):
+        with self.entry_points():
+            self.assertIsNone(self.registry.get('manipulation', 'FooNode'))
+            self.assertIsNone(self.registry.get('io', 'FilterNode'))
+
+    def test_register_class(self):
+        self.registry.register('io', 'MyReader', ReadCsvNode)
+
+        self.assertIs(self.registry.get('io', 'MyReader'), ReadCsvNode)
+        self.assertEqual(self.registry.node_types(), {'manipulation', 'io'})
+
+    def test_register_missing_class(self):
+        self.registry.register('manipulation', 'FooNode', 'pyworkflow.nodes.manipulation.filter')
+
+        with self.assertRaises(ImportError):
+            self.registry.get('manipulation', 'FooNode')
+
+    def test_entry_points(self):
+        with self.entry_points(('io.MyReader', 'pyworkflow.nodes.io.read_csv:ReadCsvNode'),
+                               ('not_a_node', 'pyworkflow.nodes.io.read_csv:ReadCsvNode')) as select:
+            self.assertIs(self.registry.get('io', 'MyReader'), ReadCsvNode)
+            self.assertEqual(self.registry.entry_point_nodes(), [('io', 'MyReader')])
+            self.assertIsNone(self.registry.get('io', 'OtherReader'))
+
+        self.assertEqual(select.call_count, 1)
+
+    def test_entry_point_distributions(self):
+        with self.entry_points(('io.MyReader', 'pyworkflow.nodes.io.read_csv:ReadCsvNode')):
+            self.assertEqual(self.registry.entry_point_distributions(), ['my-nodes==1.0'])
+
+    def test_select_entry_points(self):
+        # No installed package provides Nodes, but other groups are found
+        self.assertEqual(NodeRegistry.select_entry_points(NodeRegistry.ENTRY_POINT_GROUP), [])
+        self.assertTrue(NodeRegistry.select_entry_points('console_scripts'))
+
+    def test_node_factory(self):
+        node = node_factory(GOOD_NODES["read_csv_node"])
+
+        self.assertIsInstance(node, ReadCsvNode)
+        self.assertIsNone(node_factory(dict(GOOD_NODES["read_csv_node"], node_key="FooNode")))
+
+    def test_node_factory_entry_point(self):
+        with mock.patch.dict(node_registry._nodes):
+            node_registry.register('sorting', 'MyReader', 'pyworkflow.nodes.io.read_csv:ReadCsvNode')
+            node = node_factory(dict(GOOD_NODES["read_csv_node"], node_type='sorting', node_key='MyReader'))
+
+        self.assertIsInstance(node, ReadCsvNode)
+
+    def test_nodes_imported_on_use(self):
+        code = "\n".join([
+            "import sys",
+            "from pyworkflow import node_factory",
+            "assert 'pyworkflow.nodes.visualization.graph' not in sys.modules",
+            "assert 'altair' not in sys.modules",
+            "from pyworkflow.nodes import GraphNode",
+            "assert 'pyworkflow.nodes.visualization.graph' in sys.modules",
+        ])
+
+        subprocess.run([sys.executable, "-c", code], check=True)
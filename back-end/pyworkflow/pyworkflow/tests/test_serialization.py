@@ -0,0 +1,100 @@
+import unittest
+import gzip
+import json
+import math
+from pyworkflow import Workflow, Serializer, Node, serialization
+import networkx as nx
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class SerializerTestCase(unittest.TestCase):
+    def setUp(self):
+        workflow = Workflow("Serialize", root_dir="/tmp", graph=nx.DiGraph(), flow_vars=nx.Graph())
+
+        for node_id in ["1", "2"]:
+            workflow.update_or_add_node(Node(dict(GOOD_NODES["filter_node"], node_id=node_id)))
+
+        workflow.add_edge(workflow.get_node("1"), workflow.get_node("2"))
+
+        self.document = {"react": {"id": "react"}, "pyworkflow": workflow.to_session_dict()}
+
+    def test_round_trip(self):
+        for encoding in serialization.available_encodings():
+            for compression in [None] + serialization.available_compressions():
+                serializer = Serializer(encoding, compression)
+                data = serializer.dumps(self.document)
+
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(serialization.loads(data), self.document)
+
+    def test_detect(self):
+        for encoding in serialization.available_encodings():
+            for compression in [None] + serialization.available_compressions():
+                serializer = serialization.detect(Serializer(encoding, compression).dumps(self.document))
+
+                self.assertEqual((serializer.encoding, serializer.compression), (encoding, compression))
+
+        self.assertEqual(serialization.detect(json.dumps(self.document)).encoding, "json")
+
+    def test_loads_plain_json(self):
+        data = json.dumps(self.document)
+
+        self.assertEqual(serialization.loads(data), self.document)
+        self.assertEqual(serialization.loads(data.encode()), self.document)
+
+    def test_loaded_workflow(self):
+        data = serialization.dumps(self.document, compression="gzip")
+        workflow = Workflow.from_json(serialization.loads(data)["pyworkflow"])
+
+        self.assertEqual(workflow.name, "Serialize")
+        self.assertTrue(workflow.graph.has_edge("1", "2"))
+
+    def test_compression_is_smaller(self):
+        self.assertLess(len(serialization.dumps(self.document, compression="gzip")),
+                        len(serialization.dumps(self.document)))
+
+    def test_json_nan(self):
+        # Written by the standard library, which orjson does not read
+        data = json.dumps({"value": float("nan")})
+
+        self.assertTrue(math.isnan(serialization.loads(data)["value"]))
+
+    def test_extension(self):
+        self.assertEqual(Serializer().extension, ".json")
+        self.assertEqual(Serializer("json", "gzip").extension, ".json.gz")
+        self.assertEqual(Serializer("msgpack", "zstd").extension, ".msgpack.zst")
+
+    def test_content_type(self):
+        self.assertEqual(Serializer().content_type, "application/json")
+        self.assertEqual(Serializer("json", "gzip").content_type, "application/octet-stream")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Serializer("pickle")
+
+        with self.assertRaises(ValueError):
+            Serializer("json", "bz2")
+
+    def test_malformed_data(self):
+        with self.assertRaises(ValueError):
+            serialization.loads(b"{not json")
+
+        with self.assertRaises(ValueError):
+            serialization.loads(serialization.GZIP_MAGIC + b"truncated")
+
+        with self.assertRaises(ValueError):
+            serialization.loads(gzip.compress(b"not json"))
+
+    def test_missing_package(self):
+        if serialization.msgpack_module(required=False) is None:
+            with self.assertRaises(ValueError):
+                Serializer("msgpack").dumps(self.document)
+
+        if serialization.zstd_module(required=False) is None:
+            with self.assertRaises(ValueError):
+                Serializer("json", "zstd").dumps(self.document)
+
+    def test_best_available(self):
+        self.assertIn(serialization.best_encoding(), serialization.available_encodings())
+        self.assertIn(serialization.best_compression(), serialization.available_compressions())
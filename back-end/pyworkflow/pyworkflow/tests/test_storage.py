@@ -0,0 +1,237 @@
+import unittest
+from pyworkflow import Workflow, WorkflowException, Node
+from pyworkflow import storage
+from pyworkflow.cache import NodeDataCache
+import networkx as nx
+import pandas as pd
+
+
+class StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "key": ["K0", "K1", "K2"],
+            "A": [1, 2, 3],
+            "B": [0.5, 1.5, 2.5],
+        })
+
+    def create_workflow(self, data_format):
+        return Workflow("Storage", root_dir="/tmp", graph=nx.DiGraph(),
+                        flow_vars=nx.Graph(), data_format=data_format)
+
+    def store_and_retrieve(self, workflow, data):
+        file_name = Workflow.store_node_data(workflow, "1", data)
+        node = Node({"node_id": "1", "data": file_name})
+        return file_name, workflow.retrieve_node_data(node)
+
+    def test_json_format(self):
+        file_name, data = self.store_and_retrieve(self.create_workflow('json'), self.df)
+
+        self.assertEqual(file_name, "Storage-1")
+        self.assertIsInstance(data, dict)
+        pd.testing.assert_frame_equal(pd.DataFrame.from_dict(data).reset_index(drop=True), self.df)
+
+    def test_binary_formats(self):
+        for data_format in ['parquet', 'feather']:
+            file_name, data = self.store_and_retrieve(self.create_workflow(data_format), self.df)
+
+            self.assertEqual(file_name, "Storage-1." + data_format)
+            pd.testing.assert_frame_equal(data, self.df)
+
+    def test_binary_format_keeps_index(self):
+        pivoted = self.df.set_index("key")
+
+        for data_format in ['parquet', 'feather']:
+            _, data = self.store_and_retrieve(self.create_workflow(data_format), pivoted)
+            pd.testing.assert_frame_equal(data, pivoted)
+
+    def test_binary_format_non_string_columns(self):
+        df = pd.DataFrame({"key": ["K0", "K0", "K1"], "c": ["x", "y", "x"], "A": [1, 2, 3], "B": [4, 5, 6]})
+        pivoted = df.pivot_table(index="key", columns="c", values=["A", "B"], aggfunc="sum")
+        unnamed = pd.DataFrame([[1, 2], [3, 4]])
+
+        for data_format in ['parquet', 'feather']:
+            for frame in (pivoted, unnamed):
+                _, data = self.store_and_retrieve(self.create_workflow(data_format), frame)
+                pd.testing.assert_frame_equal(data, frame)
+
+    def test_non_dataframe_stored_as_json(self):
+        file_name, data = self.store_and_retrieve(self.create_workflow('parquet'), '{"mark": "bar"}')
+
+        self.assertEqual(file_name, "Storage-1")
+        self.assertDictEqual(data, {"mark": "bar"})
+
+    def test_no_data_to_store(self):
+        self.assertIsNone(Workflow.store_node_data(self.create_workflow('parquet'), "1", None))
+
+    def test_unknown_format(self):
+        with self.assertRaises(WorkflowException):
+            self.create_workflow('foobar')
+
+    def test_retrieve_not_executed(self):
+        workflow = self.create_workflow('parquet')
+
+        with self.assertRaises(WorkflowException):
+            workflow.retrieve_node_data(Node({"node_id": "1"}))
+
+    def test_format_from_session(self):
+        workflow = Workflow.from_json(self.create_workflow('feather').to_session_dict())
+        self.assertEqual(workflow.data_format, 'feather')
+
+    def test_to_json(self):
+        self.assertDictEqual(storage.to_json(self.df), {
+            "key": {"0": "K0", "1": "K1", "2": "K2"},
+            "A": {"0": 1, "1": 2, "2": 3},
+            "B": {"0": 0.5, "1": 1.5, "2": 2.5},
+        })
+
+    def test_chunk_writer(self):
+        for data_format in ['parquet', 'feather']:
+            output_format = storage.get_format(data_format)
+            file_path = "/tmp/Storage-chunks" + output_format.extension
+
+            writer = output_format.open_writer(file_path)
+            writer.write(self.df.iloc[:2])
+            writer.write(self.df.iloc[2:])
+            writer.close()
+
+            pd.testing.assert_frame_equal(output_format.read(file_path), self.df, check_index_type=False)
+
+    def test_chunk_writer_no_chunks(self):
+        output_format = storage.get_format('parquet')
+        output_format.open_writer("/tmp/Storage-empty.parquet").close()
+
+        self.assertTrue(output_format.read("/tmp/Storage-empty.parquet").empty)
+
+    def test_json_format_not_chunked(self):
+        self.assertFalse(storage.get_format('json').chunked)
+
+    def test_feather_read_is_memory_mapped(self):
+        _, data = self.store_and_retrieve(self.create_workflow('feather'), self.df)
+
+        # Numeric columns are read-only views of the mapped file; others are copies
+        self.assertFalse(data["A"].values.flags.writeable)
+        self.assertTrue(data["key"].values.flags.writeable)
+
+    def test_feather_mapped_size(self):
+        output_format = storage.get_format('feather')
+        output_format.write(self.df, "/tmp/Storage-mapped.feather")
+
+        cache = NodeDataCache()
+        data = cache.get("/tmp/Storage-mapped.feather", output_format.read, output_format.memory_mapped)
+
+        # Only the index and the copied column are counted
+        size = data.index.memory_usage(deep=True) + data["key"].memory_usage(index=False, deep=True)
+        self.assertEqual(cache.stats()["current_bytes"], size)
+        self.assertLess(size, NodeDataCache.estimate_size(data, 0))
+
+    def test_feather_overwrite_while_mapped(self):
+        output_format = storage.get_format('feather')
+        output_format.write(self.df, "/tmp/Storage-mapped.feather")
+        mapped = output_format.read("/tmp/Storage-mapped.feather")
+
+        output_format.write(self.df.iloc[:1], "/tmp/Storage-mapped.feather")
+
+        pd.testing.assert_frame_equal(mapped, self.df)
+        self.assertEqual(len(output_format.read("/tmp/Storage-mapped.feather")), 1)
+
+
+class PageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "key": ["K%d" % i for i in range(25)],
+            "A": [i % 7 for i in range(25)],
+            "B": [i * 0.5 for i in range(25)],
+        })
+
+    def store(self, data_format, data=None):
+        workflow = Workflow("Page", root_dir="/tmp", graph=nx.DiGraph(),
+                            flow_vars=nx.Graph(), data_format=data_format)
+        file_name = Workflow.store_node_data(workflow, "1", self.df if data is None else data)
+
+        # Read from disk, not from decoded data
+        workflow.data_cache.clear()
+
+        return workflow, Node({"node_id": "1", "data": file_name})
+
+    def test_page(self):
+        for data_format in ['json', 'parquet', 'feather']:
+            workflow, node = self.store(data_format)
+            page, rows = workflow.retrieve_node_data_page(node, offset=20, limit=10, columns=["key", "B"])
+
+            self.assertEqual(rows, 25)
+            self.assertEqual(list(page.columns), ["key", "B"])
+            self.assertEqual(list(page["key"]), ["K20", "K21", "K22", "K23", "K24"])
+            self.assertEqual([int(i) for i in page.index], [20, 21, 22, 23, 24])
+
+    def test_sorted_page(self):
+        for data_format in ['json', 'parquet', 'feather']:
+            workflow, node = self.store(data_format)
+            page, _ = workflow.retrieve_node_data_page(node, limit=3, columns=["key"], sort_by="A", ascending=False)
+
+            self.assertEqual(list(page.columns), ["key"])
+            self.assertEqual(list(page["key"]), ["K6", "K13", "K20"])
+            self.assertEqual([int(i) for i in page.index], [6, 13, 20])
+
+    def test_page_keeps_index(self):
+        for data_format in ['parquet', 'feather']:
+            workflow, node = self.store(data_format, self.df.set_index("key"))
+            page, _ = workflow.retrieve_node_data_page(node, offset=1, limit=2, columns=["B"])
+
+            pd.testing.assert_frame_equal(page, self.df.set_index("key")[["B"]].iloc[1:3])
+
+    def test_page_across_row_groups(self):
+        writer = storage.get_format('parquet').open_writer("/tmp/Page-chunks.parquet")
+        for start in range(0, 25, 10):
+            writer.write(self.df.iloc[start:start + 10])
+        writer.close()
+
+        workflow, _ = self.store('parquet')
+        page, rows = workflow.retrieve_node_data_page(Node({"node_id": "1", "data": "Page-chunks.parquet"}),
+                                                      offset=8, limit=4)
+
+        self.assertEqual(rows, 25)
+        pd.testing.assert_frame_equal(page, self.df.iloc[8:12])
+
+    def test_page_from_cache(self):
+        workflow, node = self.store('feather')
+        workflow.retrieve_node_data(node)
+
+        hits = workflow.data_cache.hits
+        page, rows = workflow.retrieve_node_data_page(node, offset=2, limit=2)
+
+        self.assertEqual(workflow.data_cache.hits, hits + 1)
+        pd.testing.assert_frame_equal(page, self.df.iloc[2:4])
+
+    def test_unknown_column(self):
+        for data_format in ['json', 'feather']:
+            workflow, node = self.store(data_format)
+
+            with self.assertRaises(WorkflowException):
+                workflow.retrieve_node_data_page(node, columns=["missing"])
+
+            with self.assertRaises(WorkflowException):
+                workflow.retrieve_node_data_page(node, sort_by="missing")
+
+    def test_schema(self):
+        for data_format in ['json', 'parquet', 'feather']:
+            workflow, node = self.store(data_format)
+            schema = workflow.retrieve_node_schema(node)
+
+            self.assertEqual(schema["rows"], 25)
+            self.assertEqual([column["name"] for column in schema["columns"]], ["key", "A", "B"])
+            self.assertEqual(schema["columns"][1]["type"], "int64")
+
+    def test_not_a_table(self):
+        workflow, node = self.store('feather', {"$schema": "vega", "data": {"values": []}})
+
+        self.assertEqual(workflow.retrieve_node_data_page(node, limit=1)[1], None)
+        self.assertIsNone(workflow.retrieve_node_schema(node))
+
+    def test_to_page_json(self):
+        page = storage.to_page_json(self.df.iloc[20:22], 25, 20)
+
+        self.assertEqual(page["rows"], 25)
+        self.assertEqual(page["offset"], 20)
+        self.assertEqual(page["columns"], ["key", "A", "B"])
+        self.assertEqual(page["index"], [20, 21])
+        self.assertEqual(page["data"][0], ["K20", 6, 10.0])
@@ -0,0 +1,95 @@
+import unittest
+import os
+from pyworkflow import Workflow, WorkflowException, NodeException, Node
+import networkx as nx
+import pandas as pd
+
+from pyworkflow.tests.sample_test_data import GOOD_NODES
+
+
+class StreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            "key": ["K%d" % i for i in range(25)],
+            "A": range(25),
+        })
+        self.df.to_csv("/tmp/stream_sample.csv", index=False)
+
+        self.workflow = Workflow("Stream", root_dir="/tmp", graph=nx.DiGraph(),
+                                 flow_vars=nx.Graph(), data_format='parquet')
+
+        # Read CSV (1) -> Filter (3) -> Write CSV (2)
+        read_csv = Node(dict(GOOD_NODES["read_csv_node"], options={"file": "/tmp/stream_sample.csv"}))
+        filter_node = Node(dict(GOOD_NODES["filter_node"], node_id="3", options={"regex": "^A$"}))
+        write_csv = Node(dict(GOOD_NODES["write_csv_node"], options={
+            "file": "/tmp/stream_out.csv",
+            "index": False,
+        }))
+
+        for node in [read_csv, filter_node, write_csv]:
+            self.workflow.update_or_add_node(node)
+
+        self.workflow.add_edge(read_csv, filter_node)
+        self.workflow.add_edge(filter_node, write_csv)
+
+    def test_stream_chains(self):
+        self.assertEqual(self.workflow.stream_chains(), [["1", "3", "2"]])
+
+    def test_branch_ends_chain(self):
+        write_csv = Node(dict(GOOD_NODES["write_csv_node"], node_id="4", options={"file": "/tmp/stream_out_4.csv"}))
+        self.workflow.update_or_add_node(write_csv)
+        self.workflow.add_edge(self.workflow.get_node("3"), write_csv)
+
+        self.assertEqual(self.workflow.stream_chains(), [["1", "3"]])
+
+    def test_json_format_does_not_stream(self):
+        workflow = Workflow("Stream", root_dir="/tmp", graph=self.workflow.graph,
+                            flow_vars=nx.Graph(), data_format='json')
+
+        self.assertEqual(workflow.stream_chains(), [])
+
+    def test_execute_stream(self):
+        executed = self.workflow.execute_stream(["1", "3", "2"], chunksize=10)
+
+        self.assertEqual([node.data for node in executed],
+                         ["Stream-1.parquet", "Stream-3.parquet", "Stream-2.parquet"])
+        pd.testing.assert_frame_equal(pd.read_csv("/tmp/stream_out.csv"), self.df[["A"]])
+
+        filtered = self.workflow.retrieve_node_data(executed[1])
+        self.assertEqual(list(filtered["A"]), list(range(25)))
+        self.assertEqual([self.workflow.get_node_rows(node_id) for node_id in ["1", "3", "2"]], [25, 25, 25])
+
+    def test_execute_all_chunksize(self):
+        executed = self.workflow.execute_all(chunksize=10)
+
+        self.assertEqual(set(executed), {"1", "2", "3"})
+        self.assertEqual(self.workflow.stale_nodes(), [])
+        pd.testing.assert_frame_equal(pd.read_csv("/tmp/stream_out.csv"), self.df[["A"]])
+
+    def test_execute_all_chunksize_processes(self):
+        executed = self.workflow.execute_all(max_workers=2, use_processes=True, chunksize=10)
+
+        self.assertEqual(set(executed), {"1", "2", "3"})
+        self.assertEqual(self.workflow.get_node("2").data, "Stream-2.parquet")
+
+    def test_unchanged_chain_is_cached(self):
+        self.workflow.execute_all(chunksize=10)
+        modified = os.stat("/tmp/stream_out.csv").st_mtime_ns
+
+        self.workflow.execute_stream(["1", "3", "2"], chunksize=10)
+
+        self.assertEqual(os.stat("/tmp/stream_out.csv").st_mtime_ns, modified)
+
+    def test_failed_chain(self):
+        read_csv = self.workflow.get_node("1")
+        read_csv.option_values["file"] = "/tmp/does_not_exist.csv"
+        self.workflow.update_or_add_node(read_csv)
+
+        with self.assertRaises(NodeException):
+            self.workflow.execute_stream(["1", "3", "2"], chunksize=10)
+
+        self.assertEqual([self.workflow.get_node_state(node_id) for node_id in ["1", "3", "2"]],
+                         [Workflow.FAILED] * 3)
+
+        with self.assertRaises(WorkflowException):
+            self.workflow.execute_all(chunksize=10)
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pyworkflow import ChunkedUpload
+from pyworkflow.upload import HASHER_TIMEOUT, save_upload
+
+
+class UploadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data = b"a,b\n" + b"1,2\n" * 100000
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        self.file_path = '/tmp/upload_test.csv'
+
+        for path in (self.file_path, self.file_path + '.part'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_file(self):
+        with open(self.file_path, 'rb') as f:
+            return f.read()
+
+    def test_save_upload(self):
+        saved = save_upload(io.BytesIO(self.data), self.file_path)
+
+        self.assertEqual(saved, {'size': len(self.data), 'sha256': self.sha256})
+        self.assertEqual(self.read_file(), self.data)
+        self.assertFalse(os.path.exists(self.file_path + '.part'))
+
+    def test_save_upload_failure_leaves_no_file(self):
+        with self.assertRaises(OSError):
+            save_upload(io.BytesIO(self.data), '/tmp/does-not-exist/upload_test.csv')
+
+        self.assertFalse(os.path.exists('/tmp/does-not-exist/upload_test.csv.part'))
+
+    def test_chunked_upload(self):
+        upload = ChunkedUpload(self.file_path)
+        offset = 0
+
+        for start in range(0, len(self.data), 65536):
+            offset = upload.append([self.data[start:start + 65536]], offset)
+
+        self.assertEqual(upload.offset, len(self.data))
+        self.assertEqual(upload.finish(self.sha256), {'size': len(self.data), 'sha256': self.sha256})
+        self.assertEqual(self.read_file(), self.data)
+        self.assertEqual(upload.offset, 0)
+        self.assertNotIn(upload.part_path, ChunkedUpload._locks)
+
+    def test_chunked_upload_wrong_offset(self):
+        upload = ChunkedUpload(self.file_path)
+        upload.append([self.data[:100]], 0)
+
+        with self.assertRaises(ValueError):
+            upload.append([self.data[100:200]], 50)
+
+        self.assertEqual(upload.offset, 100)
+
+    def test_chunked_upload_resumes_without_hash_state(self):
+        ChunkedUpload(self.file_path).append([self.data[:1000]], 0)
+        ChunkedUpload._hashers.clear()
+
+        upload = ChunkedUpload(self.file_path)
+        upload.append([self.data[1000:]], upload.offset)
+
+        self.assertEqual(upload.finish()['sha256'], self.sha256)
+
+    def test_chunked_upload_hash_state_expires(self):
+        abandoned = ChunkedUpload(self.file_path)
+
+        with mock.patch('pyworkflow.upload.time.monotonic', return_value=1000.0):
+            abandoned.append([self.data[:1000]], 0)
+
+        self.assertIn(abandoned.part_path, ChunkedUpload._hashers)
+
+        other = ChunkedUpload('/tmp/upload_test_other.csv')
+        self.addCleanup(other.abort)
+
+        with mock.patch('pyworkflow.upload.time.monotonic', return_value=1000.0 + HASHER_TIMEOUT + 1):
+            other.append([self.data[:1000]], 0)
+
+        self.assertNotIn(abandoned.part_path, ChunkedUpload._hashers)
+        self.assertIn(other.part_path, ChunkedUpload._hashers)
+
+        # Resuming the upload rebuilds its hash state from disk
+        abandoned.append([self.data[1000:]], abandoned.offset)
+        self.assertEqual(abandoned.finish()['sha256'], self.sha256)
+
+    def test_chunked_upload_hash_mismatch(self):
+        upload = ChunkedUpload(self.file_path)
+        upload.append([self.data], 0)
+
+        with self.assertRaises(ValueError):
+            upload.finish('0' * 64)
+
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(upload.offset, 0)
+
+    def test_chunked_upload_abort(self):
+        upload = ChunkedUpload(self.file_path)
+        upload.append([self.data[:100]], 0)
+        upload.abort()
+
+        self.assertEqual(upload.offset, 0)
+        self.assertNotIn(upload.part_path, ChunkedUpload._locks)
+
+        with self.assertRaises(ValueError):
+            upload.finish()
+
+    def test_chunked_upload_lock_kept_while_waiting(self):
+        upload = ChunkedUpload(self.file_path)
+
+        with upload._file_lock():
+            thread = threading.Thread(target=upload.append, args=([self.data[:100]], 0))
+            thread.start()
+
+            # Until the other request is waiting for the lock
+            while ChunkedUpload._locks[upload.part_path][1] < 2:
+                time.sleep(0.001)
+
+        thread.join(10)
+
+        self.assertEqual(upload.offset, 100)
+        self.assertNotIn(upload.part_path, ChunkedUpload._locks)
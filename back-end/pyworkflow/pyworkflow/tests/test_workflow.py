@@ -70,6 +70,7 @@ class WorkflowTestCase(unittest.TestCase):
             'root_dir': '/tmp',
             'graph': Workflow.to_graph_json(new_workflow.graph),
             'flow_vars': Workflow.to_graph_json(new_workflow.flow_vars),
+            'data_format': 'json',
         }
         self.assertDictEqual(new_workflow.to_session_dict(), workflow_to_compare)
 
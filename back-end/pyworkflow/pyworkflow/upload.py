@@ -0,0 +1,270 @@
+import hashlib
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# Bytes read and written at a time; bounds the memory an upload uses
+CHUNK_SIZE = 1024 * 1024
+
+# Suffix of a chunked upload's file until it is finished
+PART_SUFFIX = '.part'
+
+# Seconds the hash state of an unfinished upload is kept after its last piece
+HASHER_TIMEOUT = 60 * 60
+
+
+def iter_chunks(uploaded_file, chunk_size=CHUNK_SIZE):
+    """Read a file-like object in chunks of at most `chunk_size` bytes.
+
+    Django's UploadedFile is read with `chunks()`; any other object with a
+    `read()` method, e.g. a request body, is read directly.
+    """
+    if hasattr(uploaded_file, 'chunks'):
+        yield from uploaded_file.chunks(chunk_size)
+        return
+
+    while True:
+        chunk = uploaded_file.read(chunk_size)
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def write_chunks(chunks, f, hasher=None):
+    """Write chunks to an open file, adding each to `hasher`.
+
+    Returns:
+        Number of bytes written
+    """
+    size = 0
+
+    for chunk in chunks:
+        f.write(chunk)
+        size += len(chunk)
+
+        if hasher is not None:
+            hasher.update(chunk)
+
+    return size
+
+
+def hash_file(file_path, size=None):
+    """SHA-256 of a file, or of its first `size` bytes, read in chunks."""
+    hasher = hashlib.sha256()
+    remaining = size
+
+    with open(file_path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+
+            if not chunk:
+                break
+
+            hasher.update(chunk)
+
+            if remaining is not None:
+                remaining -= len(chunk)
+
+    return hasher
+
+
+def save_upload(uploaded_file, file_path):
+    """Stream an uploaded file to disk, hashing it as it is written.
+
+    The file is written next to `file_path`, then moved into place, so a
+    failed upload never leaves a partial file behind.
+
+    Args:
+        uploaded_file: Django UploadedFile, or a file-like object
+        file_path: Where to save the file
+
+    Returns:
+        dict of the saved file's 'size' in bytes and 'sha256' hex digest
+
+    Raises:
+        OSError: the file could not be written
+    """
+    hasher = hashlib.sha256()
+    temp_path = file_path + PART_SUFFIX
+
+    try:
+        with open(temp_path, 'wb') as f:
+            size = write_chunks(iter_chunks(uploaded_file), f, hasher)
+
+        os.replace(temp_path, file_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        uploaded_file.close()
+
+    return {'size': size, 'sha256': hasher.hexdigest()}
+
+
+class ChunkedUpload:
+    """A file uploaded in pieces, over several requests.
+
+    Each piece is appended at an offset, which must be the number of bytes
+    received so far; an upload interrupted by a lost connection resumes from
+    `offset`. Until `finish()`, the bytes are kept in `file_path` + '.part',
+    so the offset survives a restart of the server.
+
+    The SHA-256 of the file is computed as pieces arrive. The hash state is
+    kept in memory between requests, for up to `HASHER_TIMEOUT` seconds
+    after the last piece, so abandoned uploads do not hold on to it; if it
+    is lost, e.g. the upload resumes later or on another process, it is
+    rebuilt from the bytes on disk.
+
+    Attributes:
+        file_path: Where the finished file is saved
+        part_path: Where the file is kept until it is finished
+    """
+
+    # (offset, hasher, time last used) of uploads in progress, by part_path
+    _hashers = dict()
+
+    # [lock, number of requests using it] of uploads being written, by
+    # part_path; removed once unused
+    _locks = dict()
+    _lock = threading.Lock()
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.part_path = file_path + PART_SUFFIX
+
+    @property
+    def offset(self):
+        """Number of bytes received so far."""
+        try:
+            return os.path.getsize(self.part_path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, chunks, offset):
+        """Append a piece of the file.
+
+        Args:
+            chunks: Iterable of bytes, e.g. from `iter_chunks()`
+            offset: Position of the piece in the file
+
+        Returns:
+            The new offset
+
+        Raises:
+            ValueError: `offset` is not the number of bytes received so far
+            OSError: the file could not be written
+        """
+        with self._file_lock():
+            current = self.offset
+
+            if offset != current:
+                raise ValueError('Expected offset %d, not %d' % (current, offset))
+
+            if current == 0:
+                # Start over, e.g. an earlier upload of the same file was abandoned
+                open(self.part_path, 'wb').close()
+
+            hasher = self._hasher(current)
+
+            with open(self.part_path, 'ab') as f:
+                try:
+                    current += write_chunks(chunks, f, hasher)
+                except OSError:
+                    # The hash no longer matches what is on disk
+                    self._drop_hasher()
+                    raise
+
+            self._save_hasher(current, hasher)
+            return current
+
+    def finish(self, sha256=None):
+        """Move the uploaded file into place.
+
+        Args:
+            sha256: Hex digest the client computed, to check the file against
+
+        Returns:
+            dict of the file's 'size' in bytes and 'sha256' hex digest
+
+        Raises:
+            ValueError: nothing was uploaded, or the file does not match
+                `sha256`; the upload is discarded so it can be sent again
+            OSError: the file could not be moved
+        """
+        with self._file_lock():
+            if not os.path.exists(self.part_path):
+                raise ValueError('No upload in progress for %s' % os.path.basename(self.file_path))
+
+            size = self.offset
+            digest = self._hasher(size).hexdigest()
+            self._drop_hasher()
+
+            if sha256 is not None and sha256.lower() != digest:
+                os.remove(self.part_path)
+                raise ValueError('Uploaded file does not match its SHA-256: received %s' % digest)
+
+            os.replace(self.part_path, self.file_path)
+
+        return {'size': size, 'sha256': digest}
+
+    def abort(self):
+        """Discard the bytes received so far."""
+        with self._file_lock():
+            self._drop_hasher()
+
+            try:
+                os.remove(self.part_path)
+            except FileNotFoundError:
+                pass
+
+    def _hasher(self, offset):
+        with ChunkedUpload._lock:
+            saved = ChunkedUpload._hashers.get(self.part_path)
+
+        if saved is not None and saved[0] == offset:
+            return saved[1]
+
+        if offset == 0:
+            return hashlib.sha256()
+
+        return hash_file(self.part_path, offset)
+
+    def _save_hasher(self, offset, hasher):
+        now = time.monotonic()
+
+        with ChunkedUpload._lock:
+            ChunkedUpload._hashers[self.part_path] = (offset, hasher, now)
+
+            # Forget the uploads no piece has arrived for in a while
+            for part_path, (_, _, used) in list(ChunkedUpload._hashers.items()):
+                if now - used > HASHER_TIMEOUT:
+                    del ChunkedUpload._hashers[part_path]
+
+    def _drop_hasher(self):
+        with ChunkedUpload._lock:
+            ChunkedUpload._hashers.pop(self.part_path, None)
+
+    @contextmanager
+    def _file_lock(self):
+        with ChunkedUpload._lock:
+            entry = ChunkedUpload._locks.setdefault(self.part_path, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with ChunkedUpload._lock:
+                entry[1] -= 1
+
+                # A request still waiting on the lock keeps it
+                if entry[1] == 0:
+                    del ChunkedUpload._locks[self.part_path]
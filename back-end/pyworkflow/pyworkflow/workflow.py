@@ -1,17 +1,24 @@
+import hashlib
 import inspect
 import importlib
 import json
 import os
 import networkx as nx
 import sys
+import threading
 
 from collections import OrderedDict
 from modulefinder import ModuleFinder
 
-from pyworkflow.nodes import ReadCsvNode, WriteCsvNode
-
+from . import export, storage, upload
+from .cache import NodeDataCache
+from .catalogue import NodeCatalogue
+from .journal import ChangeLog
 from .node import Node, NodeException
 from .node_factory import node_factory
+from .parameters import FileParameter
+from .registry import node_registry
+from .sampling import Sample
 
 
 class Workflow:
@@ -23,27 +30,125 @@ class Workflow:
         node_dir: Location of custom nodes
         graph: A NetworkX Directed Graph
         flow_vars: Global flow variables associated with workflow
+        data_format: Format to store DataFrames output by Nodes, e.g. 'json',
+            'parquet', or 'feather'
+        data_cache: LRU cache of decoded Node data, shared by all Workflows
+            in the process
+        node_catalogue: Cache of installed Nodes, shared by all Workflows in
+            the process
     """
 
     DEFAULT_ROOT_PATH = os.getcwd()
     DEFAULT_NODE_PATH = os.path.join(os.getcwd(), '../pyworkflow/pyworkflow/nodes')
+    DEFAULT_DATA_FORMAT = 'json'
+    DEFAULT_CHUNKSIZE = 100000
+
+    # Node execution states, stored on the graph
+    FRESH = 'fresh'
+    STALE = 'stale'
+    FAILED = 'failed'
+
+    # Graph attributes set by executing a Node
+    RESULT_ATTRIBUTES = ('state', 'data', 'cache_key', 'rows')
+
+    data_cache = NodeDataCache()
+    node_catalogue = NodeCatalogue()
 
     def __init__(self, name="Untitled", root_dir=DEFAULT_ROOT_PATH,
                  node_dir=DEFAULT_NODE_PATH, graph=nx.DiGraph(),
-                 flow_vars=nx.Graph()):
+                 flow_vars=nx.Graph(), data_format=DEFAULT_DATA_FORMAT):
         try:
             self._name = name
             self._root_dir = WorkflowUtils.set_dir(root_dir)
             self._node_dir = WorkflowUtils.set_dir(node_dir, custom_nodes=True)
             self._graph = graph
             self._flow_vars = flow_vars
+            self._data_format = storage.get_format(data_format).name
+
+            # Identity maps of constructed Node objects, indexed by node_id,
+            # and the `node_registry.generation` their classes are from
+            self._nodes = dict()
+            self._flow_var_nodes = dict()
+            self._node_generation = node_registry.generation
+
+            self._version = 0
+            self._changes = ChangeLog()
+            self._lock = threading.RLock()
         except OSError as e:
             raise WorkflowException('init workflow', str(e))
+        except ValueError as e:
+            raise WorkflowException('init workflow', str(e))
+
+    def __getstate__(self):
+        # Nodes are rebuilt from the graph on demand, e.g. in a worker process
+        state = self.__dict__.copy()
+        state['_nodes'] = dict()
+        state['_flow_var_nodes'] = dict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._node_generation = node_registry.generation
+        self._lock = threading.RLock()
 
     @property
     def node_dir(self):
         return self._node_dir
 
+    @property
+    def lock(self):
+        """Re-entrant lock, held while the Workflow is changed or serialized.
+
+        A Workflow shared between threads (e.g., a live Workflow served to
+        concurrent requests, and saved by a background thread) must only be
+        read or changed by the thread holding its lock. The Workflow does not
+        take the lock itself.
+        """
+        return self._lock
+
+    @property
+    def version(self):
+        """Number of changes made to the Workflow since it was loaded.
+
+        Every change to the name, graph, or flow variables increments the
+        version, so callers can tell whether the Workflow needs saving.
+        """
+        return self._version
+
+    def _changed(self, graph_name=None, node_id=None, edges=(), renamed=False):
+        self._version += 1
+
+        if node_id is not None:
+            self._changes.nodes.add((graph_name, node_id))
+
+        self._changes.edges.update(edges)
+        self._changes.renamed = self._changes.renamed or renamed
+
+    def journal_entries(self):
+        """Take the changes made since the last call, as journal entries.
+
+        See `WorkflowJournal`.
+
+        Returns:
+            list of entries, or None if the changes cannot be journaled, and
+            the whole Workflow must be saved instead.
+        """
+        changes, self._changes = self._changes, ChangeLog()
+
+        if changes.snapshot:
+            return None
+
+        try:
+            return changes.entries(self)
+        except RuntimeError:
+            # The graph changed while being read
+            return None
+
+    def require_snapshot(self):
+        """Mark that the whole Workflow must be saved, e.g. after a failed save."""
+        self._changes.snapshot = True
+
     @property
     def graph(self):
         return self._graph
@@ -62,6 +167,10 @@ class Workflow:
     def flow_vars(self):
         return self._flow_vars
 
+    @property
+    def data_format(self):
+        return self._data_format
+
     def get_packaged_nodes(self, root_path=None, node_type=None):
         """Retrieve list of Nodes available to the Workflow.
 
@@ -72,6 +181,8 @@ class Workflow:
         'io', etc.). Individual Node classes are defined in files within these
         directories. Any custom nodes that the user has installed are included
         in this search, given they are located in the 'custom_nodes' directory.
+        Nodes that installed packages register through entry points (see
+        `NodeRegistry`) are added under their `node_type`.
 
         Args:
             root_path: Root location where Nodes are defined.
@@ -121,6 +232,13 @@ class Workflow:
             nodes.append(WorkflowUtils.extract_node_info(node_type, node, file_path))
 
         if root_path == self.node_dir:
+            # Add Nodes registered by installed packages
+            for registered_type, node_key in node_registry.entry_point_nodes():
+                display_name = WorkflowUtils.get_display_name(registered_type)
+                data.setdefault(display_name, list()).append(
+                    WorkflowUtils.extract_registered_node_info(registered_type, node_key)
+                )
+
             # When traversal returns to `node_dir` return the entire OrderedDict()
             data.move_to_end('Custom Nodes')
             return data
@@ -128,17 +246,35 @@ class Workflow:
             # Otherwise, return list containing all Nodes of a `node_type`
             return nodes
 
+    def get_node_catalogue(self):
+        """Retrieve the list of Nodes in `node_dir`, with its version.
+
+        Same as `get_packaged_nodes()`, but the list is cached in
+        `node_catalogue`, and only rebuilt when a file in `node_dir`, or a
+        package providing Nodes through entry points, changes.
+
+        Returns:
+            Tuple of the Node list and an ETag identifying its version, or
+            None if `node_dir` does not exist.
+        """
+        try:
+            return self.node_catalogue.get(self.node_dir, self.get_packaged_nodes,
+                                           node_registry.entry_point_distributions())
+        except OSError:
+            return None
+
     def get_node(self, node_id):
         """Retrieves Node from workflow, if exists
 
+        The Node is constructed from the graph on first access, then the same
+        object is returned until it is replaced by `update_or_add_node()` or
+        removed. Changes to it are saved to the graph by `update_or_add_node()`.
+
         Return:
             Node object, if one exists. Otherwise, None.
         """
-        if self._graph.has_node(node_id) is not True:
-            return None
-
-        node_info = self.graph.nodes[node_id]
-        return node_factory(node_info)
+        self._check_node_classes()
+        return self._get_node(self.graph, self._nodes, node_id)
 
     def get_flow_var(self, node_id):
         """Retrieves a global flow variable from workflow, if exists
@@ -146,11 +282,36 @@ class Workflow:
         Return:
             FlowNode object, if one exists. Otherwise, None.
         """
-        if self.flow_vars.has_node(node_id) is not True:
+        self._check_node_classes()
+        return self._get_node(self.flow_vars, self._flow_var_nodes, node_id)
+
+    @staticmethod
+    def _get_node(graph, nodes, node_id):
+        if graph.has_node(node_id) is not True:
+            nodes.pop(node_id, None)
             return None
 
-        node_info = self.flow_vars.nodes[node_id]
-        return node_factory(node_info)
+        node = nodes.get(node_id)
+
+        if node is None:
+            node = node_factory(graph.nodes[node_id])
+
+            if node is not None:
+                nodes[node_id] = node
+
+        return node
+
+    def _check_node_classes(self):
+        """Discard constructed Nodes if a Node module was reloaded since."""
+        if self._node_generation != node_registry.generation:
+            self._nodes = dict()
+            self._flow_var_nodes = dict()
+            self._node_generation = node_registry.generation
+
+    def _forget_nodes(self, node_ids):
+        """Discard constructed Nodes, to be rebuilt from the graph."""
+        for node_id in node_ids:
+            self._nodes.pop(node_id, None)
 
     def get_all_flow_var_options(self, node_id):
         """Retrieve all FlowNode options for a specified Node.
@@ -180,23 +341,49 @@ class Workflow:
     def update_or_add_node(self, node: Node):
         """ Update or add a Node object to the graph.
 
+        New Nodes, and Nodes with changed options or flow variables, are
+        marked stale, along with every Node that depends on them.
+
         Args:
             node - The Node object to update or add to the graph
         """
         # Select the correct graph to modify
         graph = self.flow_vars if node.is_global else self.graph
+        self._changed('flow_vars' if node.is_global else 'graph', node.node_id)
 
         if graph.has_node(node.node_id) is False:
             graph.add_node(node.node_id)
+            changed = True
+        else:
+            node_info = graph.nodes[node.node_id]
+            changed = (node_info.get('options') != node.option_values
+                       or node_info.get('option_replace') != node.option_replace)
 
         # NetworkX cannot store mutable data, so iterate through all Node
-        # attributes to add to graph
+        # attributes to add to graph. Option dicts are copied, so later
+        # changes to the Node are detected on the next update.
         node_dict = node.__dict__
         for key in node_dict.keys():
             out_key = key
+            value = node_dict[key]
             if key == "option_values":
                 out_key = "options"
-            graph.nodes[node.node_id][out_key] = node_dict[key]
+                value = dict(value)
+            elif key == "option_replace":
+                value = {option: dict(replacement) for option, replacement in value.items()}
+            graph.nodes[node.node_id][out_key] = value
+
+        # Keep the live Node; any other object (e.g., a Node built from a
+        # request) is rebuilt from the graph on next access
+        nodes = self._flow_var_nodes if node.is_global else self._nodes
+        if nodes.get(node.node_id) is not node:
+            nodes.pop(node.node_id, None)
+
+        if changed and node.is_global:
+            for consumer_id in self.get_flow_var_consumers(node.node_id):
+                self.mark_stale(consumer_id)
+        elif changed:
+            self.mark_stale(node.node_id)
 
         return node
 
@@ -207,6 +394,7 @@ class Workflow:
     @name.setter
     def name(self, name: str):
         self._name = name
+        self._changed(renamed=True)
 
     @property
     def filename(self):
@@ -231,6 +419,8 @@ class Workflow:
             raise WorkflowException('add_node', 'Edge between nodes already exists.')
 
         self.graph.add_edge(from_id, to_id)
+        self._changed(edges=[(from_id, to_id)])
+        self.mark_stale(to_id)
 
         return (from_id, to_id)
 
@@ -251,6 +441,9 @@ class Workflow:
         except nx.NetworkXError:
             raise WorkflowException('remove_edge', 'Edge from %s to %s does not exist in graph.' % (from_id, to_id))
 
+        self._changed(edges=[(from_id, to_id)])
+        self.mark_stale(to_id)
+
         return (from_id, to_id)
 
     def remove_node(self, node):
@@ -263,11 +456,155 @@ class Workflow:
             # Select the correct graph to modify
             graph = self.flow_vars if node.is_global else self.graph
 
+            # Nodes that depended on the removed Node are out of date
+            if node.is_global:
+                dependents = self.get_flow_var_consumers(node.node_id)
+            elif graph.has_node(node.node_id):
+                dependents = list(graph.successors(node.node_id))
+            else:
+                dependents = list()
+
+            # Edges are removed with the Node
+            if not node.is_global and graph.has_node(node.node_id):
+                edges = list(graph.in_edges(node.node_id)) + list(graph.out_edges(node.node_id))
+            else:
+                edges = list()
+
             graph.remove_node(node.node_id)
+            (self._flow_var_nodes if node.is_global else self._nodes).pop(node.node_id, None)
+            self._changed('flow_vars' if node.is_global else 'graph', node.node_id, edges)
+
+            for dependent_id in dependents:
+                self.mark_stale(dependent_id)
+
             return node
         except (AttributeError, nx.NetworkXError):
             raise WorkflowException('remove_node', 'Node does not exist in graph.')
 
+    def get_flow_var_consumers(self, flow_var_id):
+        """Retrieve Nodes that replace an option with a global flow variable."""
+        return [
+            node_id for node_id, option_replace in self.graph.nodes(data='option_replace')
+            if any(option.get('is_global') and option.get('node_id') == flow_var_id
+                   for option in (option_replace or dict()).values())
+        ]
+
+    def get_node_state(self, node_id):
+        """Retrieve a Node's execution state.
+
+        Returns:
+            FRESH if the Node's stored output is up to date; FAILED if the
+            last execution raised an exception; otherwise STALE (including
+            Nodes that have never executed).
+        """
+        return self.graph.nodes[node_id].get('state', Workflow.STALE)
+
+    def set_node_state(self, node_id, state):
+        self.graph.nodes[node_id]['state'] = state
+        self._changed('graph', node_id)
+
+    def mark_stale(self, node_id, include_node=True):
+        """Mark a Node, and every Node downstream of it, as stale."""
+        to_mark = nx.descendants(self.graph, node_id)
+
+        if include_node:
+            to_mark.add(node_id)
+
+        for stale_id in to_mark:
+            self.set_node_state(stale_id, Workflow.STALE)
+
+    def get_node_rows(self, node_id):
+        """Number of rows in a Node's output when it last executed, or None."""
+        return self.graph.nodes[node_id].get('rows')
+
+    def set_node_rows(self, node_id, rows):
+        self.graph.nodes[node_id]['rows'] = rows
+
+    def snapshot(self):
+        """Copy the Workflow, e.g. to execute while this one keeps changing.
+
+        Each Node's graph attributes are copied, but not their values (e.g.,
+        the options dict, which may hold a stream such as stdin). Changes
+        replace these values rather than modify them, so they are not seen by
+        the other copy.
+
+        Returns:
+            New Workflow, with copies of the graph and flow variables
+        """
+        return type(self)(name=self.name, root_dir=self.root_dir, node_dir=self.node_dir,
+                          graph=self.graph.copy(), flow_vars=self.flow_vars.copy(),
+                          data_format=self.data_format)
+
+    def adopt(self, changed):
+        """Take the graph and flow variables of a changed `snapshot()`.
+
+        Used to make a series of changes all at once: they are made to a
+        snapshot, which is only adopted if every change succeeded. The
+        snapshot's changes count as this Workflow's, e.g. to be journaled.
+
+        Args:
+            changed: The changed snapshot, no longer used afterwards
+        """
+        self._graph = changed.graph
+        self._flow_vars = changed.flow_vars
+        self._nodes = changed._nodes
+        self._flow_var_nodes = changed._flow_var_nodes
+        self._node_generation = changed._node_generation
+
+        self._version += changed.version
+        self._changes.nodes.update(changed._changes.nodes)
+        self._changes.edges.update(changed._changes.edges)
+        self._changes.renamed = self._changes.renamed or changed._changes.renamed
+        self._changes.snapshot = self._changes.snapshot or changed._changes.snapshot
+
+    def apply_results(self, executed):
+        """Copy the results of executing a `snapshot()` of this Workflow.
+
+        A Node takes its state, stored data, and rows from `executed` only if
+        it, its local and global flow variables, and every Node upstream of it
+        are unchanged since the snapshot. A change marked the Node stale,
+        which the results of the old configuration must not undo.
+
+        Args:
+            executed: The executed snapshot
+        """
+        changed = set()
+
+        for node_id in nx.topological_sort(executed.graph):
+            if (node_id not in self.graph
+                    or not changed.isdisjoint(executed.graph.predecessors(node_id))
+                    or self._configuration(node_id) != executed._configuration(node_id)):
+                changed.add(node_id)
+                continue
+
+            attributes = self.graph.nodes[node_id]
+            results = {name: executed.graph.nodes[node_id].get(name) for name in Workflow.RESULT_ATTRIBUTES}
+
+            if any(attributes.get(name) != value for name, value in results.items()):
+                attributes.update(results)
+                self._forget_nodes([node_id])
+                self._changed('graph', node_id)
+
+    def _configuration(self, node_id):
+        """Everything a Node's results depend on, besides upstream Nodes."""
+        attributes = self.graph.nodes[node_id]
+        flow_vars = {
+            option['node_id']: self.flow_vars.nodes[option['node_id']].get('options')
+            for option in attributes.get('option_replace', dict()).values()
+            if option.get('is_global') and option.get('node_id') in self.flow_vars
+        }
+
+        # The preview is a cache of a sample, not configuration
+        ignored = Workflow.RESULT_ATTRIBUTES + ('preview',)
+
+        return ({name: value for name, value in attributes.items() if name not in ignored},
+                sorted(self.graph.predecessors(node_id)), flow_vars)
+
+    def stale_nodes(self):
+        """Retrieve all Nodes that are not FRESH, in execution order."""
+        return [node_id for node_id in self.execution_order()
+                if self.get_node_state(node_id) != Workflow.FRESH]
+
     def get_node_successors(self, node_id):
         try:
             return list(self.graph.successors(node_id))
@@ -280,7 +617,7 @@ class Workflow:
         except nx.NetworkXError as e:
             raise WorkflowException('get node predecessors', str(e))
 
-    def execute(self, node_id):
+    def execute(self, node_id, use_cache=True, preview=None):
         """Execute a single Node in the graph.
 
         Reads any stored data from preceding Nodes and passes in to
@@ -288,36 +625,592 @@ class Workflow:
         DataFrame is returned as a JSON object that is written to a new
         file, with the file name saved to the executed Node.
 
+        If the Node's options, flow variables and input data are unchanged
+        since it last executed, its stored output is reused instead of
+        executing the Node again. See `execution_cache_key()`.
+
+        The Node is marked FRESH on success, or FAILED if an exception is
+        raised. Either way, its descendants are marked stale if its output
+        may have changed.
+
+        With `preview`, the Node is instead executed on a sample of the data,
+        with its ancestors, and its full output is left as it is. See
+        `execute_preview()`.
+
+        Args:
+            node_id: The Node to execute
+            use_cache: False, to always execute the Node
+            preview: A Sample, to execute in preview mode
+
         Returns:
             Executed Node object
 
         """
-        node_to_execute = self.get_node(node_id)
+        if preview is not None:
+            self.execute_preview(node_id, preview, use_cache=use_cache)
+            return self.get_node(node_id)
+
+        return self.execute_segment([node_id], use_cache=use_cache)[0]
+
+    def execute_preview(self, node_id, sample=None, use_cache=True):
+        """Execute a Node, and its ancestors, on a sample of the data.
+
+        Source Nodes read only the sample (see `Node.execute_preview()`), and
+        every Node downstream runs on it, so a preview of a Node at the end of
+        a long pipeline over a large file takes about as long as over a small
+        one. Each Node's output is capped at the sample size.
+
+        Preview output is stored apart from the output of a full run: in
+        files named '<workflow>-<node_id>-preview', and described by the
+        graph's 'preview' attribute (see `get_preview()`). A Node's state,
+        `data`, and cache key are unchanged, so a preview never makes a full
+        run look up to date.
+
+        As for `execute_segment()`, a Node is only executed again if its
+        options, input files, or upstream previews changed since its last
+        preview with the same sample.
+
+        Args:
+            node_id: The Node to preview
+            sample: The Sample to read; defaults to the first
+                `Sample.DEFAULT_ROWS` rows
+            use_cache: False, to always execute the Nodes
+
+        Returns:
+            list of node_ids executed, in execution order; Nodes whose
+            preview was up to date are not included
+
+        Raises:
+            WorkflowException: the graph does not contain the Node, or a Node
+                failed to execute
+        """
+        if sample is None:
+            sample = Sample()
+
+        if not self.graph.has_node(node_id):
+            raise WorkflowException('execute preview', 'The workflow does not contain node %s' % node_id)
+
+        needed = nx.ancestors(self.graph, node_id) | {node_id}
+        preview_keys = dict()
+        outputs = dict()
+        executed = list()
+
+        for preview_id in self.execution_order():
+            node = self.get_node(preview_id)
+
+            if preview_id not in needed or node.node_type == 'flow_control':
+                continue
+
+            try:
+                flow_nodes = self.load_flow_nodes(node.option_replace)
+                execution_options = node.get_execution_options(self, flow_nodes)
+
+                # A preview downstream of one that cannot be cached cannot be either
+                cache_key = self.execution_cache_key(node, execution_options, preview_keys)
+                if any(preview_keys.get(predecessor_id, '') is None
+                       for predecessor_id in self.get_node_predecessors(preview_id)):
+                    cache_key = None
+                elif cache_key is not None:
+                    key = json.dumps([cache_key, sample.to_json()], sort_keys=True)
+                    cache_key = hashlib.sha256(key.encode()).hexdigest()
+                preview_keys[preview_id] = cache_key
+
+                preview = self.get_preview(preview_id)
+                if (use_cache and cache_key is not None and preview is not None
+                        and preview.get('cache_key') == cache_key and os.path.exists(self.path(preview['data']))):
+                    continue
+
+                input_data = list()
+                for predecessor_id in self.get_node_predecessors(preview_id):
+                    if predecessor_id in outputs:
+                        input_data.append(outputs[predecessor_id])
+                    elif self.graph.nodes[predecessor_id].get('node_type') != 'flow_control':
+                        input_data.append(self.retrieve_node_data(self.get_node(predecessor_id), preview=True))
+
+                node.validate_input_data(len(input_data))
+                output = sample.limit(node.execute_preview(input_data, execution_options, sample))
+            except (NodeException, WorkflowException) as e:
+                self._set_preview(preview_id, None)
+                raise WorkflowException('execute preview', 'Node %s failed: %s' % (preview_id, e.reason))
+
+            file_name = Workflow.store_node_data(self, preview_id, output, suffix='-preview')
+
+            if file_name is None:
+                self._set_preview(preview_id, None)
+                raise WorkflowException('execute preview', 'There was a problem saving preview output.')
+
+            self._set_preview(preview_id, {
+                'data': file_name,
+                'rows': len(output) if storage.is_dataframe(output) else None,
+                'cache_key': cache_key,
+                'sample': sample.to_json(),
+            })
+
+            outputs[preview_id] = output
+            executed.append(preview_id)
+
+        return executed
+
+    def get_preview(self, node_id):
+        """Describe a Node's latest preview output.
+
+        Returns:
+            dict of the preview's 'data' file name, number of 'rows', its
+            'cache_key', and the 'sample' it was run on; or None if the Node
+            has no preview
+        """
+        return self.graph.nodes[node_id].get('preview')
+
+    def _set_preview(self, node_id, preview):
+        if preview is None:
+            self.graph.nodes[node_id].pop('preview', None)
+        else:
+            self.graph.nodes[node_id]['preview'] = preview
+
+        self._changed('graph', node_id)
+
+    def execute_segment(self, node_ids, store=None, use_cache=True):
+        """Execute a linear chain of Nodes in a single pass.
+
+        The first Node reads its input from the stored data of its
+        predecessors. Each later Node receives the output of the one before
+        in memory, converted as storing and reading it back would (see
+        `NodeDataFormat.round_trip()`), so intermediate output is only written
+        to disk if requested in `store`. Output an earlier execution stored for an
+        intermediate Node is kept, unless the Node's cache key has changed.
+        See `planner.ExecutionPlan`.
+
+        Each Node is marked FRESH as it finishes, and all but the last are
+        saved back to the graph. If one fails, it is marked FAILED, and the
+        rest of the chain stale.
+        If the stored output of every Node in `store` is up to date (see
+        `is_cached()`), the chain is not executed again.
+
+        Args:
+            node_ids: Chain of Nodes, each the only input of the next
+            store: Nodes whose output to store. Defaults to the last Node.
+            use_cache: False, to always execute the Nodes
+
+        Returns:
+            list of executed Node objects
+
+        Raises:
+            NodeException, WorkflowException: a Node failed to execute
+        """
+        if store is None:
+            store = [node_ids[-1]]
+
+        nodes = list()
+        execution_options = dict()
+        cache_keys = dict()
+
+        for node_id in node_ids:
+            node_to_execute = self.get_node(node_id)
 
-        if node_to_execute is None:
-            raise WorkflowException('execute', 'The workflow does not contain node %s' % node_id)
+            if node_to_execute is None:
+                raise WorkflowException('execute', 'The workflow does not contain node %s' % node_id)
 
-        # Load predecessor data and FlowNode values
-        preceding_data = self.load_input_data(node_to_execute.node_id)
-        flow_nodes = self.load_flow_nodes(node_to_execute.option_replace)
+            nodes.append(node_to_execute)
 
+        node_id = node_ids[0]
         try:
-            # Validate input data, and replace flow variables
-            node_to_execute.validate_input_data(len(preceding_data))
-            execution_options = node_to_execute.get_execution_options(self, flow_nodes)
+            for node_to_execute in nodes:
+                self.set_node_state(node_to_execute.node_id, Workflow.STALE)
+
+            for node_to_execute in nodes:
+                node_id = node_to_execute.node_id
+
+                # Load FlowNode values
+                flow_nodes = self.load_flow_nodes(node_to_execute.option_replace)
+
+                # Replace flow variables
+                execution_options[node_id] = node_to_execute.get_execution_options(self, flow_nodes)
+                cache_keys[node_id] = self.execution_cache_key(node_to_execute, execution_options[node_id], cache_keys)
+
+            # Reuse the stored output if nothing has changed since last run
+            if use_cache and all(self.is_cached(node, cache_keys[node.node_id], execution_options[node.node_id])
+                                 for node in nodes if node.node_id in store):
+                for node_to_execute in nodes:
+                    self.set_node_state(node_to_execute.node_id, Workflow.FRESH)
+                return nodes
+
+            output = None
+            for node_to_execute in nodes:
+                node_id = node_to_execute.node_id
+
+                # Load and validate predecessor data
+                if node_to_execute is nodes[0]:
+                    preceding_data = self.load_input_data(node_id)
+                else:
+                    # As the Node would read it, had it been stored
+                    preceding_data = [storage.format_for_data(self.data_format, output).round_trip(output)]
+                node_to_execute.validate_input_data(len(preceding_data))
+
+                # Pass in data to current Node to use in execution
+                output = node_to_execute.execute(preceding_data, execution_options[node_id])
+
+                self.set_node_rows(node_id, len(output) if storage.is_dataframe(output) else None)
+
+                # Save new execution data to disk
+                if node_id in store:
+                    node_to_execute.data = Workflow.store_node_data(self, node_id, output)
 
-            # Pass in data to current Node to use in execution
-            output = node_to_execute.execute(preceding_data, execution_options)
+                    if node_to_execute.data is None and node_to_execute.node_type != "flow_control":
+                        raise WorkflowException('execute', 'There was a problem saving node output.')
+                elif self.graph.nodes[node_id].get('cache_key') != cache_keys[node_id]:
+                    # Output stored by an earlier execution no longer matches
+                    node_to_execute.data = None
 
-            # Save new execution data to disk
-            node_to_execute.data = Workflow.store_node_data(self, node_id, output)
-        except NodeException as e:
+                # As for `execute()`, the caller saves the last Node
+                if node_to_execute is not nodes[-1]:
+                    self.update_or_add_node(node_to_execute)
+
+                self.graph.nodes[node_id]['cache_key'] = cache_keys[node_id]
+                self.set_node_state(node_id, Workflow.FRESH)
+        except (NodeException, WorkflowException) as e:
+            self.set_node_state(node_id, Workflow.FAILED)
+            self.mark_stale(node_id, include_node=False)
+
+            # Unsaved changes (e.g., to `data`) must not reach other callers
+            self._forget_nodes(node_ids)
             raise e
 
-        if node_to_execute.data is None and node_to_execute.node_type != "flow_control":
-            raise WorkflowException('execute', 'There was a problem saving node output.')
+        self.mark_stale(node_ids[-1], include_node=False)
+
+        return nodes
+
+    def execution_cache_key(self, node, execution_options, input_keys=None):
+        """Generate a key identifying a Node's execution.
+
+        The key is a hash of the Node's class, the option values it would
+        execute with (after flow variable replacement), and fingerprints of
+        its input data. A predecessor's fingerprint is its own cache key, so a
+        change anywhere upstream changes the key of every descendant. Input
+        files (a FileParameter, e.g. for a Read CSV Node) are fingerprinted by
+        modification time and size.
+
+        Args:
+            node: The Node to execute
+            execution_options: Options returned by `get_execution_options()`
+            input_keys: dict of cache keys to use for predecessors, instead of
+                those stored in the graph
+
+        Returns:
+            Hex digest string, or None if the execution cannot be cached (e.g.,
+            an option is a stdin/stdout stream, or the Node has no output).
+        """
+        if node.node_type == 'flow_control':
+            return None
 
-        return node_to_execute
+        inputs = list()
+        for predecessor_id in self.get_node_predecessors(node.node_id):
+            predecessor = self.graph.nodes[predecessor_id]
+
+            if predecessor.get('node_type') == 'flow_control':
+                continue
+
+            if input_keys and predecessor_id in input_keys:
+                inputs.append(input_keys[predecessor_id])
+            else:
+                inputs.append(predecessor.get('cache_key') or self.file_fingerprint(predecessor.get('data')))
+
+        options = {key: option.get_value() for key, option in execution_options.items()}
+
+        key = {
+            'node': [node.node_type, node.node_key, node.filename],
+            'options': options,
+            'inputs': inputs,
+        }
+
+        input_file = execution_options.get('file')
+        if isinstance(input_file, FileParameter) and isinstance(input_file.get_value(), str):
+            key['file'] = self.file_fingerprint(input_file.get_value())
+
+        try:
+            encoded = json.dumps(key, sort_keys=True)
+        except TypeError:
+            return None
+
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def is_cached(self, node, cache_key, execution_options):
+        """Check whether a Node's stored output matches `cache_key`.
+
+        The stored output, and any file the Node writes (e.g., for a Write CSV
+        Node), must also still exist.
+        """
+        if cache_key is None or node.data is None:
+            return False
+
+        if self.graph.nodes[node.node_id].get('cache_key') != cache_key:
+            return False
+
+        output_file = execution_options.get('file')
+        if output_file is not None and not isinstance(output_file, FileParameter):
+            file_path = output_file.get_value()
+
+            if not isinstance(file_path, str) or not os.path.exists(file_path):
+                return False
+
+        return os.path.exists(self.path(node.data))
+
+    def file_fingerprint(self, file_name):
+        """Identify a version of a file by path, modification time, and size."""
+        if file_name is None:
+            return None
+
+        try:
+            stat = os.stat(self.path(file_name))
+            return [file_name, stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return [file_name, None, None]
+
+    def stream_chains(self, node_ids=None):
+        """Find chains of Nodes that can be executed in streaming mode.
+
+        A chain starts at a chunk-capable Node with no inputs (e.g., Read
+        CSV), and continues while the last Node has exactly one successor
+        that is also chunk-capable and has no other inputs.
+
+        Streaming requires a `data_format` that can be written in chunks; if
+        it cannot, no chains are returned.
+
+        Args:
+            node_ids: Nodes that may be included. Defaults to every Node.
+
+        Returns:
+            list of chains, each a list of node_ids in execution order
+        """
+        if not storage.get_format(self.data_format).chunked:
+            return list()
+
+        if node_ids is None:
+            node_ids = self.execution_order()
+
+        candidates = {
+            node_id for node_id in node_ids
+            if getattr(self.get_node(node_id), 'chunkable', False)
+        }
+
+        chains = list()
+        for node_id in node_ids:
+            if node_id not in candidates or self.graph.in_degree(node_id) > 0:
+                continue
+
+            chain = [node_id]
+            successors = list(self.graph.successors(node_id))
+
+            while (len(successors) == 1 and successors[0] in candidates
+                   and self.graph.in_degree(successors[0]) == 1):
+                chain.append(successors[0])
+                successors = list(self.graph.successors(successors[0]))
+
+            chains.append(chain)
+
+        return chains
+
+    def execute_stream(self, node_ids, chunksize=DEFAULT_CHUNKSIZE, use_cache=True):
+        """Execute a chain of Nodes in streaming mode.
+
+        Instead of each Node reading its whole input and writing its whole
+        output, DataFrame chunks are passed from each Node's `execute_chunks()`
+        to the next, so only a few chunks are in memory at once. Each Node's
+        output is still stored, one chunk at a time.
+
+        The chain is executed as a unit: if any Node fails, every Node in the
+        chain is marked FAILED. If the stored output of every Node is up to
+        date (see `is_cached()`), the chain is not executed again.
+
+        Args:
+            node_ids: Chain of Nodes, as returned by `stream_chains()`
+            chunksize: Number of rows per chunk
+            use_cache: False, to always execute the Nodes
+
+        Returns:
+            list of executed Node objects
+
+        Raises:
+            NodeException, WorkflowException: a Node failed to execute
+        """
+        data_format = storage.get_format(self.data_format)
+
+        nodes = list()
+        execution_options = dict()
+        cache_keys = dict()
+
+        try:
+            for node_id in node_ids:
+                node = self.get_node(node_id)
+
+                if node is None:
+                    raise WorkflowException('execute', 'The workflow does not contain node %s' % node_id)
+
+                flow_nodes = self.load_flow_nodes(node.option_replace)
+                execution_options[node_id] = node.get_execution_options(self, flow_nodes)
+                cache_keys[node_id] = self.execution_cache_key(node, execution_options[node_id], cache_keys)
+                nodes.append(node)
+
+            # Reuse the stored output if nothing has changed since last run
+            if use_cache and all(self.is_cached(node, cache_keys[node.node_id], execution_options[node.node_id])
+                                 for node in nodes):
+                for node_id in node_ids:
+                    self.set_node_state(node_id, Workflow.FRESH)
+                return nodes
+
+            file_names = [Workflow.generate_file_name(self, node_id) + data_format.extension for node_id in node_ids]
+            writers = list()
+
+            for file_name in file_names:
+                # Readers must not see decoded data from a previous execution
+                self.data_cache.invalidate(self.path(file_name))
+                writers.append(data_format.open_writer(self.path(file_name)))
+
+            # Connect each Node to the output of the one before
+            chunks = None
+            for node, writer in zip(nodes, writers):
+                node_chunks = node.execute_chunks(chunks, execution_options[node.node_id], chunksize)
+                chunks = Workflow.store_chunks(writer, node_chunks)
+
+            try:
+                for _ in chunks:
+                    pass
+            finally:
+                for writer in writers:
+                    writer.close()
+        except (NodeException, WorkflowException) as e:
+            for node_id in node_ids:
+                self.set_node_state(node_id, Workflow.FAILED)
+            self.mark_stale(node_ids[-1], include_node=False)
+            self._forget_nodes(node_ids)
+            raise e
+
+        for node, file_name, writer in zip(nodes, file_names, writers):
+            node.data = file_name
+            self.set_node_rows(node.node_id, writer.rows)
+            self.graph.nodes[node.node_id]['cache_key'] = cache_keys[node.node_id]
+            self.set_node_state(node.node_id, Workflow.FRESH)
+
+        self.mark_stale(node_ids[-1], include_node=False)
+
+        return nodes
+
+    @staticmethod
+    def store_chunks(writer, chunks):
+        """Write each chunk with `writer`, as it passes to the next Node."""
+        for chunk in chunks:
+            try:
+                writer.write(chunk)
+            except Exception as e:
+                raise WorkflowException('execute stream', 'There was a problem saving node output: %s' % e)
+
+            yield chunk
+
+    def execute_all(self, max_workers=None, use_processes=False, stale_only=False,
+                    chunksize=None, inspect=None, optimize=True):
+        """Execute every Node in the graph.
+
+        Independent branches are executed in parallel by a WorkflowExecutor;
+        each Node starts as soon as all of its predecessors have finished.
+
+        By default, the execution is optimized: Nodes whose results cannot
+        reach a sink are skipped, and linear chains of Nodes are executed in
+        a single pass, storing only the last Node's output. See
+        `planner.ExecutionPlan`.
+
+        Args:
+            max_workers: Number of Nodes to execute at once. Defaults to the
+                number of CPUs.
+            use_processes: Execute Nodes in a process pool instead of a
+                thread pool.
+            stale_only: Only execute Nodes that are not FRESH, i.e. those
+                changed (or downstream of a change) since they last executed.
+            chunksize: Rows per chunk, to execute chains of chunk-capable
+                Nodes in streaming mode. See `execute_stream()`.
+            inspect: Nodes whose output must be stored, even if optimized
+                away, e.g. to retrieve their data afterwards
+            optimize: False, to execute and store every Node on its own
+
+        Returns:
+            dict of executed Node objects, indexed by node_id
+
+        Raises:
+            WorkflowException: on an invalid graph, or if any Node failed.
+                Independent branches are still executed before raising.
+        """
+        return self._execute_nodes('execute all', self.stale_nodes() if stale_only else None,
+                                   max_workers=max_workers, use_processes=use_processes,
+                                   chunksize=chunksize, inspect=inspect, optimize=optimize)
+
+    def apply_batch(self, operations):
+        """Apply a list of graph changes all at once.
+
+        Every change is validated before any is applied, so either all are
+        applied or, if any is invalid, none are. See `batch.GraphBatch` for
+        the operations and the changes returned.
+
+        Raises:
+            WorkflowException: an operation is invalid
+        """
+        from .batch import GraphBatch
+
+        return GraphBatch(self, operations).apply()
+
+    def upstream_nodes(self, node_id):
+        """Retrieve the Nodes needed to bring a Node up to date.
+
+        These are the Node and its ancestors that are not FRESH, in execution
+        order. FRESH ancestors are not included: their stored output is used.
+
+        Raises:
+            WorkflowException: the graph does not contain the Node
+        """
+        if not self.graph.has_node(node_id):
+            raise WorkflowException('execute upstream', 'The workflow does not contain node %s' % node_id)
+
+        needed = nx.ancestors(self.graph, node_id) | {node_id}
+
+        return [upstream_id for upstream_id in self.stale_nodes() if upstream_id in needed]
+
+    def execute_upstream(self, node_id, max_workers=None, use_processes=False, optimize=False):
+        """Execute a Node, and any of its ancestors that are not up to date.
+
+        Brings a Node up to date in one call, instead of executing each Node
+        in turn with `execute()`. Only the Nodes returned by
+        `upstream_nodes()` are executed, so nothing happens if the Node is
+        already FRESH. Independent ancestors are executed in parallel.
+
+        Args:
+            node_id: The Node to execute
+            max_workers: Number of Nodes to execute at once. Defaults to the
+                number of CPUs.
+            use_processes: Execute Nodes in a process pool instead of a
+                thread pool.
+            optimize: True, to only store the output of the Node itself and
+                of Nodes needed by others; by default, every executed Node's
+                output is stored, so it can be retrieved afterwards.
+
+        Returns:
+            dict of executed Node objects, indexed by node_id
+
+        Raises:
+            WorkflowException: the graph does not contain the Node, is not a
+                DAG, or any Node failed
+        """
+        return self._execute_nodes('execute upstream', self.upstream_nodes(node_id),
+                                   max_workers=max_workers, use_processes=use_processes,
+                                   inspect=[node_id], optimize=optimize)
+
+    def _execute_nodes(self, action, node_ids, **options):
+        from .executor import WorkflowExecutor
+
+        executor = WorkflowExecutor(self, **options)
+        executed = executor.run(node_ids)
+
+        if executor.failed:
+            reasons = ['%s (%s)' % (node_id, e) for node_id, e in executor.failed.items()]
+            raise WorkflowException(action, 'Nodes failed to execute: ' + ', '.join(reasons))
+
+        return executed
 
     def load_flow_nodes(self, option_replace):
         """Construct dict of FlowNodes indexed by option name.
@@ -403,12 +1296,13 @@ class Workflow:
 
     @staticmethod
     def upload_file(uploaded_file, to_open):
-        try:
-            # TODO: Change to a stream/other method for large files?
-            with open(to_open, 'wb') as f:
-                f.write(uploaded_file.read())
+        """Save an uploaded file, streaming it to disk in chunks.
 
-            uploaded_file.close()
+        See `upload.save_upload()`, which also returns the file's size and
+        SHA-256.
+        """
+        try:
+            upload.save_upload(uploaded_file, to_open)
             return to_open
         except OSError as e:
             raise WorkflowException('upload_file', str(e))
@@ -428,63 +1322,198 @@ class Workflow:
 
             # Construct path to file in Workflow dir
             to_open = self.path(filename)
-            return open(to_open)
+            return open(to_open, 'rb')
         except KeyError:
             raise WorkflowException('download_file', '%s does not have an associated file' % node_id)
         except OSError as e:
             raise WorkflowException('download_file', str(e))
 
     @staticmethod
-    def store_node_data(workflow, node_id, data):
+    def store_node_data(workflow, node_id, data, suffix=''):
         """Store Node data
 
-        Writes the current DataFrame to disk in JSON format.
+        Writes the current DataFrame to disk in the Workflow's `data_format`.
+        Output that is not a DataFrame (e.g., a JSON string) is written as
+        JSON.
 
         Args:
             workflow: The Workflow that stores the graph.
             node_id: The Node which contains a DataFrame to save.
-            data: A pandas DataFrame converted to JSON.
+            data: A pandas DataFrame, or a DataFrame converted to JSON.
+            suffix: Added to the file name, e.g. '-preview' for preview output
 
         Returns:
-
+            Name of the file written, or None if there was nothing to save.
         """
-        file_name = Workflow.generate_file_name(workflow, node_id)
-        file_path = workflow.path(file_name)
+        if data is None:
+            return None
 
         try:
-            with open(file_path, 'w') as f:
-                f.write(data)
+            data_format = storage.format_for_data(workflow.data_format, data)
+            file_name = Workflow.generate_file_name(workflow, node_id) + suffix + data_format.extension
+            file_path = workflow.path(file_name)
+
+            # Readers must not see decoded data from a previous execution
+            workflow.data_cache.invalidate(file_path)
+            data_format.write(data, file_path)
             return file_name
         except Exception as e:
             return None
 
-    def retrieve_node_data(self, node_to_retrieve):
+    def retrieve_node_data(self, node_to_retrieve, preview=False):
         """Retrieve Node data
 
         Reads a saved DataFrame, referenced by the Node's 'data' attribute.
+        The file extension determines the format to read. Decoded data is
+        cached in `data_cache`, and shared with other readers of the file.
 
         Args:
             node_to_retrieve: The Node containing a DataFrame saved to disk.
+            preview: True, to read the Node's preview output instead
 
         Returns:
-            Contents of the file (a DataFrame) in a JSON object.
+            pandas DataFrame for binary formats; otherwise, the contents of the
+            file (a DataFrame) in a JSON object.
 
         Raises:
             WorkflowException: Node does not exist, file does not exist, or
                 problem parsing the file.
         """
+        file_name = self._data_file_name(node_to_retrieve, preview)
+        data_format = storage.format_for_file(file_name)
+
         try:
-            with open(self.path(node_to_retrieve.data)) as f:
-                return json.load(f)
+            return self.data_cache.get(self.path(file_name), data_format.read, data_format.memory_mapped)
         except OSError as e:
             raise WorkflowException('retrieve node data', str(e))
-        except TypeError:
+        except (ValueError, ImportError) as e:
+            # Includes json.JSONDecodeError, and a missing/failing `pyarrow`
+            raise WorkflowException('retrieve node data', str(e))
+
+    def retrieve_node_data_page(self, node_to_retrieve, offset=0, limit=None, columns=None, sort_by=None,
+                                ascending=True, preview=False):
+        """Retrieve a page of a Node's data.
+
+        Binary formats (see `storage.ArrowFormat`) read only the page from
+        disk, unless the whole DataFrame is already in `data_cache`. JSON data
+        is decoded, and cached, in full.
+
+        Args:
+            node_to_retrieve: The Node containing a DataFrame saved to disk.
+            offset: Number of rows to skip
+            limit: Maximum number of rows; None for all
+            columns: Columns to include; None for all
+            sort_by: Column to sort by before paging
+            ascending: Sort order
+            preview: True, to read the Node's preview output instead
+
+        Returns:
+            Tuple of the page (a DataFrame, or the whole data if it is not a
+            table) and the total number of rows (None if not a table)
+
+        Raises:
+            WorkflowException: Node has not executed, file does not exist,
+                problem parsing the file, or an unknown column
+        """
+        def read(file_path, data_format, data):
+            if data is None and data_format.sliceable:
+                return data_format.read_slice(file_path, offset, limit, columns, sort_by, ascending)
+
+            if data is None:
+                data = self.data_cache.get(file_path, data_format.read, data_format.memory_mapped)
+
+            return storage.slice_data(data, offset, limit, columns, sort_by, ascending)
+
+        return self._read_node_data(node_to_retrieve, read, preview)
+
+    def retrieve_node_schema(self, node_to_retrieve, preview=False):
+        """Retrieve the number of rows in a Node's data, and its columns.
+
+        As for `retrieve_node_data_page()`, binary formats only read the
+        file's metadata, and `preview` reads the Node's preview output.
+
+        Returns:
+            dict of the number of 'rows', and the 'columns', each a dict of
+            its 'name' and pandas 'type'; None if the data is not a table
+
+        Raises:
+            WorkflowException: Node has not executed, file does not exist, or
+                problem parsing the file
+        """
+        def read(file_path, data_format, data):
+            if data is None and data_format.sliceable:
+                return data_format.read_schema(file_path)
+
+            if data is None:
+                data = self.data_cache.get(file_path, data_format.read, data_format.memory_mapped)
+
+            return storage.data_schema(data)
+
+        return self._read_node_data(node_to_retrieve, read, preview)
+
+    def export_node_data(self, node_to_retrieve, export_format='csv', compression=None):
+        """Convert a Node's data to a download format, as it is streamed.
+
+        Only checks that the data can be read; the data itself is read, in
+        batches, as the returned DataExport is iterated.
+
+        Args:
+            node_to_retrieve: The Node containing a DataFrame saved to disk.
+            export_format: 'csv', 'jsonl', or 'parquet'
+            compression: 'gzip', 'zstd', or None
+
+        Returns:
+            A DataExport, which yields the converted data
+
+        Raises:
+            WorkflowException: Node has not executed, file does not exist,
+                problem reading the file, or unknown format or compression
+        """
+        def read(file_path, data_format, data):
+            if data_format.sliceable:
+                data_format.read_schema_metadata(file_path)
+            else:
+                os.stat(file_path)
+
+            return export.DataExport(file_path, data_format, export_format, compression)
+
+        return self._read_node_data(node_to_retrieve, read)
+
+    def _read_node_data(self, node_to_retrieve, read, preview=False):
+        """Call `read` with a Node's data file, its format, and its cached data."""
+        file_name = self._data_file_name(node_to_retrieve, preview)
+        file_path = self.path(file_name)
+
+        try:
+            return read(file_path, storage.format_for_file(file_name), self.data_cache.peek(file_path))
+        except OSError as e:
+            raise WorkflowException('retrieve node data', str(e))
+        except (ValueError, ImportError) as e:
+            # Includes json.JSONDecodeError, a missing/failing `pyarrow`, and
+            # unknown columns
+            raise WorkflowException('retrieve node data', str(e))
+
+    def _data_file_name(self, node_to_retrieve, preview=False):
+        """Name of a Node's output file, or of its preview output.
+
+        Raises:
+            WorkflowException: the Node has no such output
+        """
+        if not preview:
+            file_name = node_to_retrieve.data
+        elif self.graph.has_node(node_to_retrieve.node_id):
+            file_name = (self.get_preview(node_to_retrieve.node_id) or dict()).get('data')
+        else:
+            file_name = None
+
+        if file_name is None:
             raise WorkflowException(
                 'retrieve node data',
-                'Node %s has not yet been executed. No data to retrieve.' % node_to_retrieve.node_id
+                'Node %s has not yet been %s. No data to retrieve.' % (
+                    node_to_retrieve.node_id, 'previewed' if preview else 'executed')
             )
-        except json.JSONDecodeError as e:
-            raise WorkflowException('retrieve node data', str(e))
+
+        return file_name
 
     @staticmethod
     def read_graph_json(json_data):
@@ -532,8 +1561,9 @@ class Workflow:
             root_dir = json_data['root_dir']
             graph = Workflow.read_graph_json(json_data['graph'])
             flow_vars = Workflow.read_graph_json(json_data['flow_vars'])
+            data_format = json_data.get('data_format', Workflow.DEFAULT_DATA_FORMAT)
 
-            return cls(name=name, root_dir=root_dir, graph=graph, flow_vars=flow_vars)
+            return cls(name=name, root_dir=root_dir, graph=graph, flow_vars=flow_vars, data_format=data_format)
         except KeyError as e:
             raise WorkflowException('from_json', str(e))
         except nx.NetworkXError as e:
@@ -552,6 +1582,7 @@ class Workflow:
             out['root_dir'] = self.root_dir
             out['graph'] = Workflow.to_graph_json(self.graph)
             out['flow_vars'] = Workflow.to_graph_json(self.flow_vars)
+            out['data_format'] = self.data_format
             return out
         except nx.NetworkXError as e:
             raise WorkflowException('to_session_dict', str(e))
@@ -643,35 +1674,63 @@ class WorkflowUtils:
         # Parse module for Node Class information
         for name, klass in inspect.getmembers(module):
             if inspect.isclass(klass) and klass.__module__.startswith('pyworkflow.nodes.' + node_type):
-                try:
-                    color = klass.color
-                except AttributeError:
-                    color = 'black'
-
-                parsed_node = {
-                    'name': klass.name,
-                    'node_key': klass.__name__,
-                    'node_type': node_type,
-                    'num_in': klass.num_in,
-                    'num_out': klass.num_out,
-                    'color': color,
-                    'filename': node,
-                    'doc': klass.__doc__,
-                    'options': {k: v.get_value() for k, v in klass.options.items()},
-                    'option_types': klass.option_types,
-                    'download_result': getattr(klass, "download_result", False)
-                }
+                return WorkflowUtils.get_node_class_info(node_type, klass, node)
 
-                # if node_type == 'custom_nodes':
-                #     parsed_node['filename'] = node
+        return None
 
-                return parsed_node
+    @staticmethod
+    def get_node_class_info(node_type, klass, filename):
+        """Extract the attributes of a Node class needed by the front-end.
 
-        return None
+        Args:
+            node_type: The type of Node.
+            klass: The Node class.
+            filename: Name of the file the class is defined in.
+
+        Returns:
+            dict with extracted Node information.
+        """
+        try:
+            color = klass.color
+        except AttributeError:
+            color = 'black'
+
+        return {
+            'name': klass.name,
+            'node_key': klass.__name__,
+            'node_type': node_type,
+            'num_in': klass.num_in,
+            'num_out': klass.num_out,
+            'color': color,
+            'filename': filename,
+            'doc': klass.__doc__,
+            'options': {k: v.get_value() for k, v in klass.options.items()},
+            'option_types': klass.option_types,
+            'download_result': getattr(klass, "download_result", False)
+        }
+
+    @staticmethod
+    def extract_registered_node_info(node_type, node_key):
+        """Extract information about a Node registered by another package.
+
+        Returns:
+            dict-like with extracted Node information. If the Node cannot be
+            imported, the node_key and missing package are returned.
+        """
+        try:
+            klass = node_registry.get(node_type, node_key)
+        except ImportError as e:
+            return {
+                "filename": node_key,
+                "missing_packages": [e.name or str(e)]
+            }
+
+        return WorkflowUtils.get_node_class_info(node_type, klass, klass.__module__)
 
 
 class WorkflowException(Exception):
     def __init__(self, action: str, reason: str):
+        super().__init__(action, reason)
         self.action = action
         self.reason = reason
 
@@ -1,3 +1,159 @@
-from django.test import TestCase
+import gzip
+import io
+import json
 
-# Create your tests here.
+import pandas as pd
+
+from workflow.tests import WorkflowTestCase
+
+
+class ExecuteUpstreamTestCase(WorkflowTestCase):
+
+    def test_execute_upstream(self):
+        response = self.client.post('/node/2/execute_upstream')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(response.json()['executed'], ['1', '2'])
+        self.assertEqual(response.json()['data_file'], self.client.get('/node/2').json()['retrieved_node']['data'])
+
+        # Nothing changed, so nothing is executed again
+        self.assertListEqual(self.client.post('/node/2/execute_upstream').json()['executed'], [])
+
+    def test_execute_upstream_changed(self):
+        self.client.post('/node/2/execute_upstream')
+        self.post('/node/2', dict(self.write_csv_node('2'), options={'file': 'other.csv'}))
+
+        self.assertListEqual(self.client.post('/node/2/execute_upstream').json()['executed'], ['2'])
+
+    def test_execute_upstream_get(self):
+        self.assertEqual(self.client.get('/node/2/execute_upstream').status_code, 405)
+
+    def test_execute_upstream_unknown_node(self):
+        response = self.client.post('/node/3/execute_upstream')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('execute upstream', response.json())
+
+
+class RetrieveDataTestCase(WorkflowTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertEqual(self.client.post('/node/1/execute_upstream').status_code, 200)
+
+    def test_retrieve_data(self):
+        response = self.client.get('/node/1/retrieve_data')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(response.json()['key'], {'0': 'K0', '1': 'K1', '2': 'K2'})
+
+    def test_retrieve_page(self):
+        response = self.client.get('/node/1/retrieve_data?offset=1&limit=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rows'], 3)
+        self.assertEqual(response.json()['offset'], 1)
+        self.assertListEqual(response.json()['columns'], ['Unnamed: 0', 'key', 'A'])
+        self.assertListEqual(response.json()['index'], [1])
+        self.assertListEqual(response.json()['data'], [[1, 'K1', 'A1']])
+
+    def test_retrieve_page_columns_sorted(self):
+        response = self.client.get('/node/1/retrieve_data?columns=A&sort=-key')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(response.json()['columns'], ['A'])
+        self.assertListEqual(response.json()['index'], [2, 1, 0])
+        self.assertListEqual(response.json()['data'], [['A2'], ['A1'], ['A0']])
+
+    def test_retrieve_page_invalid(self):
+        for query in ('limit=-1', 'offset=first'):
+            response = self.client.get('/node/1/retrieve_data?' + query)
+
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('retrieve data', response.json())
+
+    def test_retrieve_data_unknown_node(self):
+        self.assertEqual(self.client.get('/node/3/retrieve_data').status_code, 404)
+
+    def test_retrieve_schema(self):
+        response = self.client.get('/node/1/retrieve_schema')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(response.json(), {'rows': 3, 'columns': [
+            {'name': 'Unnamed: 0', 'type': 'int64'},
+            {'name': 'key', 'type': 'object'},
+            {'name': 'A', 'type': 'object'},
+        ]})
+
+    def test_retrieve_schema_unknown_node(self):
+        self.assertEqual(self.client.get('/node/3/retrieve_schema').status_code, 404)
+
+
+class DownloadDataTestCase(WorkflowTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.assertEqual(self.client.post('/node/1/execute_upstream').status_code, 200)
+
+    def download(self, query=''):
+        response = self.client.get('/node/1/download_data' + query)
+        self.assertEqual(response.status_code, 200)
+
+        return response, b''.join(response.streaming_content)
+
+    def test_download_csv(self):
+        response, content = self.download()
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv"'))
+        self.assertListEqual(pd.read_csv(io.BytesIO(content))['key'].tolist(), ['K0', 'K1', 'K2'])
+
+    def test_download_jsonl_gzip(self):
+        response, content = self.download('?file_format=jsonl&compression=gzip')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.jsonl.gz"'))
+
+        rows = [json.loads(line) for line in gzip.decompress(content).decode().splitlines()]
+        self.assertListEqual([row['key'] for row in rows], ['K0', 'K1', 'K2'])
+
+    def test_download_parquet(self):
+        _, content = self.download('?file_format=parquet')
+
+        self.assertListEqual(pd.read_parquet(io.BytesIO(content))['A'].tolist(), ['A0', 'A1', 'A2'])
+
+    def test_download_invalid(self):
+        for query in ('?file_format=xml', '?compression=zip'):
+            response = self.client.get('/node/1/download_data' + query)
+
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('download data', response.json())
+
+    def test_download_unknown_node(self):
+        self.assertEqual(self.client.get('/node/3/download_data').status_code, 404)
+
+
+class PreviewTestCase(WorkflowTestCase):
+
+    def test_preview(self):
+        response = self.client.post('/node/2/execute_upstream?preview=true&rows=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(response.json()['executed'], ['1', '2'])
+        self.assertEqual(response.json()['preview']['rows'], 2)
+
+        response = self.client.get('/node/1/retrieve_data?preview=true')
+        self.assertDictEqual(response.json()['key'], {'0': 'K0', '1': 'K1'})
+
+        response = self.client.get('/node/1/retrieve_schema?preview=true')
+        self.assertEqual(response.json()['rows'], 2)
+
+        # The full output was not stored
+        self.assertListEqual(self.client.post('/workflow/execute/stale').json(), ['1', '2'])
+
+    def test_preview_invalid(self):
+        for query in ('rows=x', 'sample=bogus'):
+            response = self.client.post('/node/2/execute_upstream?preview=true&' + query)
+
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('execute preview', response.json())
@@ -6,6 +6,9 @@ urlpatterns = [
     path('<str:node_id>', views.handle_node, name='handle node'),
     path('global/<str:node_id>', views.handle_node, name='handle node'),
     path('<str:node_id>/execute', views.execute_node, name='execute node'),
+    path('<str:node_id>/execute_upstream', views.execute_upstream, name='execute node and upstream nodes'),
     path('<str:node_id>/retrieve_data', views.retrieve_data, name='retrieve data'),
+    path('<str:node_id>/retrieve_schema', views.retrieve_schema, name='retrieve schema'),
+    path('<str:node_id>/download_data', views.download_data, name='download data'),
     path('edge/<str:node_from_id>/<str:node_to_id>', views.handle_edge, name='handle edge')
 ]
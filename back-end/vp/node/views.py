@@ -1,8 +1,9 @@
 import json
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from pyworkflow import Workflow, WorkflowException, Node, NodeException, node_factory, ParameterValidationError
+from pyworkflow import Sample, export, storage
 from rest_framework.decorators import api_view
 from drf_yasg.utils import swagger_auto_schema
 
@@ -216,9 +217,12 @@ def handle_node(request, node_id):
 
 @swagger_auto_schema(method='get',
                      operation_summary='Execute a node in the graph.',
-                     operation_description='Executes a node in the graph.',
+                     operation_description='Executes a node in the graph. With `preview=true`, executes the node '
+                                           'and its ancestors on a sample of `rows` rows (default 1000), taken by '
+                                           '`sample` (head or reservoir, with `seed`).',
                      responses={
                          200: 'Node successfully executed',
+                         400: 'Invalid preview parameters',
                          404: 'Workflow not created yet/Workflow does not contain specified node'
                      })
 @api_view(['GET'])
@@ -228,7 +232,22 @@ def execute_node(request, node_id):
     Uses Workflow to handle preceding Nodes and reading/writing data. Returns
     an updated Node, with the filename for any new data written to disk stored
     in the 'data' attribute, for later access.
+
+    In preview mode, returns:
+        {
+            message: Success message,
+            executed: node_ids executed, in execution order,
+            preview: {data: Filename of the preview output, rows, sample},
+        }
     """
+    try:
+        sample = preview_sample(request.GET)
+    except ValueError as e:
+        return JsonResponse({'execute preview': str(e)}, status=400)
+
+    if sample is not None:
+        return execute_preview(request, node_id, sample)
+
     try:
         # Use Workflow to load preceding Node data and execute
         executed_node = request.pyworkflow.execute(node_id)
@@ -244,22 +263,244 @@ def execute_node(request, node_id):
         return JsonResponse({e.action: e.reason}, status=500)
 
 
+@swagger_auto_schema(method='post',
+                     operation_summary='Execute a node, and the nodes it depends on.',
+                     operation_description='Executes a node, and any of its ancestors that are not up to date, '
+                                           'in one request.',
+                     responses={
+                         200: 'Nodes successfully executed',
+                         404: 'Workflow not created yet/Workflow does not contain specified node',
+                         500: 'Error executing one or more nodes'
+                     })
+@api_view(['POST'])
+def execute_upstream(request, node_id):
+    """Execute the specified node, and the nodes it depends on
+
+    Only ancestors that changed since they last executed, or are downstream
+    of a change, are executed, followed by the node itself if it is not up to
+    date. Unlike executing each node in turn, this costs one request.
+
+    Returns:
+        200 - JSON response:
+            {
+                message: Success message,
+                executed: node_ids executed, in execution order,
+                data_file: Filename of the node's output,
+            }
+    """
+    if request.pyworkflow.get_node(node_id) is None:
+        return JsonResponse({'execute upstream': 'The workflow does not contain node %s' % node_id}, status=404)
+
+    try:
+        sample = preview_sample(request.GET)
+    except ValueError as e:
+        return JsonResponse({'execute preview': str(e)}, status=400)
+
+    if sample is not None:
+        # A preview always runs the node's ancestors
+        return execute_preview(request, node_id, sample)
+
+    try:
+        executed = request.pyworkflow.execute_upstream(node_id)
+        order = request.pyworkflow.execution_order()
+    except (NodeException, WorkflowException) as e:
+        return JsonResponse({e.action: e.reason}, status=500)
+
+    return JsonResponse({
+        'message': 'Node Execution successful!',
+        'executed': [executed_id for executed_id in order if executed_id in executed],
+        'data_file': request.pyworkflow.get_node(node_id).data,
+    }, safe=False)
+
+
+def execute_preview(request, node_id, sample):
+    """Execute a node, and its ancestors, on a sample of the data."""
+    if request.pyworkflow.get_node(node_id) is None:
+        return JsonResponse({'execute preview': 'The workflow does not contain node %s' % node_id}, status=404)
+
+    try:
+        executed = request.pyworkflow.execute_preview(node_id, sample)
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=500)
+
+    preview = request.pyworkflow.get_preview(node_id)
+
+    return JsonResponse({
+        'message': 'Node Preview successful!',
+        'executed': executed,
+        'preview': {key: preview[key] for key in ('data', 'rows', 'sample')},
+    }, safe=False)
+
+
 @swagger_auto_schema(method='get',
                      operation_summary='Gets the data frame at the executed node.',
-                     operation_description='Retrieves the state of data at that point in the graph.',
+                     operation_description='Retrieves the state of data at that point in the graph. With any of '
+                                           'the `offset`, `limit`, `columns` (comma-separated) or `sort` (a column; '
+                                           '`-column` for descending) query parameters, retrieves one page of rows. '
+                                           'With `preview=true`, retrieves the preview output instead.',
                      responses={
-                         200: 'Data successfully retrieved'
+                         200: 'Data successfully retrieved',
+                         400: 'Invalid page parameters'
                      })
 @api_view(['GET'])
 def retrieve_data(request, node_id):
+    """Retrieve a node's data, or a page of it.
+
+    Without query parameters, the whole data is returned as
+    {column: {index: value}}. With page parameters, only the page is read
+    and returned, as:
+        {
+            rows: Total number of rows,
+            offset: Index of the first row returned,
+            columns: Column names,
+            index: Index of each row,
+            data: List of rows, each a list of values,
+        }
+    """
+    node_to_retrieve = request.pyworkflow.get_node(node_id)
+
+    if node_to_retrieve is None:
+        return JsonResponse({'message': 'The workflow does not contain node id ' + str(node_id)}, status=404)
+
+    try:
+        page = page_parameters(request.GET)
+    except ValueError as e:
+        return JsonResponse({'retrieve data': str(e)}, status=400)
+
+    preview = is_preview(request.GET)
+
+    try:
+        if page is None:
+            data = request.pyworkflow.retrieve_node_data(node_to_retrieve, preview=preview)
+            return JsonResponse(storage.to_json(data), safe=False, status=200)
+
+        data, rows = request.pyworkflow.retrieve_node_data_page(node_to_retrieve, preview=preview, **page)
+        return JsonResponse(storage.to_page_json(data, rows, page['offset']), safe=False, status=200)
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=500)
+
+
+@swagger_auto_schema(method='get',
+                     operation_summary='Gets the row count and columns of the data at the executed node.',
+                     operation_description='Retrieves the number of rows, and the name and type of each column, '
+                                           'without reading the data itself. With `preview=true`, describes the '
+                                           'preview output instead.',
+                     responses={
+                         200: 'Schema successfully retrieved'
+                     })
+@api_view(['GET'])
+def retrieve_schema(request, node_id):
+    """Retrieve the shape of a node's data.
+
+    Returns:
+        200 - {rows: Number of rows, columns: [{name, type}]}, or null if
+            the node's data is not a table
+    """
+    node_to_retrieve = request.pyworkflow.get_node(node_id)
+
+    if node_to_retrieve is None:
+        return JsonResponse({'message': 'The workflow does not contain node id ' + str(node_id)}, status=404)
+
     try:
-        node_to_retrieve = request.pyworkflow.get_node(node_id)
-        data = request.pyworkflow.retrieve_node_data(node_to_retrieve)
-        return JsonResponse(data, safe=False, status=200)
+        schema = request.pyworkflow.retrieve_node_schema(node_to_retrieve, preview=is_preview(request.GET))
+        return JsonResponse(schema, safe=False)
     except WorkflowException as e:
         return JsonResponse({e.action: e.reason}, status=500)
 
 
+@swagger_auto_schema(method='get',
+                     operation_summary='Downloads the data at the executed node.',
+                     operation_description='Streams the data, converted to `file_format` (csv, jsonl or '
+                                           'parquet; default csv), and compressed if `compression` (gzip or zstd) '
+                                           'is given. (`format` selects a response renderer, so cannot be used.)',
+                     responses={
+                         200: 'Data streamed',
+                         400: 'Unknown format or compression',
+                         404: 'No such node'
+                     })
+@api_view(['GET'])
+def download_data(request, node_id):
+    """Download a node's data, converted to another format.
+
+    The data is read, converted and compressed in batches as it is sent, so
+    a large output is never held in memory in full.
+    """
+    node_to_retrieve = request.pyworkflow.get_node(node_id)
+
+    if node_to_retrieve is None:
+        return JsonResponse({'message': 'The workflow does not contain node id ' + str(node_id)}, status=404)
+
+    export_format = request.GET.get('file_format') or 'csv'
+    compression = request.GET.get('compression') or None
+
+    try:
+        export.check_format(export_format)
+        export.check_compression(compression)
+    except ValueError as e:
+        return JsonResponse({'download data': str(e)}, status=400)
+
+    try:
+        data = request.pyworkflow.export_node_data(node_to_retrieve, export_format, compression)
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=500)
+
+    response = StreamingHttpResponse(data, content_type=data.content_type)
+    response['Content-Disposition'] = 'attachment; filename="%s"' % data.filename(node_to_retrieve.data)
+    return response
+
+
+def page_parameters(query):
+    """Read page parameters for `retrieve_node_data_page()` from a query.
+
+    Returns:
+        dict of keyword arguments, or None if no page was requested
+
+    Raises:
+        ValueError: invalid parameter value
+    """
+    if not any(name in query for name in ('offset', 'limit', 'columns', 'sort')):
+        return None
+
+    page = {
+        'offset': int(query.get('offset') or 0),
+        'limit': int(query['limit']) if query.get('limit') else None,
+        'columns': [column for column in query['columns'].split(',') if column] if 'columns' in query else None,
+        'sort_by': query.get('sort') or None,
+        'ascending': True,
+    }
+
+    if page['offset'] < 0 or (page['limit'] is not None and page['limit'] < 0):
+        raise ValueError('offset and limit must not be negative')
+
+    if page['sort_by'] and page['sort_by'].startswith('-'):
+        page['sort_by'], page['ascending'] = page['sort_by'][1:], False
+
+    return page
+
+
+def is_preview(query):
+    return query.get('preview', '').lower() in ('1', 'true')
+
+
+def preview_sample(query):
+    """Read the Sample for a preview execution from a query.
+
+    Returns:
+        Sample, or None if no preview was requested
+
+    Raises:
+        ValueError: invalid parameter value
+    """
+    if not is_preview(query):
+        return None
+
+    return Sample(
+        rows=int(query.get('rows') or Sample.DEFAULT_ROWS),
+        method=query.get('sample') or 'head',
+        seed=int(query.get('seed') or 0),
+    )
+
+
 def create_node(request):
     """Pass all request info to Node Factory.
 
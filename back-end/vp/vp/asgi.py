@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vp.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Workflow progress is streamed to the browser outside of Django's request
+# handling; see workflow/events.py
+from workflow.events import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
@@ -80,6 +80,13 @@ TEMPLATES = [
 ]
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.file'
+SESSION_SERIALIZER = 'workflow.serializers.SessionSerializer'
+
+# Session data is encoded as 'msgpack' or 'json'; None picks msgpack if it is
+# installed. Django already zlib-compresses session data; set 'zstd' (requires
+# zstandard) or 'gzip' to compress it before signing instead.
+WORKFLOW_SESSION_ENCODING = None
+WORKFLOW_SESSION_COMPRESSION = None
 
 WSGI_APPLICATION = 'vp.wsgi.application'
 
@@ -91,6 +98,36 @@ DATABASES = {}
 
 MEDIA_ROOT = '/tmp'
 
+# Format for storing intermediate node data in MEDIA_ROOT: 'json', 'parquet',
+# or 'feather'. Binary formats require pyarrow. Feather (Arrow IPC) files are
+# memory-mapped when read; see FeatherFormat for which columns are not copied.
+NODE_DATA_FORMAT = 'feather'
+
+# Memory budget, in bytes, for decoded node data cached between requests
+NODE_DATA_CACHE_BYTES = 256 * 1024 * 1024
+
+# Live workflows kept in memory between requests, by session (see
+# workflow/store.py). A workflow is only written back to the session when
+# changed, at the end of the request, or at most once every
+# WORKFLOW_STORE_WRITE_DELAY seconds if set. When running several worker
+# processes that do not serve each session from the same process, set
+# WORKFLOW_STORE_MAX_WORKFLOWS to 0: a process would not see changes made by
+# another, and changes written behind would be lost.
+WORKFLOW_STORE_MAX_WORKFLOWS = 64
+WORKFLOW_STORE_WRITE_DELAY = 0
+
+# Sessions store a snapshot of the workflow, plus a journal file of the changes
+# made since. Once the journal exceeds WORKFLOW_JOURNAL_MAX_BYTES, it is
+# compacted into a new snapshot.
+WORKFLOW_JOURNAL_DIR = MEDIA_ROOT
+WORKFLOW_JOURNAL_MAX_BYTES = 1024 * 1024
+
+# Workflows run with /workflow/run execute on a pool of WORKFLOW_JOB_WORKERS
+# background threads. The latest WORKFLOW_JOB_MAX_JOBS jobs are kept for their
+# progress to be polled.
+WORKFLOW_JOB_WORKERS = 2
+WORKFLOW_JOB_MAX_JOBS = 100
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
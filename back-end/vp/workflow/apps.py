@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class WorkflowConfig(AppConfig):
     name = 'workflow'
+
+    def ready(self):
+        from pyworkflow import Workflow
+
+        Workflow.data_cache.resize(settings.NODE_DATA_CACHE_BYTES)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http.cookie import parse_cookie
+from rest_framework.renderers import BaseRenderer
+
+from .jobs import job_queue
+
+
+# Seconds between comments sent to keep an idle stream open through proxies
+KEEPALIVE_INTERVAL = 15
+
+EVENTS_PATH = re.compile(r'^/workflow/run/(?P<job_id>[^/]+)/events$')
+
+EVENT_STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    # Stops nginx from buffering the stream
+    (b'x-accel-buffering', b'no'),
+]
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets the `job_events` view accept EventSource requests."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+def format_event(event):
+    """Format a Job event as a server-sent event."""
+    return 'id: %d\nevent: %s\ndata: %s\n\n' % (event['id'], event['event'], json.dumps(event['data']))
+
+
+def event_stream(job, last_event_id=0):
+    """Stream a Job's events as server-sent events, until the Job is done.
+
+    Args:
+        job: The Job to follow
+        last_event_id: Resume after this event, e.g. from the Last-Event-ID
+            header sent by a reconnecting EventSource
+    """
+    while True:
+        events = job.wait_for_events(last_event_id, timeout=KEEPALIVE_INTERVAL)
+
+        if not events:
+            if job.done:
+                return
+
+            yield ': keepalive\n\n'
+            continue
+
+        for event in events:
+            yield format_event(event)
+
+        last_event_id = events[-1]['id']
+
+
+def parse_last_event_id(value):
+    try:
+        return max(int(value or 0), 0)
+    except ValueError:
+        return 0
+
+
+class EventStreamApplication:
+    """ASGI application serving /workflow/run/<job_id>/events.
+
+    Django 3 cannot stream a response asynchronously: under ASGI, a
+    StreamingHttpResponse holds up the event loop while it waits for the
+    next event. This application serves the event stream itself, waiting for
+    events on a worker thread, so any number of clients can follow a run.
+    Every other request is passed to `application`.
+
+    Like the `job_events` view, a Job is only streamed to the session that
+    started it.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        match = EVENTS_PATH.match(scope.get('path', '')) if scope['type'] == 'http' else None
+
+        if match is None or scope['method'] != 'GET':
+            return await self.application(scope, receive, send)
+
+        headers = dict(scope['headers'])
+        job = job_queue.get(match.group('job_id'))
+
+        if job is None or job.owner != EventStreamApplication.session_key(headers):
+            body = json.dumps({'job events': 'Job %s not found' % match.group('job_id')}).encode()
+            await send({'type': 'http.response.start', 'status': 404,
+                        'headers': [(b'content-type', b'application/json')]})
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': EVENT_STREAM_HEADERS})
+
+        disconnected = asyncio.ensure_future(EventStreamApplication.wait_for_disconnect(receive))
+        last_event_id = parse_last_event_id(headers.get(b'last-event-id', b'').decode())
+        wait_for_events = sync_to_async(job.wait_for_events, thread_sensitive=False)
+
+        try:
+            while not disconnected.done():
+                events = await wait_for_events(last_event_id, timeout=KEEPALIVE_INTERVAL)
+
+                if not events:
+                    if job.done:
+                        break
+
+                    chunk = ': keepalive\n\n'
+                else:
+                    chunk = ''.join(format_event(event) for event in events)
+                    last_event_id = events[-1]['id']
+
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    def session_key(headers):
+        cookies = parse_cookie(headers.get(b'cookie', b'').decode('latin-1'))
+        return cookies.get(settings.SESSION_COOKIE_NAME)
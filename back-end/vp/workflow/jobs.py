@@ -0,0 +1,13 @@
+import atexit
+
+from django.conf import settings
+from pyworkflow import JobQueue
+
+
+# Background Workflow runs started by /workflow/run
+job_queue = JobQueue(
+    max_workers=getattr(settings, 'WORKFLOW_JOB_WORKERS', 2),
+    max_jobs=getattr(settings, 'WORKFLOW_JOB_MAX_JOBS', 100),
+)
+
+atexit.register(job_queue.shutdown, wait=False)
@@ -1,6 +1,10 @@
-from pyworkflow import Workflow, WorkflowException
+from contextlib import nullcontext
+
+from pyworkflow import WorkflowException
 from django.http import JsonResponse
 
+from .store import workflow_store, read_session
+
 
 class WorkflowMiddleware:
     """ Custom middleware
@@ -24,9 +28,19 @@ class WorkflowMiddleware:
             # 'open' loads from file upload, 'new' inits new Workflow
             pass
         else:
-            # All other cases, load workflow from session
+            # All other cases, use the session's live Workflow, or load it
+            # from the session
             try:
-                request.pyworkflow = Workflow.from_json(request.session)
+                session_key = request.session.session_key
+                workflow = workflow_store.get(session_key) if session_key else None
+
+                if workflow is None:
+                    workflow = read_session(request.session)
+
+                    if session_key:
+                        workflow_store.put(session_key, workflow)
+
+                request.pyworkflow = workflow
 
                 # Check if a graph is present
                 if request.pyworkflow.graph is None:
@@ -36,13 +50,18 @@ class WorkflowMiddleware:
             except WorkflowException as e:
                 return JsonResponse({e.action: e.reason}, status=500)
 
-        response = self.get_response(request)
+        # A stored Workflow is shared with concurrent requests for the session
+        # and the thread writing it behind; only one may use it at a time
+        workflow = getattr(request, 'pyworkflow', None)
+
+        with workflow.lock if workflow is not None else nullcontext():
+            response = self.get_response(request)
 
-        # Code executed for each request/response after the view is called
+            # Code executed for each request/response after the view is called
 
-        # Request should have 'pyworkflow' attribute, but do not crash if not
-        if hasattr(request, 'pyworkflow'):
-            # Save Workflow back to session
-            request.session.update(request.pyworkflow.to_session_dict())
+            # Request should have 'pyworkflow' attribute, but do not crash if not
+            if hasattr(request, 'pyworkflow'):
+                # Save Workflow back to session, if changed
+                workflow_store.save(request.session, request.pyworkflow)
 
         return response
@@ -0,0 +1,25 @@
+from django.conf import settings
+from pyworkflow import serialization
+
+
+class SessionSerializer:
+    """Session serializer for Django's SESSION_SERIALIZER setting.
+
+    Encodes session data with WORKFLOW_SESSION_ENCODING (msgpack if
+    installed, otherwise JSON with `orjson` if installed), and optionally
+    compresses it with WORKFLOW_SESSION_COMPRESSION. Session data written
+    with any encoding or compression is read back, so either setting can be
+    changed without invalidating existing sessions.
+    """
+
+    def __init__(self):
+        self.serializer = serialization.Serializer(
+            encoding=getattr(settings, 'WORKFLOW_SESSION_ENCODING', None) or serialization.best_encoding(),
+            compression=getattr(settings, 'WORKFLOW_SESSION_COMPRESSION', None),
+        )
+
+    def dumps(self, obj):
+        return self.serializer.dumps(obj)
+
+    def loads(self, data):
+        return serialization.loads(data)
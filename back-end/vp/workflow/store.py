@@ -0,0 +1,306 @@
+import atexit
+import os
+import threading
+import uuid
+
+from collections import OrderedDict
+from importlib import import_module
+
+from django.conf import settings
+from pyworkflow import Workflow, WorkflowException, WorkflowJournal
+
+
+# Session keys holding a Workflow: its snapshot, and its journals
+WORKFLOW_SESSION_KEYS = ('name', 'root_dir', 'graph', 'flow_vars', 'data_format', 'journal', 'journal_previous')
+
+
+class WorkflowStore:
+    """Live Workflow objects, by session key, kept between requests.
+
+    Rebuilding a Workflow from the session, and serializing it back, costs
+    time proportional to the size of the graph. The store keeps each
+    session's Workflow in memory instead, and only writes it back to the
+    session when its `version` shows it was changed.
+
+    By default, changes are saved to the session at the end of the request.
+    With a `write_delay`, changes are written behind: a background thread
+    saves changed Workflows at most once per `write_delay` seconds, and when
+    they are evicted or the process exits.
+
+    The store belongs to one process. With several worker processes, changes
+    written behind are lost when the next request for the session is served
+    by another process, so only use a `write_delay` with a single process, or
+    sticky sessions. Otherwise, each process reloads a Workflow changed by
+    another process only once it is evicted; disable the store by setting
+    `max_workflows` to 0 unless each session is served by the same process.
+
+    A stored Workflow is shared by the threads serving its session's
+    requests, and the thread writing it behind. Each holds `Workflow.lock`
+    while reading or changing it.
+
+    Attributes:
+        max_workflows: Number of Workflows to keep; the least recently used
+            are evicted. 0 disables the store.
+        write_delay: Seconds to wait before saving changes; 0 saves them at
+            the end of each request.
+        hits: Number of requests served by a stored Workflow
+        misses: Number of requests that loaded the Workflow from the session
+        writes: Number of times a Workflow was saved to the session
+    """
+
+    def __init__(self, max_workflows=64, write_delay=0, session_engine=None):
+        self.max_workflows = max_workflows
+        self.write_delay = write_delay
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._session_engine = session_engine or settings.SESSION_ENGINE
+
+        # session_key -> [Workflow, saved version, dirty]
+        self._entries = OrderedDict()
+
+        # Changed Workflows evicted from `_entries`, until written
+        self._evicted = dict()
+        self._lock = threading.RLock()
+        self._timer = None
+
+    def get(self, session_key):
+        """Retrieve the stored Workflow for a session, or None."""
+        with self._lock:
+            entry = self._entries.get(session_key)
+
+            if entry is None:
+                # Not written yet, so the session is out of date
+                entry = self._evicted.pop(session_key, None)
+
+                if entry is None:
+                    self.misses += 1
+                    return None
+
+                self._entries[session_key] = entry
+
+            self._entries.move_to_end(session_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, session_key, workflow):
+        """Store a Workflow, as saved in the session at its current version."""
+        if self.max_workflows <= 0:
+            return
+
+        with self._lock:
+            self._entries[session_key] = [workflow, workflow.version, False]
+            self._entries.move_to_end(session_key)
+
+            self._evicted.pop(session_key, None)
+
+            while len(self._entries) > self.max_workflows:
+                evicted_key, entry = self._entries.popitem(last=False)
+
+                # Written by the background thread: the caller may hold
+                # another Workflow's lock
+                if entry[2]:
+                    self._evicted[evicted_key] = entry
+                    self._schedule()
+
+    def save(self, session, workflow):
+        """Save a Workflow at the end of a request, if it was changed.
+
+        A Workflow not in the store (e.g., one just created or opened) is
+        written to `session` now. A changed, stored Workflow is written to
+        `session` now, or later if writing behind.
+
+        Args:
+            session: The request's session
+            workflow: The request's Workflow
+        """
+        session_key = session.session_key
+
+        with self._lock:
+            entry = self._entries.get(session_key) if session_key else None
+
+            if entry is not None and entry[0] is workflow:
+                if workflow.version == entry[1]:
+                    return
+
+                if self.write_delay > 0:
+                    entry[2] = True
+                    self._schedule()
+                    return
+
+        # New sessions have no key until the response saves them; the
+        # Workflow is stored on the next request
+        with workflow.lock:
+            if session_key:
+                refresh_session(session, import_module(self._session_engine).SessionStore(session_key))
+
+            write_session(session, workflow, compact=entry is None or entry[0] is not workflow)
+
+        self.writes += 1
+
+        if session_key:
+            self.put(session_key, workflow)
+
+    def changed(self, session_key, workflow):
+        """Save a Workflow changed outside of a request, e.g. by a background job.
+
+        A stored Workflow is saved like at the end of a request. A Workflow
+        no longer in the store is saved to its session as a new snapshot.
+        """
+        with self._lock:
+            entry = self._entries.get(session_key)
+
+            if entry is not None and entry[0] is workflow:
+                if self.write_delay > 0:
+                    entry[2] = True
+                    self._schedule()
+                    return
+            else:
+                entry = None
+
+        if entry is None:
+            self._write(session_key, [workflow, None, True], compact=True)
+        else:
+            self._write(session_key, entry)
+
+    def flush(self):
+        """Write every changed Workflow to its session now."""
+        with self._lock:
+            self._timer = None
+            dirty = [(key, entry) for key, entry in self._entries.items() if entry[2]]
+            dirty.extend(self._evicted.items())
+
+        for session_key, entry in dirty:
+            self._write(session_key, entry)
+
+            with self._lock:
+                if self._evicted.get(session_key) is entry:
+                    del self._evicted[session_key]
+
+    def clear(self):
+        self.flush()
+
+        with self._lock:
+            self._entries.clear()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write(self, session_key, entry, compact=False):
+        workflow = entry[0]
+
+        with workflow.lock:
+            # Loaded after taking the lock, so the journal path is current
+            session = import_module(self._session_engine).SessionStore(session_key)
+            version = workflow.version
+
+            try:
+                write_session(session, workflow, compact=compact)
+            except (WorkflowException, RuntimeError):
+                return
+
+            if session.modified:
+                session.save()
+
+        with self._lock:
+            entry[1] = version
+            entry[2] = workflow.version != version
+            self.writes += 1
+
+            if entry[2]:
+                self._schedule()
+
+
+def read_session(session):
+    """Load a session's Workflow: its snapshot, plus any journaled changes.
+
+    Raises:
+        WorkflowException: missing or malformed Workflow data
+    """
+    workflow = Workflow.from_json(session)
+
+    if session.get('journal'):
+        WorkflowJournal(session['journal']).apply(workflow)
+
+    # Loading is not a change to save
+    workflow.journal_entries()
+
+    return workflow
+
+
+def refresh_session(session, stored):
+    """Bring a request's session up to date with the stored session.
+
+    The request's session is loaded before the request waits for the
+    Workflow's lock. Meanwhile, the Workflow may have been written behind,
+    and its journal compacted into a new snapshot; changes appended to the
+    old journal would then be lost. Call while holding the Workflow's lock.
+
+    Args:
+        session: The request's session
+        stored: The same session, as currently stored
+    """
+    if stored.get('journal') == session.get('journal'):
+        return
+
+    for key in WORKFLOW_SESSION_KEYS:
+        if key in stored:
+            session[key] = stored[key]
+        else:
+            session.pop(key, None)
+
+
+def write_session(session, workflow, compact=False):
+    """Save the changes to a Workflow in its session.
+
+    Changes are appended to the session's journal (see `WorkflowJournal`),
+    without modifying the session itself. The session is rewritten with a
+    new snapshot of the whole Workflow, and a new, empty journal, when:
+    - `compact` is set, e.g. for a newly created or opened Workflow
+    - the session has no journal yet
+    - the journal is larger than WORKFLOW_JOURNAL_MAX_BYTES
+    - the changes cannot be journaled
+
+    The journal replaced by a new snapshot is only deleted at the following
+    snapshot, once the session referring to it has been saved over.
+
+    Raises:
+        WorkflowException: the Workflow could not be serialized
+    """
+    entries = workflow.journal_entries()
+    path = session.get('journal')
+
+    if not compact and path and entries is not None:
+        try:
+            if os.path.getsize(path) <= settings.WORKFLOW_JOURNAL_MAX_BYTES:
+                WorkflowJournal(path).append(entries)
+                return
+        except OSError:
+            pass
+
+    try:
+        session.update(workflow.to_session_dict())
+    except (WorkflowException, RuntimeError):
+        workflow.require_snapshot()
+        raise
+
+    if session.get('journal_previous'):
+        WorkflowJournal(session['journal_previous']).delete()
+
+    journal = WorkflowJournal(os.path.join(settings.WORKFLOW_JOURNAL_DIR, 'workflow-%s.journal' % uuid.uuid4().hex))
+    journal.create()
+
+    session['journal_previous'] = path
+    session['journal'] = journal.path
+
+
+workflow_store = WorkflowStore(
+    max_workflows=getattr(settings, 'WORKFLOW_STORE_MAX_WORKFLOWS', 64),
+    write_delay=getattr(settings, 'WORKFLOW_STORE_WRITE_DELAY', 0),
+)
+
+atexit.register(workflow_store.flush)
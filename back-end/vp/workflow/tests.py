@@ -1,3 +1,315 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.test import Client, SimpleTestCase, override_settings
+
+from .jobs import job_queue
+from .store import workflow_store
+
+
+class WorkflowTestCase(SimpleTestCase):
+    """Starts each test with a new workflow, of a Read CSV node feeding a
+    Write CSV node, stored in a temporary directory."""
+
+    CSV = ',key,A\n0,K0,A0\n1,K1,A1\n2,K2,A2\n'
+
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root_dir, ignore_errors=True)
+
+        settings = override_settings(MEDIA_ROOT=self.root_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.csv_file = self.root_dir + '/sample.csv'
+
+        with open(self.csv_file, 'w') as f:
+            f.write(self.CSV)
+
+        self.assertEqual(self.post('/workflow/new', {'id': 'test'}).status_code, 200)
+        self.assertEqual(self.post('/node/', self.read_csv_node('1')).status_code, 200)
+        self.assertEqual(self.post('/node/', self.write_csv_node('2')).status_code, 200)
+        self.assertEqual(self.client.post('/node/edge/1/2').status_code, 200)
+
+    def post(self, path, data):
+        return self.client.post(path, json.dumps(data), content_type='application/json')
+
+    def run_workflow(self, options=None):
+        """Run the workflow as a job, and wait for it to be done."""
+        response = self.post('/workflow/run', options or {})
+        self.assertEqual(response.status_code, 202)
+
+        job = job_queue.get(response.json()['job_id'])
+
+        received = 0
+
+        while not job.done:
+            received += len(job.wait_for_events(received, timeout=5))
+
+        return response.json()['job_id']
+
+    def read_csv_node(self, node_id):
+        return {
+            'name': 'Read CSV',
+            'node_id': node_id,
+            'node_type': 'io',
+            'node_key': 'ReadCsvNode',
+            'is_global': False,
+            'options': {'file': self.csv_file},
+        }
+
+    def write_csv_node(self, node_id):
+        return {
+            'name': 'Write CSV',
+            'node_id': node_id,
+            'node_type': 'io',
+            'node_key': 'WriteCsvNode',
+            'is_global': False,
+            'options': {'file': 'out.csv'},
+        }
+
+
+class NodeListTestCase(WorkflowTestCase):
+
+    def test_nodes(self):
+        response = self.client.get('/workflow/nodes')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ReadCsvNode', json.dumps(response.json()))
+        self.assertTrue(response['ETag'])
+
+    def test_nodes_not_modified(self):
+        etag = self.client.get('/workflow/nodes')['ETag']
+        response = self.client.get('/workflow/nodes', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_nodes_modified(self):
+        response = self.client.get('/workflow/nodes', HTTP_IF_NONE_MATCH='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], '"stale"')
+
+
+class RunTestCase(WorkflowTestCase):
+
+    def test_run(self):
+        job_id = self.run_workflow()
+        response = self.client.get('/workflow/run/%s' % job_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'finished')
+        self.assertEqual(response.json()['nodes']['1']['status'], 'finished')
+        self.assertEqual(response.json()['nodes']['2']['status'], 'finished')
+
+        # The workflow is executed, and nothing is left stale
+        self.assertEqual(self.client.get('/node/1/retrieve_data').status_code, 200)
+        self.assertListEqual(self.client.post('/workflow/execute/stale').json(), [])
+
+    def test_run_stale_only(self):
+        self.run_workflow()
+        job_id = self.run_workflow({'stale_only': True})
+
+        self.assertDictEqual(self.client.get('/workflow/run/%s' % job_id).json()['nodes'], {})
+
+    def test_run_failed(self):
+        os.remove(self.csv_file)
+
+        job = self.client.get('/workflow/run/%s' % self.run_workflow()).json()
+
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['nodes']['1']['status'], 'failed')
+        self.assertEqual(job['nodes']['2']['status'], 'skipped')
+
+    def test_unknown_job(self):
+        response = self.client.get('/workflow/run/unknown')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('retrieve job', response.json())
+
+    def test_other_session_job(self):
+        job_id = self.run_workflow()
+
+        other = Client()
+        other.post('/workflow/new', json.dumps({'id': 'other'}), content_type='application/json')
+
+        self.assertEqual(other.get('/workflow/run/%s' % job_id).status_code, 404)
+
+    def test_execute_stale(self):
+        self.assertEqual(self.client.get('/workflow/execute/stale').status_code, 405)
+
+        response = self.client.post('/workflow/execute/stale')
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(response.json(), ['1', '2'])
+
+        # Nothing is stale now
+        self.assertListEqual(self.client.post('/workflow/execute/stale').json(), [])
+
+
+class JobEventsTestCase(WorkflowTestCase):
+
+    def events(self, job_id, **headers):
+        response = self.client.get('/workflow/run/%s/events' % job_id, **headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        events = list()
+
+        for message in b''.join(response.streaming_content).decode().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+
+            if fields:
+                events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+
+        return events
+
+    def test_events(self):
+        events = self.events(self.run_workflow())
+
+        self.assertListEqual([event for _, event, _ in events], [
+            'node-started', 'node-finished', 'node-started', 'node-finished', 'job-finished'])
+        self.assertListEqual([event_id for event_id, _, _ in events], [1, 2, 3, 4, 5])
+        self.assertEqual(events[1][2]['node_id'], '1')
+        self.assertEqual(events[1][2]['rows'], 3)
+
+    def test_events_resume(self):
+        events = self.events(self.run_workflow(), HTTP_LAST_EVENT_ID='3')
+
+        self.assertListEqual([event_id for event_id, _, _ in events], [4, 5])
+
+    def test_unknown_job_events(self):
+        response = self.client.get('/workflow/run/unknown/events')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('job events', response.json())
+
+
+class BatchTestCase(WorkflowTestCase):
+
+    def graph(self):
+        """The node ids and edges of the session's workflow."""
+        graph = self.post('/workflow/save', {}).json()['pyworkflow']['graph']
+
+        return sorted(node['id'] for node in graph['nodes']), sorted([link['source'], link['target']]
+                                                                     for link in graph['links'])
+
+    def test_batch(self):
+        response = self.post('/workflow/batch', {'operations': [
+            {'op': 'add_node', 'node': self.read_csv_node('3')},
+            {'op': 'remove_edge', 'from': '1', 'to': '2'},
+            {'op': 'add_edge', 'from': '3', 'to': '2'},
+            {'op': 'remove_node', 'node_id': '1'},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([node['node_id'] for node in response.json()['added']], ['3'])
+        self.assertListEqual(response.json()['edges_added'], [['3', '2']])
+        self.assertListEqual(response.json()['edges_removed'], [['1', '2']])
+        self.assertListEqual(response.json()['removed'], ['1'])
+
+        self.assertTupleEqual(self.graph(), (['2', '3'], [['3', '2']]))
+
+    def test_batch_bad_endpoint(self):
+        before = self.graph()
+
+        response = self.post('/workflow/batch', {'operations': [
+            {'op': 'add_node', 'node': self.read_csv_node('3')},
+            {'op': 'add_edge', 'from': '3', 'to': '2'},
+            {'op': 'add_edge', 'from': '2', 'to': '4'},
+        ]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Operation 2', response.json()['apply batch'])
+
+        # Nothing was applied
+        self.assertTupleEqual(self.graph(), before)
+
+    def test_batch_cycle(self):
+        response = self.post('/workflow/batch', {'operations': [{'op': 'add_edge', 'from': '2', 'to': '1'}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTupleEqual(self.graph(), (['1', '2'], [['1', '2']]))
+
+    def test_batch_unknown_op(self):
+        response = self.post('/workflow/batch', {'operations': [{'op': 'rename_node', 'node_id': '1'}]})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_no_operations(self):
+        self.assertEqual(self.post('/workflow/batch', {}).status_code, 500)
+
+
+class ChunkedUploadTestCase(WorkflowTestCase):
+
+    URL = '/workflow/upload/chunked?filename=upload.csv&nodeId=1'
+
+    def put(self, data, query=''):
+        return self.client.put(self.URL + query, data, content_type='application/octet-stream')
+
+    def test_chunked_upload(self):
+        data = self.CSV.encode()
+
+        self.assertEqual(self.client.get(self.URL).json()['offset'], 0)
+        self.assertEqual(self.put(data[:10], '&offset=0').json()['offset'], 10)
+
+        # Resume from the offset received so far
+        self.assertEqual(self.client.get(self.URL).json()['offset'], 10)
+
+        response = self.put(data[10:], '&offset=10&final=true&sha256=' + hashlib.sha256(data).hexdigest())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['size'], len(data))
+        self.assertEqual(response.json()['sha256'], hashlib.sha256(data).hexdigest())
+
+        with open(response.json()['filename'], 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_chunked_upload_wrong_offset(self):
+        self.put(b'0123456789', '&offset=0')
+        response = self.put(b'0123456789', '&offset=5')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 10)
+
+    def test_chunked_upload_wrong_sha256(self):
+        response = self.put(b'0123456789', '&offset=0&final=true&sha256=' + hashlib.sha256(b'other').hexdigest())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.URL).json()['offset'], 0)
+
+    def test_chunked_upload_abort(self):
+        self.put(b'0123456789', '&offset=0')
+
+        self.assertEqual(self.client.delete(self.URL).status_code, 200)
+        self.assertEqual(self.client.get(self.URL).json()['offset'], 0)
+
+    def test_chunked_upload_no_filename(self):
+        response = self.client.get('/workflow/upload/chunked')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('upload_file', response.json())
+
+
+class WorkflowStoreTestCase(WorkflowTestCase):
+
+    def test_reload_from_session(self):
+        self.assertEqual(self.client.post('/node/2/execute_upstream').status_code, 200)
+        before = self.post('/workflow/save', {}).json()['pyworkflow']
+
+        # Requests read the workflow back from the session once the store
+        # no longer holds it
+        workflow_store.clear()
+
+        self.assertDictEqual(self.post('/workflow/save', {}).json()['pyworkflow'], before)
+        self.assertListEqual(self.client.post('/workflow/execute/stale').json(), [])
+
+    def test_no_workflow(self):
+        response = Client().get('/workflow/execute')
+
+        self.assertEqual(response.status_code, 500)
@@ -6,10 +6,16 @@ urlpatterns = [
     path('open', views.open_workflow, name='open workflow'),
     path('edit', views.edit_workflow, name='edit workflow'),
     path('save', views.save_workflow, name='save'),
+    path('batch', views.batch_update, name='batch update'),
     path('execute', views.execute_workflow, name='execute workflow'),
+    path('execute/stale', views.execute_stale, name='execute stale nodes'),
+    path('run', views.run_workflow, name='run workflow'),
+    path('run/<str:job_id>', views.retrieve_job, name='retrieve job'),
+    path('run/<str:job_id>/events', views.job_events, name='job events'),
     path('execute/<str:node_id>/successors', views.get_successors, name='get node successors'),
     path('globals', views.global_vars, name="retrieve global variables"),
     path('upload', views.upload_file, name='upload file'),
+    path('upload/chunked', views.upload_chunk, name='upload file in chunks'),
     path('download', views.download_file, name='download file'),
     path('nodes', views.retrieve_nodes_for_user, name='retrieve node list'),
 ]
@@ -2,14 +2,22 @@ import os
 import json
 import sys
 
-from django.http import JsonResponse, HttpResponse
+from io import BytesIO
+
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.conf import settings
-from rest_framework.decorators import api_view
-from pyworkflow import Workflow, WorkflowException
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import JSONRenderer
+from pyworkflow import Workflow, WorkflowException, Job, export, serialization, upload
 from drf_yasg.utils import swagger_auto_schema
 
 from modulefinder import ModuleFinder
 
+from .events import EventStreamRenderer, event_stream, parse_last_event_id
+from .jobs import job_queue
+from .store import write_session, workflow_store
+
 
 @swagger_auto_schema(method='post',
                      operation_summary='Create a new workflow.',
@@ -30,8 +38,10 @@ def new_workflow(request):
         workflow_id = json.loads(request.body)
 
         # Create new Workflow
-        request.pyworkflow = Workflow(name=workflow_id['id'], root_dir=settings.MEDIA_ROOT)
-        request.session.update(request.pyworkflow.to_session_dict())
+        request.pyworkflow = Workflow(name=workflow_id['id'],
+                                      root_dir=settings.MEDIA_ROOT,
+                                      data_format=settings.NODE_DATA_FORMAT)
+        write_session(request.session, request.pyworkflow, compact=True)
 
         return JsonResponse(Workflow.to_graph_json(request.pyworkflow.graph))
     except (json.JSONDecodeError, KeyError) as e:
@@ -40,7 +50,8 @@ def new_workflow(request):
 
 @swagger_auto_schema(method='post',
                      operation_summary='Open workflow from file.',
-                     operation_description='Loads a JSON file from disk and translates into Workflow object and JSON object of front-end',
+                     operation_description='Loads a saved workflow file (JSON or msgpack, optionally gzip or zstd '
+                                           'compressed) and translates into Workflow object and JSON object of front-end',
                      responses={
                          200: 'Workflow representation in JSON',
                          400: 'No file specified',
@@ -50,8 +61,9 @@ def new_workflow(request):
 def open_workflow(request):
     """Open a workflow.
 
-    User uploads a JSON file to the front-end that passes JSON data to be
-    parsed and validated on the back-end.
+    User uploads a saved workflow file to the front-end that passes the data
+    to be parsed and validated on the back-end. The file's encoding and
+    compression are detected from its contents (see `Serializer`).
 
     Args:
         request: Django request Object, should follow the pattern:
@@ -66,7 +78,7 @@ def open_workflow(request):
             }
 
     Raises:
-        JSONDecodeError: invalid JSON data
+        ValueError: invalid or unsupported file data
         KeyError: request missing either 'react' or 'pyworkflow' data
         WorkflowException: error loading JSON into NetworkX DiGraph
 
@@ -80,16 +92,16 @@ def open_workflow(request):
         # TODO: file is parsed into JSON in memory;
         #       may want to save to 'fs' for large files
         uploaded_file = request.FILES.get('file')
-        combined_json = json.load(uploaded_file)
+        combined_json = serialization.loads(uploaded_file.read())
 
         request.pyworkflow = Workflow.from_json(combined_json['pyworkflow'])
-        request.session.update(request.pyworkflow.to_session_dict())
+        write_session(request.session, request.pyworkflow, compact=True)
 
         # Send back front-end workflow
         return JsonResponse(combined_json['react'])
     except KeyError as e:
         return JsonResponse({'open_workflow': 'Missing data for ' + str(e)}, status=500)
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         return JsonResponse({'No React JSON provided': str(e)}, status=500)
     except WorkflowException as e:
         return JsonResponse({e.action: e.reason}, status=404)
@@ -115,7 +127,9 @@ def edit_workflow(request):
 
 @swagger_auto_schema(method='post',
                      operation_summary='Save workflow to JSON file',
-                     operation_description='Saves workflow to JSON file for download.',
+                     operation_description='Saves workflow to JSON file for download. Optional `encoding` '
+                                           '(json, msgpack) and `compression` (gzip, zstd) query parameters '
+                                           'save a smaller, faster to load, binary file instead.',
                      responses={
                          200: 'Workflow representation in JSON',
                          400: 'No file specified',
@@ -129,15 +143,21 @@ def save_workflow(request):
     Saves a workflow to disk.
 
     Args:
-        request: Django request Object
+        request: Django request Object, with optional `encoding` and
+            `compression` query parameters
 
     Returns:
-        Downloads JSON file representing graph.
+        Downloads file representing graph; JSON by default.
     """
     # Load session data into Workflow object. If successful, return
     # serialized graph
     try:
-        combined_json = json.dumps({
+        serializer = serialization.Serializer(
+            encoding=request.GET.get('encoding', 'json'),
+            compression=request.GET.get('compression') or None,
+        )
+
+        combined_json = serializer.dumps({
             'filename': request.pyworkflow.filename,
             'react': json.loads(request.body),
             'pyworkflow': {
@@ -145,16 +165,70 @@ def save_workflow(request):
                 'root_dir': request.pyworkflow.root_dir,
                 'graph': Workflow.to_graph_json(request.pyworkflow.graph),
                 'flow_vars': Workflow.to_graph_json(request.pyworkflow.flow_vars),
+                'data_format': request.pyworkflow.data_format,
             }
         })
 
-        return HttpResponse(combined_json, content_type='application/json')
+        response = HttpResponse(combined_json, content_type=serializer.content_type)
+
+        if serializer.content_type != 'application/json':
+            filename = os.path.splitext(request.pyworkflow.filename)[0] + serializer.extension
+            response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+
+        return response
     except json.JSONDecodeError as e:
         return JsonResponse({'No React JSON provided': str(e)}, status=500)
+    except ValueError as e:
+        return JsonResponse({'save_workflow': str(e)}, status=400)
     except WorkflowException as e:
         return JsonResponse({e.action: e.reason}, status=404)
 
 
+@swagger_auto_schema(method='post',
+                     operation_summary='Apply a batch of graph changes.',
+                     operation_description='Adds, updates, and removes nodes and edges in one request. Every '
+                                           'change is validated first; if any is invalid, none are applied.',
+                     responses={
+                         200: 'Changes applied; JSON of the resulting changes to the graph',
+                         400: 'Invalid change; no changes applied',
+                         500: 'No valid JSON in request body'
+                     })
+@api_view(['POST'])
+def batch_update(request):
+    """Apply a batch of graph changes.
+
+    Pasting or importing part of a workflow would otherwise take a request
+    per node and edge. The whole batch is saved to the session once.
+
+    Args:
+        request: Django request Object, with a JSON body:
+            {
+                operations: [
+                    {op: 'add_node', node: {Node JSON}},
+                    {op: 'update_node', node: {Node JSON}},
+                    {op: 'remove_node', node_id: id, is_global: false},
+                    {op: 'add_edge', from: node_id, to: node_id},
+                    {op: 'remove_edge', from: node_id, to: node_id},
+                ]
+            }
+
+    Returns:
+        200 - JSON of the changes made; see `GraphBatch.apply()`
+        400 - An operation is invalid; nothing was changed
+    """
+    try:
+        operations = json.loads(request.body)['operations']
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        return JsonResponse({'No operations provided': str(e)}, status=500)
+
+    try:
+        delta = request.pyworkflow.apply_batch(operations)
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=400)
+
+    return JsonResponse(delta)
+
+
 @swagger_auto_schema(method='get',
                      operation_summary='Retrieve sorted list of node execution.',
                      operation_description='Retrieves a list of nodes, sorted in execution order.',
@@ -180,6 +254,169 @@ def execute_workflow(request):
     return JsonResponse(order, safe=False)
 
 
+@swagger_auto_schema(method='post',
+                     operation_summary='Execute stale nodes.',
+                     operation_description='Executes only nodes changed, or downstream of a change, '
+                                           'since they last executed.',
+                     responses={
+                         200: 'List of executed nodes, sorted in execution order.',
+                         404: 'No graph exists.',
+                         500: 'Error executing one or more nodes.'
+                     })
+@api_view(['POST'])
+def execute_stale(request):
+    """Execute stale nodes.
+
+    Nodes whose options, edges or flow variables changed since they were last
+    executed are stale, along with all of their descendants. Up-to-date nodes
+    are not executed again.
+
+    Every node's output is stored, so it can be retrieved afterwards.
+
+    Returns:
+        List of executed nodes, sorted in execution order.
+    """
+    try:
+        executed = request.pyworkflow.execute_all(stale_only=True, optimize=False)
+        order = request.pyworkflow.execution_order()
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=500)
+
+    return JsonResponse([node_id for node_id in order if node_id in executed], safe=False)
+
+
+@swagger_auto_schema(method='post',
+                     operation_summary='Run workflow in the background.',
+                     operation_description='Starts executing the workflow on a background worker, and returns '
+                                           'a job to poll for its progress at /workflow/run/<job_id>.',
+                     responses={
+                         202: 'Job started',
+                         404: 'No graph exists.',
+                         409: 'Workflow is already running.',
+                         500: 'No valid JSON in request body'
+                     })
+@api_view(['POST'])
+def run_workflow(request):
+    """Run workflow in the background.
+
+    The request returns as soon as the job is queued. Every node's output is
+    stored, as by `execute_stale`, and the executed workflow is saved to the
+    session when the job finishes.
+
+    Args:
+        request: Django request Object, optionally with a JSON body:
+            {
+                stale_only: Only execute nodes that are not up to date
+            }
+
+    Returns:
+        202 - JSON job status; see `retrieve_job`
+    """
+    try:
+        options = json.loads(request.body) if request.body else dict()
+        stale_only = bool(options.get('stale_only', False))
+    except (json.JSONDecodeError, AttributeError) as e:
+        return JsonResponse({'No valid JSON provided': str(e)}, status=500)
+
+    # Jobs belong to a session, which needs a key to save the results under
+    if not request.session.session_key:
+        request.session.save()
+
+    session_key = request.session.session_key
+    workflow = request.pyworkflow
+
+    def save_results(job):
+        workflow_store.changed(session_key, workflow)
+
+    try:
+        node_ids = workflow.stale_nodes() if stale_only else None
+        job = job_queue.submit(Job(workflow, owner=session_key, node_ids=node_ids, optimize=False),
+                               callback=save_results)
+    except WorkflowException as e:
+        return JsonResponse({e.action: e.reason}, status=409)
+
+    return JsonResponse(job.to_dict(), status=202)
+
+
+@swagger_auto_schema(method='get',
+                     operation_summary='Retrieve a background workflow run.',
+                     operation_description='Retrieves the status of a job started by /workflow/run, with the '
+                                           'status, timings, and error of each node.',
+                     responses={
+                         200: 'Job status',
+                         404: 'No such job.'
+                     })
+@api_view(['GET'])
+def retrieve_job(request, job_id):
+    """Retrieve a background workflow run.
+
+    Returns:
+        200 - JSON job status:
+            {
+                job_id: Job id,
+                status: 'queued', 'running', 'finished', or 'failed',
+                created, started, finished: Times, in seconds since the epoch,
+                duration: Seconds the job ran for,
+                error: Why the job failed,
+                nodes: {
+                    node_id: {status, started, finished, duration, error},
+                },
+            }
+        404 - No job with that id, in this session
+    """
+    job = job_queue.get(job_id)
+
+    # Jobs are only visible to the session that started them
+    if job is None or job.owner != request.session.session_key:
+        return JsonResponse({'retrieve job': 'Job %s not found' % job_id}, status=404)
+
+    return JsonResponse(job.to_dict())
+
+
+@swagger_auto_schema(method='get',
+                     operation_summary='Stream the progress of a background workflow run.',
+                     operation_description='Streams server-sent events as the nodes of a job started by '
+                                           '/workflow/run execute, until the job is done.',
+                     responses={
+                         200: 'text/event-stream of job events',
+                         404: 'No such job.'
+                     })
+@api_view(['GET'])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def job_events(request, job_id):
+    """Stream the progress of a background workflow run.
+
+    Sends a server-sent event as each node starts, finishes, fails or is
+    skipped, with its duration and the number of rows it output, then a
+    final 'job-finished' or 'job-failed' event. A reconnecting client's
+    Last-Event-ID header resumes the stream after the events it received.
+
+    Under ASGI, the stream is served by `EventStreamApplication` instead, so
+    it does not occupy a worker; this view serves it under WSGI (e.g.,
+    `manage.py runserver`).
+
+    Returns:
+        200 - text/event-stream of events:
+            event: node-started | node-finished | node-failed | node-skipped
+            data: {node_id, status, started, finished, duration, rows, error}
+
+            event: job-finished | job-failed
+            data: {status, duration, error}
+        404 - No job with that id, in this session
+    """
+    job = job_queue.get(job_id)
+
+    if job is None or job.owner != request.session.session_key:
+        return JsonResponse({'job events': 'Job %s not found' % job_id}, status=404)
+
+    last_event_id = parse_last_event_id(request.META.get('HTTP_LAST_EVENT_ID'))
+    response = StreamingHttpResponse(event_stream(job, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+
+    return response
+
+
 @swagger_auto_schema(method='get',
                      operation_summary='Retrieve list of global flow vars.',
                      operation_description='Retrieves a list of global flow vars.',
@@ -221,7 +458,9 @@ def get_successors(request, node_id):
 
 @swagger_auto_schema(method='post',
                      operation_summary='Uploads a file to server.',
-                     operation_description='Uploads a new file to server location.',
+                     operation_description='Uploads a new file to server location. The file is '
+                                           'streamed to disk in chunks; the response includes its '
+                                           'size and SHA-256.',
                      responses={
                          200: 'File uploaded',
                          404: 'No specified file'
@@ -234,20 +473,101 @@ def upload_file(request):
         return JsonResponse("Empty content", status=404)
 
     try:
-        node_id = request.POST.get('nodeId')
+        file_path = upload_path(request.pyworkflow, f.name, request.POST.get('nodeId'))
+        saved = upload.save_upload(f, file_path)
+    except ValueError as e:
+        return JsonResponse({'upload_file': str(e)}, status=400)
+    except OSError as e:
+        return JsonResponse({'upload_file': str(e)}, status=500)
 
-        if node_id is None:
-            # custom node file
-            file_path = request.pyworkflow.node_path('custom_nodes', f.name)
-        else:
-            # node data file
-            file_path = request.pyworkflow.path(f"{node_id}-{f.name}")
+    return JsonResponse(dict(saved, filename=file_path), status=201, safe=False)
 
-        save_name = Workflow.upload_file(f, file_path)
-    except WorkflowException as e:
-        return JsonResponse({e.action: e.reason}, status=500)
 
-    return JsonResponse({"filename": save_name}, status=201, safe=False)
+@swagger_auto_schema(method='get',
+                     operation_summary='Retrieve the progress of a chunked upload.',
+                     operation_description='Returns the offset to resume an interrupted upload from. '
+                                           'Query parameters: filename, and nodeId for a node data file.',
+                     responses={
+                         200: 'Upload offset',
+                         400: 'No filename'
+                     })
+@swagger_auto_schema(methods=['put', 'delete'],
+                     operation_summary='Uploads a file to server in chunks.',
+                     operation_description='PUT appends the request body to the file at `offset`, '
+                                           'which must be the number of bytes received so far. With '
+                                           '`final=true` the file is moved into place, and checked '
+                                           'against `sha256` if given. DELETE discards the upload.',
+                     responses={
+                         200: 'Chunk received, or upload discarded',
+                         201: 'File uploaded',
+                         400: 'Invalid filename or offset, or the file does not match its hash',
+                         409: 'Offset does not match the bytes received so far',
+                     })
+@api_view(['GET', 'PUT', 'DELETE'])
+def upload_chunk(request):
+    params = request.query_params
+
+    try:
+        file_path = upload_path(request.pyworkflow, params.get('filename'), params.get('nodeId'))
+    except ValueError as e:
+        return JsonResponse({'upload_file': str(e)}, status=400)
+
+    chunked = upload.ChunkedUpload(file_path)
+
+    try:
+        if request.method == 'GET':
+            return JsonResponse({'filename': file_path, 'offset': chunked.offset})
+
+        if request.method == 'DELETE':
+            chunked.abort()
+            return JsonResponse({'filename': file_path, 'offset': 0})
+
+        try:
+            offset = int(params.get('offset', 0))
+        except ValueError:
+            return JsonResponse({'upload_file': 'Offset must be an integer'}, status=400)
+
+        try:
+            # Read the body as a stream; request.body would hold it all in memory
+            offset = chunked.append(upload.iter_chunks(request.stream or BytesIO()), offset)
+        except ValueError as e:
+            return JsonResponse({'upload_file': str(e), 'offset': chunked.offset}, status=409)
+
+        if params.get('final', '').lower() not in ('1', 'true'):
+            return JsonResponse({'filename': file_path, 'offset': offset})
+
+        try:
+            saved = chunked.finish(params.get('sha256'))
+        except ValueError as e:
+            return JsonResponse({'upload_file': str(e)}, status=400)
+    except OSError as e:
+        return JsonResponse({'upload_file': str(e)}, status=500)
+
+    return JsonResponse(dict(saved, filename=file_path), status=201)
+
+
+def upload_path(workflow, filename, node_id=None):
+    """Where to save an uploaded file.
+
+    Args:
+        workflow: The Workflow the file is uploaded to
+        filename: Name of the uploaded file
+        node_id: Node the file is data for, or None for a custom node file
+
+    Raises:
+        ValueError: `filename` is missing, or names a directory
+    """
+    name = os.path.basename(filename or '')
+
+    if name in ('', '.', '..'):
+        raise ValueError('Missing or invalid filename')
+
+    if node_id is None:
+        # custom node file
+        return workflow.node_path('custom_nodes', name)
+
+    # node data file
+    return workflow.path(f"{node_id}-{name}")
 
 
 @swagger_auto_schema(method='get',
@@ -255,6 +575,7 @@ def upload_file(request):
                      operation_description='Retrieves a list of installed Nodes, in JSON.',
                      responses={
                          200: 'List of installed Nodes, in JSON',
+                         304: 'List unchanged since the ETag in If-None-Match',
                      })
 @api_view(['GET'])
 def retrieve_nodes_for_user(request):
@@ -263,16 +584,38 @@ def retrieve_nodes_for_user(request):
     Retrieve a list of classes from the Node module in `pyworkflow`.
     List is split into 'types' (e.g., 'IO' and 'Manipulation') and
     'keys', or individual command Nodes (e.g., 'ReadCsv', 'Pivot').
+
+    The list is cached until a Node file changes, and tagged with an ETag so
+    clients can revalidate it with a conditional request.
     """
-    data = request.pyworkflow.get_packaged_nodes()
-    return JsonResponse(data, safe=False)
+    catalogue = request.pyworkflow.get_node_catalogue()
+
+    if catalogue is None:
+        return JsonResponse(None, safe=False)
+
+    data, etag = catalogue
+    etag = quote_etag(etag)
+
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(data, safe=False)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 @swagger_auto_schema(method='post',
                      operation_summary='Downloads a file from the server',
-                     operation_description='Downloads a file associated with Node from server.',
+                     operation_description='Downloads a file associated with Node from server. The file is '
+                                           'streamed; with `compression` (gzip or zstd) in the body or query, '
+                                           'it is compressed as it is sent.',
                      responses={
                          200: 'File downloaded',
+                         400: 'Unknown or unavailable compression',
                          404: 'Could not read specified file'
                      })
 @api_view(['POST'])
@@ -280,25 +623,37 @@ def download_file(request):
     try:
         # Retrieve Node info, and related File object
         json_data = json.loads(request.body)
+        compression = json_data.get('compression') or request.GET.get('compression') or None
+        export.check_compression(compression)
+
         f = request.pyworkflow.download_file(json_data['node_id'])
 
+        if f is None:
+            return JsonResponse({'message': 'The workflow does not contain node id %s' % json_data['node_id']},
+                                status=404)
+
         # Parse file type
         _, ext = os.path.splitext(f.name)
-        if ext == ".csv":
+        if compression is not None:
+            content = export.COMPRESSIONS[compression][1]
+        elif ext == ".csv":
             content = "text/csv"
         elif ext == ".json":
             content = "application/json"
         else:
             content = "application/octet-stream"
 
-        # Construct response
-        response = HttpResponse(content_type=content)
-        response['Content-Disposition'] = os.path.basename(f.name)
-        response.write(f.read())
+        # Construct response; the file is closed once it has been sent
+        if compression is None:
+            response = FileResponse(f, content_type=content)
+        else:
+            response = StreamingHttpResponse(export.compress(export.read_file(f), compression),
+                                             content_type=content)
 
-        # File not opened with `with`; need to close
-        f.close()
+        response['Content-Disposition'] = os.path.basename(f.name) + export.compressed_extension(compression)
         return response
+    except ValueError as e:
+        return JsonResponse({'download_file': str(e)}, status=400)
     except OSError:
         return JsonResponse({"message": "Could not find or read file"},
                             status=404)
@@ -26,6 +26,22 @@ function fetchWrapper(endpoint, options = {}) {
 }
 
 
+/**
+ * Apply many node and edge changes to the server-side workflow at once; if
+ * any change is invalid, none are applied
+ * @param {Array<Object>} operations - changes, e.g. {op: "add_node", node: {...}}
+ *     or {op: "add_edge", from: nodeId, to: nodeId}
+ * @returns {Promise<Object>} - server response (changes made to the graph)
+ */
+export async function applyBatch(operations) {
+    const options = {
+        method: "POST",
+        body: JSON.stringify({operations: operations})
+    };
+    return fetchWrapper("/workflow/batch", options);
+}
+
+
 /**
  * Retrieve node info from server side workflow
  * @param {string} nodeId - ID of node to retrieve
@@ -205,6 +221,36 @@ export async function uploadDataFile(formData) {
 }
 
 
+/**
+ * Upload a large data file in chunks, resuming from where an earlier,
+ * interrupted upload of the same file stopped
+ * @param {File} file - file to upload
+ * @param {string} nodeId - ID of node the file is for
+ * @param {number} chunkSize - bytes sent per request
+ * @returns {Promise<Object>} - server response (filename, size and sha256)
+ */
+export async function uploadDataFileChunked(file, nodeId, chunkSize = 8 * 1024 * 1024) {
+    const query = `filename=${encodeURIComponent(file.name)}&nodeId=${encodeURIComponent(nodeId)}`;
+    const endpoint = `/workflow/upload/chunked?${query}`;
+    let { offset } = await fetchWrapper(endpoint);
+
+    // An empty file is still sent once, to create it
+    do {
+        const end = Math.min(offset + chunkSize, file.size);
+        const final = end === file.size;
+        const options = {
+            method: "PUT",
+            headers: {"Content-Type": "application/octet-stream"},
+            body: file.slice(offset, end)
+        };
+        const resp = await fetchWrapper(`${endpoint}&offset=${offset}&final=${final}`, options);
+
+        if (final) return resp;
+        offset = resp.offset;
+    } while (offset < file.size);
+}
+
+
 /**
  * Download file by name from server
  * @param {CustomNodeModel} node - node containing file to download
@@ -235,6 +281,24 @@ export async function downloadDataFile(node) {
 }
 
 
+/**
+ * Download a node's output data, converted to another format. The browser
+ * saves the streamed response itself, so the data is never held in memory.
+ * @param {string} nodeId - ID of node whose data to download
+ * @param {string} fileFormat - "csv", "jsonl" or "parquet"
+ * @param {string} compression - "gzip", "zstd", or null for none
+ */
+export function downloadNodeData(nodeId, fileFormat = "csv", compression = null) {
+    const params = new URLSearchParams({file_format: fileFormat});
+    if (compression) params.set("compression", compression);
+
+    const anchor = document.createElement("a");
+    anchor.href = `/node/${nodeId}/download_data?${params}`;
+    anchor.download = "";
+    anchor.click();
+}
+
+
 /**
  * Get execution order of nodes in graph
  * @returns {Promise<Object>} - server response (array of node IDs)
@@ -253,6 +317,86 @@ export async function execute(node) {
     return fetchWrapper(`/node/${id}/execute`);
 }
 
+/**
+ * Execute given node on server, along with any nodes it depends on that
+ * are not up to date
+ * @param {CustomNodeModel} node - node to execute
+ * @returns {Promise<Object>} - server response (node IDs executed, in order)
+ */
+export async function executeUpstream(node) {
+    const id = node.options.id;
+    return fetchWrapper(`/node/${id}/execute_upstream`, {method: "POST"});
+}
+
+/**
+ * Execute a node, and the nodes it depends on, on a sample of the data, for
+ * quick feedback; the node's full output is left as it is
+ * @param {string} nodeId - ID of node to preview
+ * @param {Object} sample - optional {rows, sample: "head" or "reservoir", seed}
+ * @returns {Promise<Object>} - server response (node IDs executed, and the
+ *     preview's data file, row count and sample)
+ */
+export async function previewNode(nodeId, sample = {}) {
+    const params = new URLSearchParams({preview: true});
+    if (sample.rows !== undefined) params.set("rows", sample.rows);
+    if (sample.sample !== undefined) params.set("sample", sample.sample);
+    if (sample.seed !== undefined) params.set("seed", sample.seed);
+    return fetchWrapper(`/node/${nodeId}/execute?${params}`);
+}
+
+/**
+ * Start executing the workflow in the background
+ * @param {boolean} staleOnly - only execute nodes that are not up to date
+ * @returns {Promise<Object>} - server response (job status, with `job_id`)
+ */
+export async function runWorkflow(staleOnly = false) {
+    const options = {
+        method: "POST",
+        body: JSON.stringify({stale_only: staleOnly})
+    };
+    return fetchWrapper("/workflow/run", options);
+}
+
+/**
+ * Poll the progress of a background workflow run
+ * @param {string} jobId - ID of the job returned by `runWorkflow`
+ * @returns {Promise<Object>} - server response (job and per-node status)
+ */
+export async function getJob(jobId) {
+    return fetchWrapper(`/workflow/run/${jobId}`);
+}
+
+/**
+ * Follow the progress of a background workflow run as it happens
+ * @param {string} jobId - ID of the job returned by `runWorkflow`
+ * @param {function} onEvent - called with the event name and its data, for
+ *     each node-started, node-finished, node-failed and node-skipped event
+ * @returns {Promise<Object>} - resolves with the final job-finished or
+ *     job-failed event data
+ */
+export async function followJob(jobId, onEvent) {
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/workflow/run/${jobId}/events`);
+        const nodeEvents = ["node-started", "node-finished", "node-failed", "node-skipped"];
+
+        nodeEvents.forEach(name => {
+            source.addEventListener(name, e => onEvent(name, JSON.parse(e.data)));
+        });
+        ["job-finished", "job-failed"].forEach(name => {
+            source.addEventListener(name, e => {
+                source.close();
+                resolve(JSON.parse(e.data));
+            });
+        });
+        source.onerror = err => {
+            // EventSource reconnects on its own while the stream is open
+            if (source.readyState === EventSource.CLOSED) {
+                reject(err);
+            }
+        };
+    });
+}
+
 /**
  * Retrieves the data at the state of the specified node
  * @param {string }nodeId - node identifier for an execution state
@@ -261,3 +405,35 @@ export async function execute(node) {
 export async function retrieveData(nodeId) {
   return fetchWrapper(`/node/${nodeId}/retrieve_data`);
 }
+
+/**
+ * Retrieves one page of rows of the data at the specified node
+ * @param {string} nodeId - node identifier for an execution state
+ * @param {Object} page - any of `offset`, `limit`, `columns` (array of
+ *     names) and `sort` (column name; prefix with "-" for descending), and
+ *     `preview` to read the node's preview output
+ * @returns {Promise<Object>} - json response with the total `rows`, and the
+ *     page's `columns`, `index` and `data` (array of rows)
+ */
+export async function retrieveDataPage(nodeId, page = {}) {
+  const params = new URLSearchParams();
+  if (page.offset !== undefined) params.set("offset", page.offset);
+  if (page.limit !== undefined) params.set("limit", page.limit);
+  if (page.columns !== undefined) params.set("columns", page.columns.join(","));
+  if (page.sort !== undefined) params.set("sort", page.sort);
+  if ([...params.keys()].length === 0) params.set("offset", 0);
+  if (page.preview) params.set("preview", true);
+  return fetchWrapper(`/node/${nodeId}/retrieve_data?${params}`);
+}
+
+/**
+ * Retrieves the number of rows, and the columns, of the data at the
+ * specified node, without the data itself
+ * @param {string} nodeId - node identifier for an execution state
+ * @param {boolean} preview - describe the node's preview output instead
+ * @returns {Promise<Object>} - json response: {rows, columns: [{name, type}]}
+ */
+export async function retrieveSchema(nodeId, preview = false) {
+  const query = preview ? "?preview=true" : "";
+  return fetchWrapper(`/node/${nodeId}/retrieve_schema${query}`);
+}
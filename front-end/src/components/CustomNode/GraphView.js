@@ -7,6 +7,9 @@ import { VariableSizeGrid as Grid } from 'react-window';
 import * as API from "../../API";
 import '../../styles/GraphView.css';
 
+// Number of rows to show in the data preview
+const PREVIEW_ROWS = 1000;
+
 
 export default class GraphView extends React.Component {
 
@@ -75,10 +78,19 @@ export default class GraphView extends React.Component {
   load = async () => {
       this.setState({loading: true});
 
-      API.retrieveData(this.key_id)
-          .then(json => {
-            const columns = Object.keys(json);
-            const rows = Object.keys(json[columns[0]]);
+      // Only the first rows are previewed, so large tables load quickly
+      API.retrieveDataPage(this.key_id, {limit: PREVIEW_ROWS})
+          .then(page => {
+            // Arrange rows as {column: {position: value}}
+            const columns = page.columns;
+            const json = {};
+            columns.forEach((column, columnIndex) => {
+                json[column] = {};
+                page.data.forEach((row, rowIndex) => {
+                    json[column][rowIndex.toString()] = row[columnIndex];
+                });
+            });
+            const rows = page.data.map((row, rowIndex) => rowIndex.toString());
             const widths = this.computeWidths(columns, rows.length, json);
 
             this.setState({